@@ -2,11 +2,11 @@
 
 import { useState, useMemo } from 'react';
 import { Search, RefreshCw } from 'lucide-react';
-import { useMarketData } from '@/lib/hooks/useMarketData';
+import { useBotMarketData } from '@/lib/hooks/useMarketData';
 
 export default function FundingsRatePage() {
   const [searchQuery, setSearchQuery] = useState('');
-  const marketData = useMarketData();
+  const marketData = useBotMarketData();
 
   // Transform hook data into array for the table/cards
   const fundingRates = useMemo(() => {
@@ -0,0 +1,156 @@
+import argparse
+import asyncio
+import os
+import aiohttp
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from rich.console import Console
+from rich.table import Table
+from config import SYMBOLS
+from backtest_spread import (
+    fetch_hl_candles, fetch_binance_candles, align_spread, backtest_grid, safe_leverage,
+    ENTRY_CANDIDATES, EXIT_CANDIDATES
+)
+
+# Parallel multi-symbol / multi-timeframe / multi-lookback backtest.
+# Spread series are packed once into a shared memory block; workers attach to it
+# by name and slice their series out, so no DataFrame is ever pickled.
+#
+# Usage:
+#   python bot/backtest_runner.py
+#   python bot/backtest_runner.py --symbols ETH BTC --timeframes 5m 15m --lookbacks 3 7 14
+
+console = Console()
+
+# Worker-side view of the shared spread buffer (set by _attach)
+_SHM = None
+_SPREADS = None
+
+def _attach(shm_name: str, length: int):
+    """ProcessPool initializer: map the shared spread buffer once per worker"""
+    global _SHM, _SPREADS
+    # Workers share the parent's resource tracker, which owns (and unlinks) the block
+    _SHM = shared_memory.SharedMemory(name=shm_name)
+    _SPREADS = np.ndarray((length,), dtype=np.float64, buffer=_SHM.buf)
+
+def _run_job(job: dict) -> list:
+    """Grid search one series slice for a chunk of entry thresholds"""
+    series = _SPREADS[job['offset']:job['offset'] + job['length']]
+    grid = backtest_grid(series, job['entries'], job['exits'])
+    rows = []
+    for i, entry in enumerate(job['entries']):
+        for j, exit_target in enumerate(job['exits']):
+            count = int(grid['trades'][i, j])
+            if exit_target >= entry or count == 0:
+                continue
+            rows.append({
+                **job['meta'],
+                "entry": entry,
+                "exit": exit_target,
+                "trades": count,
+                "pnl": float(grid['pnl'][i, j]),
+                "max_dd": float(grid['max_dd'][i, j])
+            })
+    return rows
+
+async def fetch_series(symbols, timeframes, lookbacks, offline=False) -> list:
+    """One HL + Binance fetch per (symbol, timeframe) at the longest lookback, sliced per lookback"""
+    max_days = max(lookbacks)
+    pairs = [(sym, tf) for sym in symbols for tf in timeframes]
+
+    connector = aiohttp.TCPConnector(ssl=False)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        frames = await asyncio.gather(*[
+            asyncio.gather(
+                fetch_hl_candles(session, sym, tf, max_days, offline),
+                fetch_binance_candles(session, sym, tf, max_days, offline)
+            )
+            for sym, tf in pairs
+        ], return_exceptions=True)
+
+    series = []
+    for (sym, tf), result in zip(pairs, frames):
+        if isinstance(result, Exception) or result[0] is None or result[1] is None:
+            console.print(f"[yellow]Skipping {sym} {tf}: no data[/yellow]")
+            continue
+        combined = align_spread(*result)
+        end = combined.index.max()
+        for days in lookbacks:
+            window = combined[combined.index > end - np.timedelta64(days, 'D')]
+            if len(window) == 0:
+                continue
+            series.append(({"symbol": sym, "timeframe": tf, "days": days}, window['spread'].to_numpy(dtype=np.float64)))
+    return series
+
+def run_grid(series: list, entries: list, exits: list, workers: int) -> list:
+    """Pack series into shared memory and fan the grid out over a process pool"""
+    total = sum(len(arr) for _, arr in series)
+    shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * 8)
+    try:
+        buf = np.ndarray((total,), dtype=np.float64, buffer=shm.buf)
+        jobs = []
+        offset = 0
+        # One job per (series, entry threshold) so small symbol lists still use every core
+        for meta, arr in series:
+            buf[offset:offset + len(arr)] = arr
+            for entry in entries:
+                jobs.append({"meta": meta, "offset": offset, "length": len(arr), "entries": [entry], "exits": exits})
+            offset += len(arr)
+
+        rows = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(shm.name, total)) as pool:
+            for job_rows in pool.map(_run_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))):
+                rows.extend(job_rows)
+        return rows
+    finally:
+        shm.close()
+        shm.unlink()
+
+def print_report(rows: list, top: int):
+    rows.sort(key=lambda r: r['pnl'], reverse=True)
+    table = Table(title=f"Backtest Ranking (Top {min(top, len(rows))} of {len(rows)})")
+    table.add_column("#", style="dim")
+    table.add_column("Symbol", style="bold")
+    table.add_column("TF")
+    table.add_column("Days")
+    table.add_column("Entry %", style="cyan")
+    table.add_column("Exit %", style="cyan")
+    table.add_column("Trades", style="magenta")
+    table.add_column("Net Profit %", style="green")
+    table.add_column("Max DD %", style="red")
+    table.add_column("Safe Lev", style="yellow")
+    for rank, r in enumerate(rows[:top], 1):
+        table.add_row(
+            str(rank), r['symbol'], r['timeframe'], str(r['days']),
+            f"{r['entry']}%", f"{r['exit']}%", str(r['trades']),
+            f"{r['pnl']:.2f}%", f"{r['max_dd']:.2f}%", safe_leverage(r['max_dd'])
+        )
+    console.print(table)
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel spread backtest (HL vs Binance)")
+    parser.add_argument("--symbols", nargs="+", default=SYMBOLS)
+    parser.add_argument("--timeframes", nargs="+", default=["15m"])
+    parser.add_argument("--lookbacks", nargs="+", type=int, default=[7], help="Days")
+    parser.add_argument("--entries", nargs="+", type=float, default=ENTRY_CANDIDATES)
+    parser.add_argument("--exits", nargs="+", type=float, default=EXIT_CANDIDATES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--offline", action="store_true", help="Use the local candle cache only")
+    args = parser.parse_args()
+
+    console.print(f"[bold blue]Backtesting {len(args.symbols)} symbols x {args.timeframes} x {args.lookbacks}d on {args.workers} workers...[/bold blue]")
+    series = asyncio.run(fetch_series(args.symbols, args.timeframes, args.lookbacks, args.offline))
+    if not series:
+        console.print("[red]No data fetched. Aborting.[/red]")
+        return
+
+    rows = run_grid(series, args.entries, args.exits, args.workers)
+    if not rows:
+        console.print("[yellow]No strategy produced trades.[/yellow]")
+        return
+    print_report(rows, args.top)
+
+if __name__ == "__main__":
+    main()
@@ -3,10 +3,10 @@ import asyncio
 import aiohttp
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import time
 from rich.console import Console
 from rich.table import Table
+from core.candle_cache import CandleCache
+from core.spread_stats import SpreadStats
 
 console = Console()
 
@@ -15,104 +15,135 @@ SYMBOL = "ETH" # Analyzing ETH as the benchmark
 TIMEFRAME = "15m" # 15 minute candles
 DAYS_LOOKBACK = 7
 LEVERAGE_OPTIONS = [1, 5, 10, 20]
+FEES_PCT = 0.15 # Round trip fees per trade (%)
 
-async def fetch_hl_candles(session):
-    """Fetch Hyperliquid Candles"""
-    url = "https://api.hyperliquid.xyz/info"
-    # HL uses ms timestamps
-    end_time = int(time.time() * 1000)
-    start_time = int((datetime.now() - timedelta(days=DAYS_LOOKBACK)).timestamp() * 1000)
-    
-    payload = {
-        "type": "candleSnapshot",
-        "req": {
-            "coin": SYMBOL,
-            "interval": TIMEFRAME,
-            "startTime": start_time,
-            "endTime": end_time
-        }
-    }
-    
-    async with session.post(url, json=payload, headers={"Content-Type": "application/json"}) as resp:
-        if resp.status == 200:
-            data = await resp.json()
-            # HL Data: [t, o, h, l, c, v]
-            df = pd.DataFrame(data, columns=['t', 'o', 'h', 'l', 'c', 'v'])
-            df['timestamp'] = pd.to_datetime(df['t'], unit='ms')
-            df['close'] = df['c'].astype(float)
-            df = df.set_index('timestamp')
-            return df[['close']]
-        else:
-            console.print(f"[red]Error fetching HL data: {resp.status}[/red]")
-            return None
-
-async def fetch_binance_candles(session):
-    """Fetch Binance ETHUSDT Futures Candles (Benchmark)"""
-    url = "https://fapi.binance.com/fapi/v1/klines"
-    # Binance uses ms timestamps
-    end_time = int(time.time() * 1000)
-    start_time = int((datetime.now() - timedelta(days=DAYS_LOOKBACK)).timestamp() * 1000)
-    
-    params = {
-        "symbol": f"{SYMBOL}USDT",
-        "interval": TIMEFRAME,
-        "startTime": start_time,
-        "endTime": end_time,
-        "limit": 1500 # Max limit
-    }
-    
-    # We might need multiple calls for 7 days if limit is hit, but 15m * 7 days = ~672 candles. 1500 is enough.
-    
-    async with session.get(url, params=params) as resp:
-        if resp.status == 200:
-            data = await resp.json()
-            # Binance Data: [open_time, open, high, low, close, volume, ...]
-            df = pd.DataFrame(data, columns=['open_time', 'o', 'h', 'l', 'c', 'v', 'close_time', 'q', 'n', 'V', 'Q', 'B'])
-            df['timestamp'] = pd.to_datetime(df['open_time'], unit='ms')
-            df['close'] = df['c'].astype(float)
-            df = df.set_index('timestamp')
-            return df[['close']]
-        else:
-            console.print(f"[red]Error fetching Binance data: {resp.status}[/red]")
-            return None
+# Grid Search (Hyperliquid tracks Binance closely: micro-arbs)
+ENTRY_CANDIDATES = [0.05, 0.08, 0.1, 0.15, 0.2, 0.3]
+EXIT_CANDIDATES = [-0.02, 0.0, 0.02, 0.05]
+# Same grid on the spread's rolling z-score (SpreadStats over the candles, no look-ahead)
+Z_ENTRY_CANDIDATES = [1.5, 2.0, 2.5, 3.0]
+Z_EXIT_CANDIDATES = [-0.5, 0.0, 0.5]
+Z_WINDOW = 96          # candles in the rolling window (1 day of 15m)
+Z_EWMA_HALF_LIFE = 8   # candles
+
+# Candles come from the local cache; only the missing tail is downloaded
+CACHE = CandleCache()
+
+def candles_to_df(candles):
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(np.asarray(candles['t']), unit='ms'),
+        'close': np.asarray(candles['c'], dtype=float)
+    })
+    return df.set_index('timestamp')
+
+async def fetch_hl_candles(session, symbol=SYMBOL, timeframe=TIMEFRAME, days=DAYS_LOOKBACK, offline=False):
+    """Fetch Hyperliquid Candles (via local cache)"""
+    candles = await CACHE.sync(session, "hl", symbol, timeframe, days, offline=offline)
+    if len(candles) == 0:
+        console.print(f"[red]Error fetching HL data: no candles for {symbol} {timeframe}[/red]")
+        return None
+    return candles_to_df(candles)
+
+async def fetch_binance_candles(session, symbol=SYMBOL, timeframe=TIMEFRAME, days=DAYS_LOOKBACK, offline=False):
+    """Fetch Binance <SYMBOL>USDT Futures Candles (Benchmark, via local cache, paginated past 1500 rows)"""
+    candles = await CACHE.sync(session, "binance", symbol, timeframe, days, offline=offline)
+    if len(candles) == 0:
+        console.print(f"[red]Error fetching Binance data: no candles for {symbol} {timeframe}[/red]")
+        return None
+    return candles_to_df(candles)
+
+def backtest_grid(spread, entry_candidates, exit_candidates, fees=FEES_PCT, signal=None):
+    """
+    Vectorized backtest of every entry x exit threshold pair.
+    spread: array-like / Series of spread % (direction agnostic, abs() applied).
+    signal: what the thresholds apply to (e.g. the spread's z-score), default the
+    spread itself; trades are always valued on the spread. NaN never triggers.
+    Returns dict of (len(entries), len(exits)) arrays: trades, pnl, max_dd
+    (worst adverse excursion of any trade). Cells with exit >= entry are empty.
+
+    Since exit < entry, a tick is at most one of ENTRY (>= entry) or EXIT (<= exit)
+    and the position state after a tick is simply "last event was ENTRY". So the
+    real entries are ENTRY events preceded by an EXIT event (or none), and real
+    exits are EXIT events preceded by an ENTRY event: no per-tick state machine.
+
+    The (entry, exit) cells are still a Python loop, E * X vectorized passes over
+    the series: each one only touches its threshold crossings. Broadcasting the
+    whole (E, X, T) cube was measured as well: about 2x faster at 7 days of 15m
+    candles (~0.5 vs ~0.9 ms for the 6 x 4 grid), 1.5-2x slower from 4x that
+    history on, and it holds several E * X * T arrays.
+    """
+    s = np.abs(np.asarray(spread, dtype=float))
+    sig = s if signal is None else np.asarray(signal, dtype=float)
+    entries = np.asarray(entry_candidates, dtype=float)
+    exits = np.asarray(exit_candidates, dtype=float)
+    T = len(s)
+
+    trades = np.zeros((len(entries), len(exits)), dtype=np.int64)
+    pnl = np.zeros((len(entries), len(exits)))
+    max_dd = np.zeros((len(entries), len(exits)))
+    # Padding lets the last open trade's excursion window run to the end
+    padded = np.append(s, -np.inf)
+
+    for i, entry in enumerate(entries):
+        is_entry = sig >= entry
+        for j, exit_target in enumerate(exits):
+            if exit_target >= entry: continue
+
+            events = np.flatnonzero(is_entry | (sig <= exit_target))
+            if len(events) == 0: continue
+            labels = is_entry[events]
+
+            # Keep events where the label flips (first event counts only if ENTRY)
+            flips = np.empty(len(events), dtype=bool)
+            flips[0] = labels[0]
+            flips[1:] = labels[1:] != labels[:-1]
+            trade_ticks = events[flips] # entry, exit, entry, exit, ... [entry]
+
+            entry_ticks = trade_ticks[0::2]
+            exit_ticks = trade_ticks[1::2]
+            n_closed = len(exit_ticks)
+            if len(entry_ticks) == 0: continue
+
+            trades[i, j] = len(entry_ticks)
+            pnl[i, j] = np.sum(s[entry_ticks[:n_closed]] - s[exit_ticks]) - fees * n_closed
+
+            # Adverse excursion: max spread over (entry, exit] of each trade.
+            # Windows [entry+1, exit+1) are sorted, so one reduceat covers them all.
+            stops = np.append(exit_ticks, T - 1)[:len(entry_ticks)] + 1
+            bounds = np.column_stack([entry_ticks + 1, stops]).ravel()
+            window_max = np.maximum.reduceat(padded, bounds)[::2]
+            excursion = window_max - s[entry_ticks]
+            max_dd[i, j] = max(float(excursion.max()), 0.0)
+
+    return {"entries": entries, "exits": exits, "trades": trades, "pnl": pnl, "max_dd": max_dd}
+
+def align_spread(hl_df, px_df):
+    """Inner-join closes and return abs(Binance - HL) / HL * 100"""
+    combined = hl_df.join(px_df, lsuffix='_hl', rsuffix='_px', how='inner')
+    combined['spread'] = (abs(combined['close_px'] - combined['close_hl']) / combined['close_hl']) * 100
+    return combined
+
+def spread_stats(spread, window=Z_WINDOW, ewma_half_life=Z_EWMA_HALF_LIFE):
+    """Rolling mean / std / EWMA / z-score / half-life (in candles) of abs(spread), as seen live at each candle"""
+    return SpreadStats.replay(np.abs(np.asarray(spread, dtype=float)), window, ewma_half_life)
+
+def safe_leverage(max_dd):
+    """
+    If Max DD (spread widening) is 2%, using 50x levy = 100% loss (Limit).
+    Basic rule: Liquidation = 1/Lev. We need 1/Lev > Max_DD_decimal.
+    """
+    if max_dd > 0:
+        limit_lev = 1 / (max_dd / 100)
+        return f"{int(limit_lev * 0.8)}x" # 20% safety buffer
+    return "Max"
 
 def backtest_strategy(spread_series, entry_threshold, exit_threshold):
     """
     Simulates trades based on spread series.
     Returns: count, total_return, max_adverse_excursion (for leverage check)
     """
-    in_trade = False
-    entry_spread = 0
-    total_pnl = 0
-    trade_count = 0
-    max_drawdown_spread = 0 # How much the spread went AGAINST us
-    
-    stats = []
-
-    for ts, spread in spread_series.items():
-        spread_val = abs(spread) # Treating direction agnostic for spread capture
-        
-        if not in_trade:
-            # ENTRY CONDITION
-            if spread_val >= entry_threshold:
-                in_trade = True
-                entry_spread = spread_val
-                trade_count += 1
-                max_drawdown_spread = 0 # Reset for this trade
-        else:
-            # IN TRADE - MONITOR RISKS
-            current_drawdown = spread_val - entry_spread
-            if current_drawdown > max_drawdown_spread:
-                max_drawdown_spread = current_drawdown
-            
-            # EXIT CONDITION
-            if spread_val <= exit_threshold:
-                in_trade = False
-                fees = 0.15 
-                trade_pnl = (entry_spread - spread_val) - fees
-                total_pnl += trade_pnl
-                
-    return trade_count, total_pnl, max_drawdown_spread
+    grid = backtest_grid(spread_series, [entry_threshold], [exit_threshold])
+    return int(grid['trades'][0, 0]), float(grid['pnl'][0, 0]), float(grid['max_dd'][0, 0])
 
 async def main():
     console.print(f"[bold blue]Starting Backtest Analysis for {SYMBOL} ({DAYS_LOOKBACK} Days)...[/bold blue]")
@@ -130,12 +161,8 @@ async def main():
         return
 
     # Align Data
-    # Inner join to only compare overlapping candles
-    combined = hl_df.join(px_df, lsuffix='_hl', rsuffix='_px', how='inner')
-    
-    # Calculate Spread %
-    # abs(Binance - HL) / HL * 100
-    combined['spread'] = (abs(combined['close_px'] - combined['close_hl']) / combined['close_hl']) * 100
+    # Inner join to only compare overlapping candles, Spread % = abs(Binance - HL) / HL * 100
+    combined = align_spread(hl_df, px_df)
     
     avg_spread = combined['spread'].mean()
     max_spread = combined['spread'].max()
@@ -146,8 +173,8 @@ async def main():
     # Grid Search Optimization
     # Hyperliquid tracks Binance very closely, so spreads are tight (0.02% - 0.15%).
     # We need to test micro-arbs.
-    entry_candidates = [0.05, 0.08, 0.1, 0.15, 0.2, 0.3]
-    exit_candidates = [-0.02, 0.0, 0.02, 0.05]
+    entry_candidates = ENTRY_CANDIDATES
+    exit_candidates = EXIT_CANDIDATES
     
     results = []
     
@@ -160,28 +187,21 @@ async def main():
     table.add_column("Max DD %", style="red")
     table.add_column("Safe Lev", style="yellow")
 
-    for entry in entry_candidates:
-        for exit_target in exit_candidates:
+    # Whole entry x exit grid in one vectorized pass
+    grid = backtest_grid(combined['spread'], entry_candidates, exit_candidates)
+
+    for i, entry in enumerate(entry_candidates):
+        for j, exit_target in enumerate(exit_candidates):
             if exit_target >= entry: continue
             
-            count, pnl, max_dd = backtest_strategy(combined['spread'], entry, exit_target)
+            count = int(grid['trades'][i, j])
+            pnl = float(grid['pnl'][i, j])
+            max_dd = float(grid['max_dd'][i, j])
             
             if count == 0: continue
 
             # Determine Max Safe Leverage
-            # If Max DD (spread widening) is 2%, using 50x levy = 100% loss (Limit).
-            # Safety buffer: 50%.
-            # Safe Lev = 1 / (Max DD * 0.01 * 2) roughly?
-            # Basic rule: Liquidation = 1/Lev. 
-            # We need 1/Lev > Max_DD_decimal.
-            # Lev < 1 / Max_DD_decimal.
-            
-            safe_lev = "N/A"
-            if max_dd > 0:
-                limit_lev = 1 / (max_dd / 100)
-                safe_lev = f"{int(limit_lev * 0.8)}x" # 20% safety buffer
-            else:
-                safe_lev = "Max"
+            safe_lev = safe_leverage(max_dd)
 
             results.append({
                 "entry": entry,
@@ -211,5 +231,28 @@ async def main():
         console.print(f"Estimated Net Profit (7d): [bold]{best['pnl']:.2f}%[/bold]")
         console.print(f"Max Safe Leverage: [bold]{best['safe_lev']}[/bold]")
 
+    # Relative thresholds: the same grid on the rolling z-score
+    stats = spread_stats(combined['spread'])
+    console.print(
+        f"\nRolling ({Z_WINDOW} x {TIMEFRAME}) at the end: mean {stats['mean'][-1]:.4f}% | "
+        f"std {stats['std'][-1]:.4f}% | half-life {stats['half_life'][-1]:.1f} candles"
+    )
+    z_grid = backtest_grid(combined['spread'], Z_ENTRY_CANDIDATES, Z_EXIT_CANDIDATES, signal=stats['z'])
+    z_table = Table(title="Z-Score Thresholds")
+    z_table.add_column("Entry z", style="cyan")
+    z_table.add_column("Exit z", style="cyan")
+    z_table.add_column("Trades", style="magenta")
+    z_table.add_column("Net Profit %", style="green")
+    z_table.add_column("Max DD %", style="red")
+    for i, entry in enumerate(Z_ENTRY_CANDIDATES):
+        for j, exit_target in enumerate(Z_EXIT_CANDIDATES):
+            count = int(z_grid['trades'][i, j])
+            if count == 0: continue
+            z_table.add_row(
+                f"{entry}", f"{exit_target}", str(count),
+                f"{z_grid['pnl'][i, j]:.2f}%", f"{z_grid['max_dd'][i, j]:.2f}%"
+            )
+    console.print(z_table)
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,121 @@
+import asyncio
+import time
+from eth_account import Account
+from rich.console import Console
+from rich.table import Table
+from core.metrics import LatencyHistogram
+from core.transport import Transport
+from core.universe import Universe
+from core.orders import HyperliquidOrders, ParadexOrders, Leg, BUY, SELL
+from core.execution import ExecutionEngine
+from mock_exchange import MockExchange, HL_PORT, PX_PORT
+
+# Benchmark: two-leg entries (short PX / long HL) against mock_exchange.py.
+#   sequential: build + send HL, then build + send PX (one leg at a time)
+#   engine:     ExecutionEngine.open, both legs pre-built then sent with gather
+# Leg skew = distance between the two orders reaching the venues (mock receive
+# stamps, same clock). Then the partial-fill / reject cases and their unwinds.
+# Random HL key, dummy Paradex JWT: the mock does not verify signatures.
+# Usage: python bot/bench_execution.py
+
+console = Console()
+
+ROUNDS = 200
+LATENCY_MS = 5.0
+SYMBOL = "ETH"
+PRICE = 3000.0
+SIZE = 0.05
+
+def make_engine(http, universe) -> ExecutionEngine:
+    hl = HyperliquidOrders(
+        http, universe, key=Account.create().key.hex(),
+        info_url=f"http://127.0.0.1:{HL_PORT}/info", exchange_url=f"http://127.0.0.1:{HL_PORT}/exchange"
+    )
+    px = ParadexOrders(http, universe, jwt="mock", api_url=f"http://127.0.0.1:{PX_PORT}/v1")
+    return ExecutionEngine({"hl": hl, "px": px})
+
+def leg_skew(mock: MockExchange, since: int) -> int:
+    """ns between the HL and PX order arriving, for the last pair received"""
+    stamps = {venue: ns for venue, ns, _ in mock.received[since:]}
+    return abs(stamps["hl"] - stamps["px"])
+
+async def sequential(engine: ExecutionEngine):
+    hl, px = engine.clients["hl"], engine.clients["px"]
+    await hl.submit(Leg("hl", SYMBOL, BUY, SIZE, PRICE * 1.002))
+    await px.submit(Leg("px", SYMBOL, SELL, SIZE, PRICE * 0.998))
+
+async def concurrent(engine: ExecutionEngine):
+    await engine.open(SYMBOL, "px", "hl", SIZE, PRICE, PRICE)
+
+async def run(mock: MockExchange, engine: ExecutionEngine, entry) -> tuple:
+    """(entry latency, leg skew) histograms after a warm-up"""
+    for _ in range(10):
+        await entry(engine)
+    total, skew = LatencyHistogram(), LatencyHistogram()
+    for _ in range(ROUNDS):
+        since = len(mock.received)
+        t0 = time.perf_counter_ns()
+        await entry(engine)
+        total.record(time.perf_counter_ns() - t0)
+        skew.record(leg_skew(mock, since))
+    return total, skew
+
+async def bench():
+    mock = MockExchange(latency_ms=LATENCY_MS)
+    runners = await mock.start()
+    universe = Universe(mode="STATIC", static=[SYMBOL], venues=["hl", "px"])
+    http = Transport()
+    try:
+        engine = make_engine(http, universe)
+        await engine.start([SYMBOL])
+
+        build = LatencyHistogram()
+        for _ in range(ROUNDS):
+            t0 = time.perf_counter_ns()
+            engine.clients["hl"].build(Leg("hl", SYMBOL, BUY, SIZE, PRICE))
+            build.record(time.perf_counter_ns() - t0)
+
+        rows = [(name, *await run(mock, engine, entry)) for name, entry in (("sequential", sequential), ("engine", concurrent))]
+        table = Table(title=f"Two-leg entry ({ROUNDS} rounds, mock RTT ~{LATENCY_MS:.0f}ms / request)")
+        table.add_column("Path", style="cyan")
+        table.add_column("entry p50", justify="right")
+        table.add_column("entry p99", justify="right")
+        table.add_column("leg skew p50", justify="right", style="yellow")
+        table.add_column("leg skew p99", justify="right", style="yellow")
+        for name, total, skew in rows:
+            t50, t99 = total.percentiles([50, 99])
+            s50, s99 = skew.percentiles([50, 99])
+            table.add_row(name, f"{t50 / 1e3:,.0f} us", f"{t99 / 1e3:,.0f} us", f"{s50 / 1e3:,.0f} us", f"{s99 / 1e3:,.0f} us")
+        console.print(table)
+        b50, b99 = build.percentiles([50, 99])
+        console.print(f"HL build + sign (off the send path): p50 {b50 / 1e3:,.0f} us, p99 {b99 / 1e3:,.0f} us")
+
+        cases = Table(title="Fill scenarios (short PX / long HL)")
+        cases.add_column("Case", style="cyan")
+        cases.add_column("Status")
+        cases.add_column("Short PX", justify="right")
+        cases.add_column("Long HL", justify="right")
+        cases.add_column("Unwind", justify="right")
+        cases.add_column("Hedged", justify="right", style="green")
+        for label, fills, reject in (
+            ("both fill", {"hl": 1.0, "px": 1.0}, 0.0),
+            ("PX fills 50%", {"hl": 1.0, "px": 0.5}, 0.0),
+            ("HL fills 98%", {"hl": 0.98, "px": 1.0}, 0.0),
+            ("PX fills 0", {"hl": 1.0, "px": 0.0}, 0.0),
+            ("all rejected", {"hl": 1.0, "px": 1.0}, 1.0),
+        ):
+            mock.fill, mock.reject = fills, reject
+            result = await engine.open(SYMBOL, "px", "hl", SIZE, PRICE, PRICE)
+            unwind = ", ".join(f"{u.leg.venue} {u.leg.side} {u.filled:g}" for u in result.unwinds) or "-"
+            cases.add_row(
+                label, result.status, f"{result.short.filled:g}", f"{result.long.filled:g}", unwind,
+                f"{min(result.net(result.short), result.net(result.long)):g}"
+            )
+        console.print(cases)
+    finally:
+        await http.close()
+        for runner in runners:
+            await runner.cleanup()
+
+if __name__ == "__main__":
+    asyncio.run(bench())
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import msgpack
+from eth_account import Account
+from eth_account.messages import encode_typed_data
+from eth_utils import keccak, to_hex
+from rich.console import Console
+from rich.table import Table
+from core.metrics import LatencyHistogram
+from core.universe import Universe
+from core.orders import HyperliquidOrders, Leg, BUY, SELL
+from core.signing import HLSigner, coincurve
+
+# Benchmark: Hyperliquid order signing, per order.
+#   eth-account: typed data re-encoded and signed with Account.sign_message
+#   cached digest: HLSigner (precomputed domain / type hashes, raw ECDSA)
+#   template build: HyperliquidOrders.build, templated msgpack + sign + JSON body
+#   two legs: both legs of an entry built with gather, inline vs signing pools
+# Usage: python bot/bench_signing.py
+
+console = Console()
+
+ROUNDS = 2000
+SYMBOL = "ETH"
+LEG = Leg("hl", SYMBOL, BUY, 0.0521, 3012.4)
+
+def legacy_sign(account, action: dict, nonce: int) -> dict:
+    """Reference: per-order EIP-712 encoding through eth-account"""
+    data = msgpack.packb(action) + nonce.to_bytes(8, "big") + b"\x00"
+    message = {
+        "domain": {"chainId": 1337, "name": "Exchange", "verifyingContract": "0x" + "0" * 40, "version": "1"},
+        "types": {
+            "Agent": [{"name": "source", "type": "string"}, {"name": "connectionId", "type": "bytes32"}],
+            "EIP712Domain": [
+                {"name": "name", "type": "string"}, {"name": "version", "type": "string"},
+                {"name": "chainId", "type": "uint256"}, {"name": "verifyingContract", "type": "address"}
+            ]
+        },
+        "primaryType": "Agent",
+        "message": {"source": "a", "connectionId": keccak(data)}
+    }
+    signed = account.sign_message(encode_typed_data(full_message=message))
+    return {"r": to_hex(signed.r), "s": to_hex(signed.s), "v": signed.v}
+
+def make_client(key: str, pool: str) -> HyperliquidOrders:
+    universe = Universe(mode="STATIC", static=[SYMBOL], venues=["hl"])
+    client = HyperliquidOrders(None, universe, key=key, exchange_url="https://api.hyperliquid.xyz/exchange", pool=pool)
+    client.markets = {SYMBOL: (1, 4)}
+    client.signer.pool.warm()
+    return client
+
+def measure(fn, rounds: int = ROUNDS) -> LatencyHistogram:
+    for _ in range(50):
+        fn()
+    hist = LatencyHistogram()
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        fn()
+        hist.record(time.perf_counter_ns() - t0)
+    return hist
+
+async def measure_async(fn, rounds: int = ROUNDS) -> LatencyHistogram:
+    for _ in range(50):
+        await fn()
+    hist = LatencyHistogram()
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        await fn()
+        hist.record(time.perf_counter_ns() - t0)
+    return hist
+
+async def bench():
+    account = Account.create()
+    key = account.key.hex()
+    client = make_client(key, "NONE")
+    template, px, sz = client.order_fields(LEG)
+    action = template.action(px, sz)
+    signer = HLSigner(key, mainnet=True, pool="NONE")
+    assert signer.sign(template.packed(px, sz), 1) == legacy_sign(account, action, 1)
+
+    rows = [
+        ("eth-account", measure(lambda: legacy_sign(account, action, client.nonce()), ROUNDS // 4)),
+        ("cached digest", measure(lambda: signer.sign(msgpack.packb(action), client.nonce()))),
+        ("template build", measure(lambda: client.build(LEG))),
+    ]
+    other = Leg("hl", SYMBOL, SELL, 0.0521, 3001.9)
+    for pool in ("NONE", "THREAD", "PROCESS"):
+        c = make_client(key, pool)
+        try:
+            hist = await measure_async(lambda: asyncio.gather(c.build_async(LEG), c.build_async(other)), ROUNDS // 2)
+        finally:
+            c.close()
+        rows.append((f"two legs, {pool.lower()}", hist))
+
+    table = Table(title=f"HL order signing (ECDSA: {'coincurve' if coincurve else 'eth_keys'})")
+    table.add_column("Path", style="cyan")
+    table.add_column("n", justify="right")
+    table.add_column("p50", justify="right", style="yellow")
+    table.add_column("p99", justify="right")
+    table.add_column("max", justify="right")
+    for name, hist in rows:
+        p50, p99 = hist.percentiles([50, 99])
+        table.add_row(name, str(hist.count), f"{p50 / 1e3:,.0f} us", f"{p99 / 1e3:,.0f} us", f"{hist.max / 1e3:,.0f} us")
+    console.print(table)
+
+if __name__ == "__main__":
+    asyncio.run(bench())
@@ -0,0 +1,112 @@
+import random
+import time
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from core.orderbook import OrderBook
+from core.simulator import ExecutionSimulator
+
+# Benchmark: legacy per-level Python VWAP loop vs vectorized NumPy depth walk.
+# Usage: python bot/bench_simulator.py
+
+console = Console()
+
+DEPTH = 20
+SYMBOLS = 100
+SIZES_USD = np.linspace(10, 50_000, 64)
+
+def loop_vwap(book: list, size_usd: float) -> float:
+    """Reference: the original ExecutionSimulator.calculate_vwap loop"""
+    remaining_usd = size_usd
+    total_tokens = 0.0
+    weighted_sum = 0.0
+    for price, size in book:
+        price = float(price)
+        size = float(size)
+        level_usd = price * size
+        take_usd = min(remaining_usd, level_usd)
+        take_tokens = take_usd / price
+        weighted_sum += price * take_tokens
+        total_tokens += take_tokens
+        remaining_usd -= take_usd
+        if remaining_usd <= 0.0001:
+            break
+    if remaining_usd > 1.0:
+        return None
+    if total_tokens == 0:
+        return 0.0
+    return weighted_sum / total_tokens
+
+def make_book(mid: float) -> dict:
+    """API-shaped book: string levels, best first"""
+    step = mid * 0.0001
+    return {
+        'bids': [[f"{mid - step * (i + 1):.6f}", f"{random.uniform(0.1, 5) * 3000 / mid:.6f}"] for i in range(DEPTH)],
+        'asks': [[f"{mid + step * (i + 1):.6f}", f"{random.uniform(0.1, 5) * 3000 / mid:.6f}"] for i in range(DEPTH)]
+    }
+
+def to_orderbook(book: dict) -> OrderBook:
+    ob = OrderBook()
+    ob.apply_snapshot(book['bids'], book['asks'])
+    return ob
+
+def timeit(fn, repeat: int) -> float:
+    """Best-of-3 mean seconds per call"""
+    best = float('inf')
+    for _ in range(3):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / repeat)
+    return best
+
+def main():
+    sim = ExecutionSimulator()
+    mids = [random.uniform(1, 100_000) for _ in range(SYMBOLS)]
+    raw = [(make_book(m), make_book(m * (1 + random.gauss(0, 0.001)))) for m in mids]
+    opps = [
+        {'symbol': f"S{i}", 'l2_hl': to_orderbook(hl), 'l2_px': to_orderbook(px)}
+        for i, (hl, px) in enumerate(raw)
+    ]
+
+    # Correctness first
+    for hl, _ in raw:
+        for s in SIZES_USD:
+            ref = loop_vwap(hl['asks'], s)
+            new = sim.calculate_vwap(hl['asks'], s)
+            assert (ref is None) == (new is None)
+            assert ref is None or abs(ref - new) <= 1e-9 * ref
+
+    # Both sides of the comparison walk the same OrderBook arrays the executor sees
+    levels = opps[0]['l2_hl']['asks']
+    n_points = SYMBOLS * len(SIZES_USD) * 4
+
+    rows = []
+    for label, size in (("single VWAP, shallow fill ($1k)", 1_000.0), ("single VWAP, deep fill ($50k)", 50_000.0)):
+        t_loop = timeit(lambda: loop_vwap(levels, size), 2000)
+        t_vec = timeit(lambda: sim.calculate_vwap(levels, size), 2000)
+        rows.append((label, t_loop, t_vec))
+
+    def loop_curve():
+        for o in opps:
+            for s in SIZES_USD:
+                loop_vwap(o['l2_hl']['bids'], s)
+                loop_vwap(o['l2_hl']['asks'], s)
+                loop_vwap(o['l2_px']['bids'], s)
+                loop_vwap(o['l2_px']['asks'], s)
+    t_loop_all = timeit(loop_curve, 3)
+    t_vec_all = timeit(lambda: sim.simulate_batch(opps, SIZES_USD), 20)
+    rows.append((f"full curve ({SYMBOLS} syms x {len(SIZES_USD)} sizes x 4 sides)", t_loop_all, t_vec_all))
+
+    table = Table(title="VWAP depth walk: loop vs vectorized")
+    table.add_column("Case", style="cyan")
+    table.add_column("Loop", justify="right")
+    table.add_column("NumPy", justify="right", style="green")
+    table.add_column("Speedup", justify="right", style="yellow")
+    for name, t_loop, t_vec in rows:
+        table.add_row(name, f"{t_loop * 1e6:,.1f} us", f"{t_vec * 1e6:,.1f} us", f"{t_loop / t_vec:.1f}x")
+    console.print(table)
+    console.print(f"Batched: {n_points / t_vec_all / 1e6:.2f}M VWAP points/s")
+
+if __name__ == "__main__":
+    main()
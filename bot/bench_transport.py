@@ -0,0 +1,145 @@
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+import aiohttp
+from aiohttp import web
+from rich.console import Console
+from rich.table import Table
+from core.metrics import LatencyHistogram
+from core.transport import Transport
+from core.universe import Universe
+from core.venues import HyperliquidAdapter
+
+# Benchmark: HL metaAndAssetCtxs poll, legacy aiohttp session + json.loads + full-listing
+# scan vs pooled Transport + orjson + cached scanned slots.
+# A stub server in a separate process serves the payload, so CPU time is client only.
+# /tail/info delays TAIL_P of the requests by TAIL_DELAY_SEC (hedging case).
+# Usage: python bot/bench_transport.py
+
+console = Console()
+
+PORT = 8799
+ASSETS = 220          # HL lists ~200 perps
+SCANNED = 40
+REQUESTS = 400
+TAIL_P = 0.03
+TAIL_DELAY_SEC = 0.5
+HEDGE_AFTER_SEC = 0.05
+
+def make_payload() -> bytes:
+    universe = [{"name": f"A{i:03d}", "szDecimals": 2, "maxLeverage": 20} for i in range(ASSETS)]
+    ctxs = []
+    for _ in range(ASSETS):
+        mid = random.uniform(0.01, 50_000)
+        ctxs.append({
+            "funding": f"{random.gauss(0, 1e-5):.8f}", "openInterest": f"{random.uniform(1e3, 1e7):.2f}",
+            "prevDayPx": f"{mid * 0.99:.6f}", "dayNtlVlm": f"{random.uniform(1e5, 1e9):.2f}",
+            "premium": f"{random.gauss(0, 1e-4):.8f}", "oraclePx": f"{mid:.6f}", "markPx": f"{mid:.6f}",
+            "midPx": f"{mid:.6f}", "impactPxs": [f"{mid * 0.9999:.6f}", f"{mid * 1.0001:.6f}"]
+        })
+    return json.dumps([{"universe": universe}, ctxs]).encode()
+
+def serve(port: int, ready):
+    body = make_payload()
+
+    async def info(request):
+        await request.read()
+        return web.Response(body=body, content_type="application/json")
+
+    async def tail_info(request):
+        await request.read()
+        if random.random() < TAIL_P:
+            await asyncio.sleep(TAIL_DELAY_SEC)
+        return web.Response(body=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_post("/info", info)
+    app.router.add_post("/tail/info", tail_info)
+
+    async def main():
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        ready.set()
+        await asyncio.Event().wait()
+    asyncio.run(main())
+
+async def legacy_fetch(session, url: str, lookup: dict) -> dict:
+    """Reference: the original Scanner.fetch_hl_data path"""
+    async with session.post(url, json={"type": "metaAndAssetCtxs"}) as resp:
+        if resp.status != 200: return {}
+        raw = await resp.read()
+        data = json.loads(raw)
+        universe = data[0]['universe']
+        ctxs = data[1]
+        market_data = {}
+        for i, u in enumerate(universe):
+            entry = lookup.get(u['name'])
+            if entry:
+                market_data[entry[0]] = {"price": float(ctxs[i]['midPx']), "funding": float(ctxs[i].get('funding', 0.0))}
+        return market_data
+
+async def run(fetch, n: int) -> tuple:
+    """(latency histogram, CPU seconds) for n sequential polls after a warm-up"""
+    for _ in range(10):
+        await fetch()
+    hist = LatencyHistogram()
+    cpu0 = time.process_time()
+    for _ in range(n):
+        t0 = time.perf_counter_ns()
+        quotes = await fetch()
+        hist.record(time.perf_counter_ns() - t0)
+        assert len(quotes) == SCANNED
+    return hist, time.process_time() - cpu0
+
+async def bench():
+    symbols = [f"A{i:03d}" for i in sorted(random.sample(range(ASSETS), SCANNED))]
+    universe = Universe(mode="STATIC", static=symbols, venues=["hl"])
+    base = f"http://127.0.0.1:{PORT}"
+    rows = []
+    for label, path in (("steady", "/info"), (f"tail ({TAIL_P:.0%} +{TAIL_DELAY_SEC * 1e3:.0f}ms)", "/tail/info")):
+        url = base + path
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as session:
+            legacy = await run(lambda: legacy_fetch(session, url, universe.lookup['hl']), REQUESTS)
+
+        http = Transport(hedge_after=HEDGE_AFTER_SEC)
+        adapter = HyperliquidAdapter(universe)
+        adapter.api_url = url
+        try:
+            tuned = await run(lambda: adapter.fetch_quotes(http), REQUESTS)
+        finally:
+            await http.close()
+        rows.append((label, legacy, tuned, http.hedged))
+
+    table = Table(title=f"HL snapshot poll ({ASSETS} assets, {SCANNED} scanned, {REQUESTS} requests)")
+    table.add_column("Case", style="cyan")
+    table.add_column("Client", style="cyan")
+    table.add_column("p50", justify="right")
+    table.add_column("p99", justify="right")
+    table.add_column("max", justify="right")
+    table.add_column("CPU / req", justify="right", style="yellow")
+    table.add_column("Hedged", justify="right")
+    for label, (l_hist, l_cpu), (t_hist, t_cpu), hedged in rows:
+        for name, hist, cpu, h in (("legacy", l_hist, l_cpu, "-"), ("transport", t_hist, t_cpu, str(hedged))):
+            p50, p99 = hist.percentiles([50, 99])
+            table.add_row(
+                label, name, f"{p50 / 1e3:,.0f} us", f"{p99 / 1e3:,.0f} us", f"{hist.max / 1e3:,.0f} us",
+                f"{cpu / REQUESTS * 1e6:,.0f} us", h
+            )
+    console.print(table)
+
+def main():
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=serve, args=(PORT, ready), daemon=True)
+    server.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("stub server did not start")
+        asyncio.run(bench())
+    finally:
+        server.terminate()
+
+if __name__ == "__main__":
+    main()
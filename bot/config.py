@@ -14,18 +14,171 @@ STRATEGY_MAP = {
 # Derived list for scanner
 SYMBOLS = list(STRATEGY_MAP.keys())
 
+# Universe
+# - STATIC: scan SYMBOLS only
+# - AUTO: every perp listed on at least two VENUES (unmapped symbols default to CONVERGENCE)
+UNIVERSE_MODE = os.getenv("UNIVERSE", "STATIC")
+UNIVERSE_REFRESH_SEC = 900 # Re-discover listings every 15 min
+# Naming differences: {venue: {native_name: (canonical, price_scale)}}
+# 1000-unit contracts (kPEPE, 1000PEPE -> PEPE, x0.001) are mapped automatically
+SYMBOL_ALIASES = {
+    "hl": {},
+    "px": {},
+    "bn": {}
+}
+BOOK_CANDIDATES_MAX = 8 # AUTO + REST: L2 books polled per venue, closest to the threshold first
+
 # Hyperliquid Params
-HL_API_URL = "https://api.hyperliquid.xyz/info"
+# Override with http://127.0.0.1:8780/info / :8780/exchange to run against mock_exchange.py
+HL_API_URL = os.getenv("HL_API_URL", "https://api.hyperliquid.xyz/info")
+HL_EXCHANGE_URL = os.getenv("HL_EXCHANGE_URL", "https://api.hyperliquid.xyz/exchange")
 
 # Paradex Params
-PARADEX_API_URL = "https://api.prod.paradex.trade/v1"
+# Override with http://127.0.0.1:8781/v1 to run against mock_exchange.py
+PARADEX_API_URL = os.getenv("PARADEX_API_URL", "https://api.prod.paradex.trade/v1")
+
+# Binance USDT-M Params (REST only)
+BINANCE_API_URL = "https://fapi.binance.com/fapi/v1"
+
+# Venues scanned (adapter codes, see core/venues.py)
+# - hl: Hyperliquid, px: Paradex, bn: Binance USDT-M
+VENUES = [v.strip() for v in os.getenv("VENUES", "hl,px").split(",") if v.strip()]
+
+# HTTP Transport (REST venue fetches, see core/transport.py)
+HTTP_POOL_SIZE = 8           # keep-alive connections per venue host
+HTTP_KEEPALIVE_SEC = 30.0    # idle connection lifetime
+HTTP_DNS_TTL_SEC = 300       # resolver cache
+HTTP_TIMEOUT_SEC = 2.0       # per attempt
+HTTP_RETRIES = 1             # extra attempts on timeout / connection error / 5xx (429 = cooldown)
+HTTP_HEDGE_AFTER_SEC = 0.25  # duplicate a read still pending after this long, first answer wins (0 = off)
+# Off by default (macOS Python ships without a CA bundle)
+HTTP_VERIFY_SSL = os.getenv("HTTP_VERIFY_SSL", "0") == "1"
+
+# Polling Scheduler (REST venues, see core/scheduler.py)
+# Each venue is polled on its own cadence inside a token bucket of its public rate limit.
+VENUE_RATE_LIMITS = {"hl": 1200, "px": 1500, "bn": 2400} # request weight per minute (per IP)
+VENUE_QUOTE_WEIGHT = {"hl": 20, "px": 1, "bn": 15}       # full-universe quote snapshot
+VENUE_BOOK_WEIGHT = {"hl": 2, "px": 1, "bn": 2}          # one L2 book
+RATE_BUDGET_FRACTION = 0.8 # share of each limit the bot may spend
+POLL_INTERVAL_HOT = 0.2    # quote snapshot cadence while a symbol on the venue is near the threshold
+POLL_INTERVAL_IDLE = 2.0   # quote snapshot cadence otherwise
+BOOK_INTERVAL_HOT = 0.5    # L2 book cadence for symbols near the threshold
+BOOK_INTERVAL_IDLE = 5.0   # STATIC: remaining CONVERGENCE symbols
+HOT_BAND = 0.1             # % below MIN_PROFIT_THRESHOLD (net of fees) that counts as near
+POLL_BACKOFF_MAX = 30.0    # cap of the exponential backoff after failed polls
+
+# Feed Mode
+# - REST: Poll full-universe snapshots (adaptive cadence, see Polling Scheduler)
+# - WS: Push-based websocket feeds, scan() only reads the in-memory quote table
+FEED_MODE = os.getenv("FEED_MODE", "REST")
+# Override with ws://127.0.0.1:8765 / :8766 to run against replay_ws_server.py
+HL_WS_URL = os.getenv("HL_WS_URL", "wss://api.hyperliquid.xyz/ws")
+PARADEX_WS_URL = os.getenv("PARADEX_WS_URL", "wss://ws.api.prod.paradex.trade/v1")
+# Feed Workers (WS mode, see core/feed_workers.py)
+# 0: websocket feeds parse on the trading loop. N: each websocket venue's symbols are split
+# across N worker processes that own the sockets, parse and keep the books, and push
+# fixed-size records through shared-memory rings the trading loop drains.
+# RECORD_PATH recording needs in-process feeds (0)
+FEED_WORKERS = int(os.getenv("FEED_WORKERS", 0))
+FEED_RING_SLOTS = 8192    # records per worker ring (~5.5 MB at depth 20)
+# Book levels per side carried per update (HL l2Book sends 20). Paradex books are cut to
+# it: sizes needing deeper levels read as too thin (no fill), raise it for larger sizes
+FEED_BOOK_DEPTH = int(os.getenv("FEED_BOOK_DEPTH", 20))
+FEED_POLL_SEC = 0.0005    # ring poll interval while idle
+
+# Quote Alignment
+# Quotes carry an event time (venue timestamp mapped onto the local clock, else receive time).
+# Venues quoting further apart than QUOTE_SKEW_MS are never paired into a spread, and the
+# Executor skips routes whose older leg is past QUOTE_MAX_AGE_MS. REST defaults cover
+# HL's rate-limited snapshot cadence (see Polling Scheduler).
+QUOTE_SKEW_MS = float(os.getenv("QUOTE_SKEW_MS", 500 if FEED_MODE.upper() == "WS" else 1500))
+QUOTE_MAX_AGE_MS = float(os.getenv("QUOTE_MAX_AGE_MS", 2000 if FEED_MODE.upper() == "WS" else 3000))
+CLOCK_WINDOW_SEC = 60 # venue clock offset = min(receive - venue ts) over the last 1-2 windows
+
+# Spread Statistics (see core/spread_stats.py)
+# Every symbol's best-route spread is sampled every SPREAD_SAMPLE_SEC into a rolling
+# window: mean / std, EWMA, z-score and mean-reversion half-life
+SPREAD_SAMPLE_SEC = 1.0
+SPREAD_WINDOW = 900              # samples (15 min)
+SPREAD_EWMA_HALF_LIFE_SEC = 60
+SPREAD_MIN_SAMPLES = 60          # history before z-score thresholds apply
+# Optional z-score gates on CONVERGENCE trades, None = off (MIN_PROFIT_THRESHOLD alone)
+SPREAD_Z_ENTRY = None            # also require the spread >= this many std above its mean
+SPREAD_Z_EXIT = None             # also exit once the held pair's spread z-score <= this
+
+# Price History (see core/history.py): 1-minute OHLC of every venue's mid, built from
+# live quotes and backfilled once from venue candles, served to the chart at /history
+HISTORY_MINUTES = 240            # bars kept per symbol / venue (4h)
+HISTORY_SAMPLE_SEC = 1.0         # mids folded into the current bar this often
+HISTORY_BACKFILL = os.getenv("HISTORY_BACKFILL", "1") == "1"
+
+# Local Data (candle cache, recordings, ...)
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+CANDLE_CACHE_DIR = os.path.join(DATA_DIR, "candles")
+# Set to e.g. bot/data/session.mdlog to record every raw venue update (see replay.py)
+RECORD_PATH = os.getenv("RECORD_PATH")
+
+# Latency Metrics (METRICS=0 disables all timers)
+METRICS_ENABLED = os.getenv("METRICS", "1") == "1"
+METRICS_PATH = os.path.join(DATA_DIR, "metrics.json")
+METRICS_DUMP_INTERVAL = 5.0 # seconds between metrics.json snapshots
+
+# Position / trade journal (see core/journal.py): open positions are reloaded on startup
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", os.path.join(DATA_DIR, "journal.log"))
+JOURNAL_FSYNC_INTERVAL = 0.2     # group commit window: at most this much is lost on a crash
+JOURNAL_ROTATE_BYTES = 64 << 20  # archive + restart from a snapshot past 64 MB
+
+# Dashboard Bus (see core/bus.py): market state, spreads and positions for the Next.js
+# dashboard over SSE (/stream) and JSON (/snapshot). Point NEXT_PUBLIC_BOT_URL at it
+BUS_ENABLED = os.getenv("BUS", "1") == "1"
+BUS_HOST = os.getenv("BUS_HOST", "127.0.0.1")
+BUS_PORT = int(os.getenv("BUS_PORT", 8790))
+BUS_ORIGIN = os.getenv("BUS_ORIGIN", "*") # CORS origin allowed to read the bus
+BUS_BACKLOG = 64                 # frames queued per viewer before it is resynced from a snapshot
+BUS_PING_SEC = 15                # keep-alive comment on an idle stream
+
+# Execution (see core/execution.py)
+# - PAPER: Executor only tracks positions
+# - LIVE: entries/exits send IOC orders on both legs concurrently (hl, px)
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "PAPER")
+HL_PRIVATE_KEY = os.getenv("HL_PRIVATE_KEY")       # API wallet key (EIP-712 order signing)
+HL_VAULT_ADDRESS = os.getenv("HL_VAULT_ADDRESS")   # trade for a vault / subaccount, None = own account
+PARADEX_JWT = os.getenv("PARADEX_JWT")             # bearer token from Paradex /auth
+PARADEX_UNSIGNED = os.getenv("PARADEX_UNSIGNED", "0") == "1" # trade px without a signer hook (mock exchange)
+ORDER_SLIPPAGE = 0.002          # IOC limit = expected fill price +- 0.2%
+UNWIND_SLIPPAGE = 0.01          # IOC limit when flattening an unhedged leg
+ORDER_TIMEOUT_SEC = 2.0         # order send + fill confirmation
+LEG_IMBALANCE_TOLERANCE = 0.05  # unhedged share of the target size left in place (rounding dust)
+ENTRY_BACKOFF_SEC = 60          # no new entry on a symbol this long after a FAILED / UNHEDGED one
+# Order signing (see core/signing.py, bench_signing.py): NONE signs on the event loop
+# (cached digest, ~0.07ms per HL order). THREAD / PROCESS move the ECDSA step / signer
+# hook to a pool so both legs sign in parallel: only worth it for slow signers, the
+# pool hop costs more than one HL signature
+SIGNING_POOL = os.getenv("SIGNING_POOL", "NONE")
+SIGNING_WORKERS = 2
 
 # Fee Configuration (Taker)
 TAKER_FEE_HL = 0.00025 # 0.025%
 TAKER_FEE_PX = 0.0     # 0.0% (No Fees)
+TAKER_FEE_BN = 0.0005  # 0.05%
+VENUE_FEES = {"hl": TAKER_FEE_HL, "px": TAKER_FEE_PX, "bn": TAKER_FEE_BN}
+# Hours one quoted funding rate covers (HL pays hourly, Paradex / Binance quote 8h rates).
+# MarketState divides by it, so every funding figure past the feeds is per hour
+FUNDING_INTERVAL_HOURS = {"hl": 1, "px": 8, "bn": 8}
+# Funding carry (see core/funding.py), rates as fractions of notional per hour
+FUNDING_SAMPLE_SEC = 60            # one history sample per symbol / venue per minute
+FUNDING_WINDOW = 480               # samples kept per symbol / venue (8h)
+FUNDING_HALF_LIFE_SEC = 3600       # EWMA half-life of the carry forecast
+FUNDING_MIN_SAMPLES = 5            # history a venue needs before its forecast is traded
+FUNDING_ENTRY_THRESHOLD = 0.00001  # forecast net carry to enter: 0.001%/h (~8.8% APR)
+FUNDING_EXIT_THRESHOLD = 0.0       # exit once the held pair's forecast carry drops to this
+FUNDING_HORIZON_HOURS = 24         # forecast carry over this hold must cover round-trip fees
+PNL_PERSIST_SEC = 300 # journal accrued funding of open positions this often
 
 # General
-REFRESH_RATE = 0.2  # Scan every 200ms (High Frequency)
+REFRESH_RATE = 0.2  # Publish to the dashboard every 200ms (polling runs on its own schedule)
+RENDER_FPS = 4      # Dashboard frames per second (render thread, independent of scanning)
+HEADLESS = os.getenv("HEADLESS", "0") == "1" # No dashboard (servers), same as --headless
 MIN_PROFIT_THRESHOLD = 0.01 # LOW THRESHOLD FOR TESTING (Was 0.20)
 SIMULATION_SIZE_USD = 10 # Amount used to test liquidity/slippage
 EXIT_PROFIT_THRESHOLD = 0.0 # Optimized: Exit at full convergence
@@ -0,0 +1,289 @@
+import asyncio
+import math
+import time
+import numpy as np
+from aiohttp import web
+from config import BUS_HOST, BUS_PORT, BUS_ORIGIN, BUS_BACKLOG, BUS_PING_SEC
+from core.transport import dumps
+from core.history import OPEN, HIGH, LOW, CLOSE, MINUTE_MS
+
+# Dashboard bus: the bot's market state, spreads and positions for any number of
+# local viewers (the Next.js dashboard), so browsers never poll the venues.
+#   GET /stream    Server-Sent Events: a "snapshot" event, then "delta" events
+#   GET /snapshot  the full state as JSON (ETag = process epoch + seq, 304 when unchanged)
+#   GET /history?symbol=BTC[&since=ms]  1-minute OHLC bars (MarketState.history) from
+#                  since's minute on, {"symbol", "minute" (open bar), "t": [ms],
+#                  "bars": {venue: {"o", "h", "l", "c"}}}; ETag = history version
+# Every event carries seq; a delta applies to the state of seq - 1 only.
+#   snapshot {"seq", "ts", "venues", "markets": {symbol: row}, "positions", "pnl"}
+#   delta    {"seq", "ts", "markets": {symbol: changed fields}, "removed": [symbol],
+#             "positions" / "pnl" (whole, only when changed)}
+# A market row is flat: <venue>_price / _bid / _ask / _funding (hourly fraction),
+# spread, buy, sell, funding_diff, carry, z, status. null = unknown.
+
+def num(x):
+    """JSON-safe float: NaN / inf -> None"""
+    return x if x is not None and math.isfinite(x) else None
+
+def market_row(opp) -> dict:
+    row = {}
+    for venue in opp.venues:
+        quoted = opp.has(venue)
+        book = opp.book(venue)
+        row[f"{venue}_price"] = opp.price(venue) if quoted else None
+        row[f"{venue}_bid"] = book.best_bid if book else None
+        row[f"{venue}_ask"] = book.best_ask if book else None
+        row[f"{venue}_funding"] = opp.funding(venue) if quoted else None
+    carry, short, long = opp.carry_route()
+    row.update({
+        "spread": opp.spread,
+        "buy": opp.buy_venue,
+        "sell": opp.sell_venue,
+        "funding_diff": opp.funding_diff,
+        "carry": carry if short is not None else None,
+        "z": num(opp.zscore),
+        "status": opp.status
+    })
+    return row
+
+def position_row(pos: dict, pnl: dict = None) -> dict:
+    row = {
+        "strategy": pos.get("strategy"),
+        "short": pos.get("short_venue"),
+        "long": pos.get("long_venue"),
+        "entry_time": pos.get("entry_time"),
+        "entry_spread": pos.get("entry_spread"),
+        "entry_short": pos.get("fill_short") or pos.get("entry_short"),
+        "entry_long": pos.get("fill_long") or pos.get("entry_long")
+    }
+    if pnl:
+        row.update(pnl)
+    return row
+
+def frame(event: str, seq: int, message: dict) -> bytes:
+    return f"event: {event}\nid: {seq}\ndata: {dumps(message)}\n\n".encode()
+
+
+class Viewer:
+    """One /stream connection: frames queued for its writer, at most backlog"""
+    __slots__ = ('queue', 'resync')
+
+    def __init__(self, backlog: int):
+        self.queue = asyncio.Queue(backlog)
+        self.resync = False
+
+
+class SnapshotBus:
+    """
+    In-memory snapshot of what the trading loop publishes, fanned out as deltas.
+    publish() is called with the loop's references every REFRESH_RATE. With no
+    viewer it only keeps them (rows are built when /snapshot asks); with viewers
+    each publish diffs the new rows against the last ones field by field and
+    encodes one delta frame, written as-is to every viewer (one encode per tick
+    however many tabs are open). seq only moves when something changed, so it
+    doubles as the /snapshot ETag.
+    A viewer whose backlog fills up (slow or stalled tab) is dropped back to a
+    fresh snapshot instead of buffering without bound.
+    """
+    def __init__(self, market=None, host: str = BUS_HOST, port: int = BUS_PORT, origin: str = BUS_ORIGIN,
+                 backlog: int = BUS_BACKLOG, ping_sec: float = BUS_PING_SEC):
+        self.market = market          # MarketState, for /history
+        self.epoch = f"{int(time.time()):x}" # ETag prefix: seq / versions restart with the process
+        self.host = host
+        self.port = port
+        self.origin = origin
+        self.backlog = backlog
+        self.ping_sec = ping_sec
+        self.source = ({}, {}, None)  # last published (opps, positions, pnl summary)
+        # Rows as of seq: {symbol: row}, {symbol: position row}, PnL totals
+        self.markets = {}
+        self.positions = {}
+        self.pnl = {}
+        self.seq = 0
+        self.stale = False            # published since the rows were last built
+        self.cached = None            # (seq, snapshot message) for /snapshot and new viewers
+        self.bars = (None, {})        # (history version, {(symbol, since minute): body})
+        self.viewers = set()
+        self.runner = None
+        self.frames = 0
+
+    # Trading loop side
+    def publish(self, opps: dict, positions: dict, pnl: dict = None):
+        self.source = (opps, positions, pnl)
+        if not self.viewers:
+            self.stale = True # nobody to stream to: rows are rebuilt when asked for
+            return
+        # Diff against the rows at seq (also right if they were built before a quiet spell)
+        self.stale = False
+        markets, positions, totals = self.rows()
+        changed = {}
+        for symbol, row in markets.items():
+            old = self.markets.get(symbol)
+            if old is None:
+                changed[symbol] = row
+                continue
+            fields = {k: v for k, v in row.items() if old.get(k) != v}
+            if fields:
+                changed[symbol] = fields
+        removed = [symbol for symbol in self.markets if symbol not in markets]
+        delta = {}
+        if changed:
+            delta["markets"] = changed
+        if removed:
+            delta["removed"] = removed
+        if positions != self.positions:
+            delta["positions"] = positions
+        if totals != self.pnl:
+            delta["pnl"] = totals
+        self.markets, self.positions, self.pnl = markets, positions, totals
+        if not delta:
+            return
+        self.seq += 1
+        self.broadcast(frame("delta", self.seq, {"seq": self.seq, "ts": int(time.time() * 1000), **delta}))
+
+    def rows(self) -> tuple:
+        opps, positions, pnl = self.source
+        # Views read the market columns live: NaN-safe floats for the JSON
+        markets = {symbol: {k: num(v) if isinstance(v, float) else v for k, v in market_row(opp).items()}
+                   for symbol, opp in opps.items()}
+        pnl = pnl or {}
+        by_symbol = pnl.get("positions", {})
+        rows = {symbol: position_row(pos, by_symbol.get(symbol)) for symbol, pos in positions.items()}
+        totals = {k: pnl[k] for k in ("realized", "unrealized", "total") if k in pnl}
+        return markets, rows, totals
+
+    def refresh(self):
+        """Rebuild the rows from the last publish, a new seq only if anything differs"""
+        current = self.rows()
+        if current != (self.markets, self.positions, self.pnl):
+            self.markets, self.positions, self.pnl = current
+            self.seq += 1
+        self.stale = False
+
+    def state(self) -> dict:
+        """Full snapshot message at the current seq"""
+        if self.stale:
+            self.refresh()
+        if self.cached is None or self.cached[0] != self.seq:
+            opps = self.source[0]
+            self.cached = (self.seq, {
+                "seq": self.seq, "ts": int(time.time() * 1000),
+                "venues": next(iter(opps.values())).venues if opps else [],
+                "markets": self.markets, "positions": self.positions, "pnl": self.pnl
+            })
+        return self.cached[1]
+
+    def broadcast(self, data: bytes):
+        self.frames += 1
+        for viewer in self.viewers:
+            if viewer.resync:
+                continue
+            try:
+                viewer.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                # Drop the stale backlog, the writer sends a fresh snapshot instead
+                viewer.resync = True
+                while not viewer.queue.empty():
+                    viewer.queue.get_nowait()
+                viewer.queue.put_nowait(None)
+
+    # HTTP side
+    def headers(self) -> dict:
+        # Cross-origin pages may only read the ETag they send back if it is exposed
+        return {"Access-Control-Allow-Origin": self.origin, "Access-Control-Expose-Headers": "ETag",
+                "Cache-Control": "no-cache"}
+
+    async def handle_options(self, request: web.Request) -> web.Response:
+        """CORS preflight: If-None-Match is not a simple header"""
+        return web.Response(status=204, headers={
+            "Access-Control-Allow-Origin": self.origin,
+            "Access-Control-Allow-Methods": "GET",
+            "Access-Control-Allow-Headers": "If-None-Match",
+            "Access-Control-Max-Age": "86400"
+        })
+
+    async def handle_snapshot(self, request: web.Request) -> web.Response:
+        message = self.state()
+        tag = f'"{self.epoch}-{message["seq"]}"'
+        headers = {**self.headers(), "ETag": tag}
+        if request.headers.get("If-None-Match") == tag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=dumps(message), content_type="application/json", headers=headers)
+
+    async def handle_history(self, request: web.Request) -> web.Response:
+        symbol = request.query.get("symbol", "")
+        i = self.market.index.get(symbol) if self.market is not None else None
+        if i is None:
+            return web.json_response({"error": f"unknown symbol {symbol!r}"}, status=404, headers=self.headers())
+        try:
+            since = int(request.query["since"]) // MINUTE_MS * MINUTE_MS if "since" in request.query else None
+        except ValueError:
+            return web.json_response({"error": "since must be a ms timestamp"}, status=400, headers=self.headers())
+
+        history = self.market.history
+        tag = f'"{self.epoch}-{history.version}"'
+        headers = {**self.headers(), "ETag": tag}
+        if request.headers.get("If-None-Match") == tag:
+            return web.Response(status=304, headers=headers)
+        # Every chart polling the same symbol between two samples gets the same encoded body
+        version, bodies = self.bars
+        if version != history.version:
+            bodies = {}
+            self.bars = (history.version, bodies)
+        body = bodies.get((symbol, since))
+        if body is None:
+            body = bodies[(symbol, since)] = dumps(self.history_message(symbol, i, since))
+        return web.Response(text=body, content_type="application/json", headers=headers)
+
+    def history_message(self, symbol: str, i: int, since: int = None) -> dict:
+        history = self.market.history
+        t, bars = history.query(i, since)
+        out = {}
+        for v, venue in enumerate(self.market.venues):
+            venue_bars = bars[v]
+            if len(t) and not np.isnan(venue_bars[:, CLOSE]).all():
+                # orjson writes NaN (minutes without a bar) as null
+                out[venue] = {k: venue_bars[:, f].tolist() for k, f in
+                              (("o", OPEN), ("h", HIGH), ("l", LOW), ("c", CLOSE))}
+        minute = history.minute * MINUTE_MS if history.minute is not None else None
+        return {"symbol": symbol, "minute": minute, "t": t.tolist(), "bars": out}
+
+    async def handle_stream(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={
+            **self.headers(), "Content-Type": "text/event-stream", "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
+        viewer = Viewer(self.backlog)
+        self.viewers.add(viewer)
+        try:
+            data = None # first frame: snapshot
+            while True:
+                if data is None:
+                    viewer.resync = False
+                    message = self.state()
+                    data = frame("snapshot", message["seq"], message)
+                await response.write(data)
+                try:
+                    data = await asyncio.wait_for(viewer.queue.get(), self.ping_sec)
+                except asyncio.TimeoutError:
+                    data = b": ping\n\n" # keeps proxies from closing an idle stream
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.viewers.discard(viewer)
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/snapshot", self.handle_snapshot)
+        app.router.add_get("/stream", self.handle_stream)
+        app.router.add_get("/history", self.handle_history)
+        app.router.add_route("OPTIONS", "/{tail:.*}", self.handle_options)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
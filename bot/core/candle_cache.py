@@ -0,0 +1,207 @@
+import os
+import time
+from datetime import datetime, timezone
+import numpy as np
+from config import CANDLE_CACHE_DIR
+
+# One append-only binary file per venue/symbol/interval, read back as a memmap.
+# Only closed candles are stored; each sync fetches the tail after the last stored one.
+# <interval>.origin next to it holds the venue's first candle once a head fetch found
+# nothing older, so a symbol listed inside the lookback is not re-asked every sync.
+CANDLE_DTYPE = np.dtype([
+    ('t', '<i8'), # open time (ms)
+    ('o', '<f8'),
+    ('h', '<f8'),
+    ('l', '<f8'),
+    ('c', '<f8'),
+    ('v', '<f8')
+])
+
+# "M" (calendar month) is the shortest month: as a cursor step it never skips a candle
+INTERVAL_MS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000, "M": 28 * 86_400_000}
+
+def interval_ms(interval: str) -> int:
+    """'15m' -> 900000"""
+    return int(interval[:-1]) * INTERVAL_MS[interval[-1]]
+
+def last_closed_ms(interval: str, now_ms: int) -> int:
+    """Open time of the last closed candle (months open on the 1st, UTC)"""
+    if interval[-1] == "M":
+        today = datetime.fromtimestamp(now_ms / 1000, timezone.utc)
+        k = today.year * 12 + today.month - 1 - int(interval[:-1])
+        return int(datetime(k // 12, k % 12 + 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+    step = interval_ms(interval)
+    return (now_ms // step) * step - step
+
+
+async def fetch_hl_page(session, symbol: str, interval: str, start_ms: int, end_ms: int) -> np.ndarray:
+    """Hyperliquid candleSnapshot (max 5000 candles per call)"""
+    payload = {
+        "type": "candleSnapshot",
+        "req": {"coin": symbol, "interval": interval, "startTime": start_ms, "endTime": end_ms}
+    }
+    async with session.post("https://api.hyperliquid.xyz/info", json=payload) as resp:
+        if resp.status != 200:
+            raise IOError(f"HL candles {symbol} {interval}: HTTP {resp.status}")
+        data = await resp.json()
+    out = np.empty(len(data), dtype=CANDLE_DTYPE)
+    for i, c in enumerate(data):
+        out[i] = (c['t'], float(c['o']), float(c['h']), float(c['l']), float(c['c']), float(c['v']))
+    return out
+
+async def fetch_binance_page(session, symbol: str, interval: str, start_ms: int, end_ms: int) -> np.ndarray:
+    """Binance USDT-M klines (max 1500 rows per call)"""
+    params = {
+        "symbol": f"{symbol}USDT",
+        "interval": interval,
+        "startTime": start_ms,
+        "endTime": end_ms,
+        "limit": 1500
+    }
+    async with session.get("https://fapi.binance.com/fapi/v1/klines", params=params) as resp:
+        if resp.status != 200:
+            raise IOError(f"Binance klines {symbol} {interval}: HTTP {resp.status}")
+        data = await resp.json()
+    out = np.empty(len(data), dtype=CANDLE_DTYPE)
+    for i, k in enumerate(data):
+        out[i] = (k[0], float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+    return out
+
+FETCHERS = {
+    "hl": fetch_hl_page,
+    "binance": fetch_binance_page
+}
+
+
+class CandleCache:
+    def __init__(self, root: str = CANDLE_CACHE_DIR):
+        self.root = root
+
+    def path(self, venue: str, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, venue, symbol, f"{interval}.bin")
+
+    def load(self, venue: str, symbol: str, interval: str) -> np.ndarray:
+        """All cached candles (read-only memmap), oldest first"""
+        path = self.path(venue, symbol, interval)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        n = os.path.getsize(path) // CANDLE_DTYPE.itemsize # ignore a torn last record
+        if n == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(n,))
+
+    def origin(self, venue: str, symbol: str, interval: str) -> int:
+        """Venue's first candle when known (a head fetch found nothing older), else None"""
+        path = self.path(venue, symbol, interval)[:-len(".bin")] + ".origin"
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return int(f.read().strip() or 0) or None
+
+    def set_origin(self, venue: str, symbol: str, interval: str, t: int):
+        path = self.path(venue, symbol, interval)[:-len(".bin")] + ".origin"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(str(int(t)))
+
+    def last_ts(self, venue: str, symbol: str, interval: str) -> int:
+        data = self.load(venue, symbol, interval)
+        return int(data['t'][-1]) if len(data) else None
+
+    def append(self, venue: str, symbol: str, interval: str, candles: np.ndarray) -> int:
+        """Append candles strictly newer than the last stored one. Returns rows written."""
+        last = self.last_ts(venue, symbol, interval)
+        if last is not None:
+            candles = candles[candles['t'] > last]
+        if len(candles) == 0:
+            return 0
+        candles = np.sort(candles, order='t')
+        # Drop duplicate open times within the batch (page overlaps)
+        keep = np.ones(len(candles), dtype=bool)
+        keep[1:] = candles['t'][1:] != candles['t'][:-1]
+        candles = candles[keep]
+
+        path = self.path(venue, symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Truncate a torn record from a crashed write before appending
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            if size % CANDLE_DTYPE.itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(size - size % CANDLE_DTYPE.itemsize)
+        with open(path, 'ab') as f:
+            f.write(candles.astype(CANDLE_DTYPE).tobytes())
+        return len(candles)
+
+    def window(self, venue: str, symbol: str, interval: str, start_ms: int, end_ms: int = None) -> np.ndarray:
+        data = self.load(venue, symbol, interval)
+        lo = np.searchsorted(data['t'], start_ms)
+        hi = len(data) if end_ms is None else np.searchsorted(data['t'], end_ms, side='right')
+        return data[lo:hi]
+
+    async def sync(self, session, venue: str, symbol: str, interval: str, days: float, offline: bool = False) -> np.ndarray:
+        """
+        Make sure the last `days` of closed candles are on disk, fetching only the
+        missing tail (paginated), then return that window from disk.
+        Network errors fall back to whatever is cached.
+        """
+        step = interval_ms(interval)
+        now = int(time.time() * 1000)
+        start = now - int(days * 86_400_000)
+        last_closed = last_closed_ms(interval, now)
+
+        cached = self.load(venue, symbol, interval)
+        if not offline and session is not None:
+            fetch = FETCHERS[venue]
+            try:
+                # Head: a longer lookback than we have on disk (rare, rewrites the file),
+                # unless the venue is known to have nothing older
+                first = int(cached['t'][0]) if len(cached) else None
+                origin = self.origin(venue, symbol, interval)
+                if first is not None and first > start + step and (origin is None or first > origin):
+                    head = await self._fetch_range(fetch, session, symbol, interval, start, first - step, step)
+                    if len(head):
+                        self._rewrite(venue, symbol, interval, np.concatenate([head, np.asarray(cached)]))
+                    earliest = int(head['t'][0]) if len(head) else first
+                    if earliest > start + step:
+                        self.set_origin(venue, symbol, interval, earliest)
+
+                # Tail: everything closed since the last stored candle. A cache that
+                # ends before the window is replaced, not extended across the gap
+                last = self.last_ts(venue, symbol, interval)
+                cursor = start if last is None or last < start else last + step
+                tail = await self._fetch_range(fetch, session, symbol, interval, cursor, last_closed, step)
+                if last is not None and last < start:
+                    if len(tail):
+                        self._rewrite(venue, symbol, interval, tail)
+                else:
+                    self.append(venue, symbol, interval, tail)
+            except Exception:
+                # Offline / rate limited: serve from disk
+                pass
+
+        return self.window(venue, symbol, interval, start)
+
+    async def _fetch_range(self, fetch, session, symbol: str, interval: str, start: int, end: int, step: int) -> np.ndarray:
+        """Page through [start, end] (candle open times), following the venue's row limit"""
+        pages = []
+        cursor = start
+        while cursor <= end:
+            page = await fetch(session, symbol, interval, cursor, end + step - 1)
+            page = page[(page['t'] >= cursor) & (page['t'] <= end)]
+            if len(page) == 0:
+                break
+            pages.append(page)
+            cursor = int(page['t'].max()) + step
+        return np.concatenate(pages) if pages else np.empty(0, dtype=CANDLE_DTYPE)
+
+    def _rewrite(self, venue: str, symbol: str, interval: str, candles: np.ndarray):
+        path = self.path(venue, symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        candles = np.sort(candles, order='t')
+        keep = np.ones(len(candles), dtype=bool)
+        keep[1:] = candles['t'][1:] != candles['t'][:-1]
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(candles[keep].astype(CANDLE_DTYPE).tobytes())
+        os.replace(tmp, path)
@@ -0,0 +1,179 @@
+import math
+import time
+import numpy as np
+from config import VENUES, CLOCK_WINDOW_SEC
+from core.orderbook import OrderBook
+from core.market_state import MarketState, MarketView, Clock
+from core.metrics import METRICS
+
+class VenueClock:
+    """
+    Maps one venue's timestamps onto the local clock.
+    lag = local wall ms - venue ms is clock offset + delivery delay; its minimum
+    over the last one to two windows stands for offset + best-case delivery, so
+    lag - minimum is how much older than a best-case delivery a quote is.
+    """
+    def __init__(self, window: float = CLOCK_WINDOW_SEC):
+        self.window = window
+        self.started = None
+        self.current = math.inf
+        self.previous = math.inf
+
+    def excess_ms(self, lag_ms: float, now: float) -> float:
+        if self.started is None or now - self.started >= self.window:
+            self.previous = self.current if self.started is not None else math.inf
+            self.current = math.inf
+            self.started = now
+        if lag_ms < self.current:
+            self.current = lag_ms
+        return lag_ms - min(self.current, self.previous)
+
+
+class SpreadEngine:
+    """
+    Incremental spread engine over a persistent columnar MarketState.
+    A quote update on one venue/symbol recomputes only that symbol's row
+    and emits its MarketView to subscribers; a full-universe snapshot is one
+    array pass. Unchanged quotes are dropped, so subscribers only see real changes.
+    Views are created once per symbol and read the columns live.
+    Quotes carrying a venue timestamp ('ts', ms) are stamped with the moment they
+    describe on the local clock (VenueClock), others with their receive time.
+    Receive times come from the state's Clock (live, or recorded time in replay).
+    """
+    def __init__(self, symbols: list, venues: list = VENUES, clock: Clock = None):
+        self.symbols = list(symbols)
+        self.venues = list(venues)
+        self.state = MarketState(self.symbols, self.venues, clock=clock)
+        self.clock = self.state.clock
+        # Live L2 books {venue: {symbol: OrderBook}}, updated in place by the feeds / REST snapshots
+        self.books = {venue: {sym: OrderBook() for sym in self.symbols} for venue in self.venues}
+        # {symbol: MarketView}, only scanned symbols
+        self.opps = {sym: self._view(sym) for sym in self.symbols}
+        self.subscribers = []
+        self.updates = 0
+        self.clocks = {venue: VenueClock() for venue in self.venues}
+
+    def _view(self, symbol: str) -> MarketView:
+        return MarketView(self.state, symbol, {venue: books.get(symbol) for venue, books in self.books.items()})
+
+    def event_ns(self, venue: str, quote: dict, recv_ns: int, wall_ms: float) -> int:
+        """Local clock ns the quote describes"""
+        ts = quote.get('ts') if quote is not None else None
+        if not ts:
+            return recv_ns
+        excess = self.clocks[venue].excess_ms(wall_ms - ts, wall_ms / 1000)
+        return recv_ns - int(excess * 1e6)
+
+    def set_symbols(self, symbols: list):
+        """Universe refresh: new symbols get rows + books, delisted rows are cleared"""
+        self.symbols = list(symbols)
+        keep = set(self.symbols)
+        for venue in self.venues:
+            # Same dict objects the feeds hold, so mutate in place
+            for sym in self.symbols:
+                self.books[venue].setdefault(sym, OrderBook())
+        for sym in self.opps:
+            if sym not in keep:
+                self.state.clear(self.state.index[sym])
+        # Swap (not mutate) so a render thread holding the old dict stays valid
+        self.opps = {sym: self.opps.get(sym) or self._view(sym) for sym in self.symbols}
+
+    def subscribe(self, callback):
+        """callback: async fn(opp) called on every symbol change"""
+        self.subscribers.append(callback)
+
+    async def on_quote(self, venue: str, symbol: str, quote: dict):
+        """quote=None clears the venue side (failed fetch / delisted)"""
+        return await self.on_quotes(symbol, {venue: quote})
+
+    async def on_book(self, venue: str, symbol: str, book: OrderBook):
+        """Book already updated in place: re-emit so VWAP gates see the new depth"""
+        return await self.on_quotes(symbol, {}, book_changed=True)
+
+    async def on_quotes(self, symbol: str, updates: dict, book_changed: bool = False):
+        """Apply several venue quotes for one symbol, emit at most once"""
+        opp = self.opps.get(symbol)
+        if opp is None:
+            return None
+        i = opp.i
+        changed = book_changed
+        state = self.state
+        if updates:
+            now = self.clock.perf_ns()
+            wall_ms = self.clock.wall_ns() / 1e6
+            for venue, quote in updates.items():
+                if state.set_quote(i, venue, quote, now, self.event_ns(venue, quote, now, wall_ms)):
+                    changed = True
+        elif not changed:
+            return None
+
+        # Event times always moved, so the aligned route can change without a new price
+        route = (state.sell[i], state.buy[i])
+        if METRICS.enabled:
+            t0 = time.perf_counter_ns()
+            state.recompute_row(i)
+            METRICS.observe("spread", time.perf_counter_ns() - t0)
+        else:
+            state.recompute_row(i)
+        if not changed and route == (state.sell[i], state.buy[i]):
+            return None
+        self.updates += 1
+
+        for callback in self.subscribers:
+            await callback(opp)
+        return opp
+
+    async def on_snapshot(self, quotes: dict, book_changed=()):
+        """
+        Full-universe tick: {venue: {sym: quote}} for the venues polled this tick
+        (missing symbol = None). Columns are overwritten in place and best
+        buy/sell recomputed for every row in one array pass; only symbols whose
+        quotes, aligned route or books changed are emitted.
+        """
+        state = self.state
+        syms = state.symbols
+        n = state.n
+        index = state.index
+        now = self.clock.perf_ns()
+        wall_ms = self.clock.wall_ns() / 1e6
+        nan = float('nan')
+        columns = {}
+        for venue, by_symbol in quotes.items():
+            q = [by_symbol.get(sym) for sym in syms]
+            columns[venue] = np.array([
+                [x['price'] if x is not None else nan for x in q],
+                [x.get('funding', 0.0) if x is not None else nan for x in q],
+                [self.event_ns(venue, x, now, wall_ms) if x is not None else nan for x in q]
+            ], dtype=float).reshape(3, n)
+            received = state.recv[state.venue_index[venue]]
+            for sym in by_symbol:
+                i = index.get(sym)
+                if i is not None:
+                    received[i] = now
+
+        t0 = time.perf_counter_ns() if METRICS.enabled else 0
+        changed = state.load(columns)
+        if book_changed:
+            for sym in book_changed:
+                i = index.get(sym)
+                if i is not None:
+                    changed[i] = True
+        if METRICS.enabled:
+            METRICS.observe("spread.batch", time.perf_counter_ns() - t0)
+
+        emitted = []
+        for i in np.flatnonzero(changed).tolist():
+            opp = self.opps.get(syms[i])
+            if opp is None:
+                continue # delisted row
+            self.updates += 1
+            emitted.append(opp)
+            for callback in self.subscribers:
+                await callback(opp)
+        return emitted
+
+    def snapshot(self) -> list:
+        """Views by |spread| descending, for display only (not on the decision path)"""
+        syms = self.state.symbols
+        opps = self.opps
+        return [opps[syms[i]] for i in self.state.order().tolist() if syms[i] in opps]
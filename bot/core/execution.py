@@ -0,0 +1,189 @@
+import asyncio
+import time
+from config import ORDER_SLIPPAGE, UNWIND_SLIPPAGE, LEG_IMBALANCE_TOLERANCE, PARADEX_UNSIGNED
+from core.orders import ORDER_CLIENTS, Leg, Fill, BUY, SELL, FILLED, ERROR
+from core.metrics import METRICS
+
+# Execution.status
+OPENED = "OPENED"     # hedged size > 0 (imbalance unwound if needed)
+CLOSED = "CLOSED"     # both legs fully closed
+FAILED = "FAILED"     # entry: nothing hedged, any stray fill unwound / exit: some size left open
+UNHEDGED = "UNHEDGED" # an unwind did not complete: manual attention
+
+
+async def no_request():
+    return None
+
+
+class Execution:
+    """Outcome of one two-leg entry or exit"""
+    def __init__(self, symbol: str, short: Fill, long: Fill, unwinds: list, status: str, skew_ns: int):
+        self.symbol = symbol
+        self.short = short
+        self.long = long
+        self.unwinds = unwinds
+        self.status = status
+        self.skew_ns = skew_ns # send start distance between the two legs
+
+    @property
+    def hedged(self) -> float:
+        """Size held on both legs once imbalances were unwound"""
+        return min(self.short.filled, self.long.filled)
+
+    def net(self, fill: Fill) -> float:
+        """Filled size on fill's leg after its unwind"""
+        return fill.filled - sum(u.filled for u in self.unwinds if u.leg.venue == fill.leg.venue)
+
+    def __repr__(self):
+        return f"Execution({self.symbol} {self.status} short={self.short} long={self.long} unwinds={self.unwinds})"
+
+
+class ExecutionEngine:
+    """
+    Two-leg order path for the Executor.
+    Both legs are built and signed first, then sent together with asyncio.gather,
+    so the only thing between the two sends is the event loop hop. After both
+    IOC fills come back an entry is squared:
+      - one leg filled more than the other by more than LEG_IMBALANCE_TOLERANCE
+        of the target: the excess is flattened with a reduce-only IOC at
+        UNWIND_SLIPPAGE on the overfilled venue
+      - a leg whose outcome is unknown (ERROR: timeout, unconfirmed fill) is
+        looked up on its venue first (OrderClient.confirm); if it stays unknown
+        nothing is unwound and the entry is UNHEDGED
+    Exits are not squared: whatever did not fill stays open on its leg and the
+    caller retries the close with the remaining sizes.
+    Per-leg round trips land in METRICS as order.<venue>, the send skew between
+    legs as order.skew.
+    """
+    def __init__(self, clients: dict, slippage: float = ORDER_SLIPPAGE, unwind_slippage: float = UNWIND_SLIPPAGE,
+                 tolerance: float = LEG_IMBALANCE_TOLERANCE):
+        self.clients = clients
+        self.slippage = slippage
+        self.unwind_slippage = unwind_slippage
+        self.tolerance = tolerance
+        self.history = []
+
+    @classmethod
+    def from_config(cls, http, universe, signers: dict = None, **kwargs) -> "ExecutionEngine":
+        """
+        One order client per scanned venue that supports trading. Venues whose
+        orders need a signing hook (Paradex) are left out unless signers has
+        one for them: the exchange would reject every unsigned order, leaving
+        the other leg unhedged (PARADEX_UNSIGNED keeps them, mock exchange only).
+        """
+        signers = signers or {}
+        clients = {}
+        for code in universe.venues:
+            client = ORDER_CLIENTS.get(code)
+            if client is None:
+                continue
+            if not client.needs_signer:
+                clients[code] = client(http, universe)
+            elif code in signers or PARADEX_UNSIGNED:
+                clients[code] = client(http, universe, signer=signers.get(code))
+        return cls(clients, **kwargs)
+
+    async def start(self, symbols: list):
+        await asyncio.gather(*[client.prepare(symbols) for client in self.clients.values()])
+
+    def stop(self):
+        for client in self.clients.values():
+            client.close()
+
+    def supports(self, short: str, long: str) -> bool:
+        return short in self.clients and long in self.clients
+
+    async def open(self, symbol: str, short: str, long: str, size: float, short_px: float, long_px: float) -> Execution:
+        """Sell size on short at >= short_px * (1 - slippage), buy it on long at <= long_px * (1 + slippage)"""
+        sell = Leg(short, symbol, SELL, size, short_px * (1 - self.slippage))
+        buy = Leg(long, symbol, BUY, size, long_px * (1 + self.slippage))
+        return await self.execute(symbol, sell, buy, OPENED)
+
+    async def close(self, symbol: str, short: str, long: str, short_size: float, long_size: float,
+                    short_px: float, long_px: float) -> Execution:
+        """Buy back the short leg, sell the long leg (reduce-only, legs may differ in size)"""
+        cover = Leg(short, symbol, BUY, short_size, short_px * (1 + self.slippage), reduce_only=True)
+        sell = Leg(long, symbol, SELL, long_size, long_px * (1 - self.slippage), reduce_only=True)
+        return await self.execute(symbol, cover, sell, CLOSED)
+
+    async def execute(self, symbol: str, a: Leg, b: Leg, done: str) -> Execution:
+        """a is always the short venue's leg, b the long venue's"""
+        client_a = self.clients[a.venue]
+        client_b = self.clients[b.venue]
+        # Off the send path: both legs are built and signed (in parallel on a
+        # signing pool) before the first byte goes out
+        request_a, request_b = await asyncio.gather(
+            client_a.build_async(a) if a.size > 0 else no_request(),
+            client_b.build_async(b) if b.size > 0 else no_request()
+        )
+
+        starts = [0, 0]
+        async def timed_send(k, client, leg, request):
+            starts[k] = time.perf_counter_ns()
+            if leg.size <= 0:
+                return Fill(leg, FILLED) # leg already closed by an earlier attempt
+            return await client.send(leg, request)
+
+        results = await asyncio.gather(
+            timed_send(0, client_a, a, request_a),
+            timed_send(1, client_b, b, request_b),
+            return_exceptions=True
+        )
+        fills = [
+            r if isinstance(r, Fill) else Fill(leg, ERROR, error=repr(r))
+            for r, leg in zip(results, (a, b))
+        ]
+        skew = abs(starts[1] - starts[0])
+        if METRICS.enabled:
+            METRICS.observe("order.skew", skew)
+            for fill in fills:
+                if fill.latency_ns:
+                    METRICS.observe(f"order.{fill.leg.venue}", fill.latency_ns)
+
+        if fills[0].status == ERROR or fills[1].status == ERROR:
+            fills = await asyncio.gather(*(self.confirm(f, r) for f, r in zip(fills, (request_a, request_b))))
+
+        if done == OPENED:
+            if fills[0].status == ERROR or fills[1].status == ERROR:
+                # Squaring against a guessed size could open what it meant to flatten
+                unwinds = []
+                status = UNHEDGED
+            else:
+                unwinds = await self.square(fills, a.size)
+                if any(u.status != FILLED for u in unwinds):
+                    status = UNHEDGED
+                else:
+                    status = OPENED if min(fills[0].filled, fills[1].filled) > 0 else FAILED
+        else:
+            unwinds = []
+            status = CLOSED if fills[0].status == FILLED and fills[1].status == FILLED else FAILED
+
+        result = Execution(symbol, fills[0], fills[1], unwinds, status, skew)
+        self.history.append(result)
+        if len(self.history) > 200:
+            self.history.pop(0)
+        return result
+
+    async def confirm(self, fill: Fill, request) -> Fill:
+        """ERROR fill -> what the venue says happened to it, the ERROR fill when it cannot tell"""
+        if fill.status != ERROR or request is None:
+            return fill
+        return await self.clients[fill.leg.venue].confirm(fill, request) or fill
+
+    async def square(self, fills: list, target: float) -> list:
+        """Flatten the part of one leg the other did not match"""
+        a, b = fills
+        excess = a.filled - b.filled
+        if abs(excess) <= self.tolerance * target:
+            return []
+        over = a if excess > 0 else b
+        leg = over.leg
+        ref = over.avg_px or leg.limit
+        side = SELL if leg.side == BUY else BUY
+        limit = ref * (1 - self.unwind_slippage) if side == SELL else ref * (1 + self.unwind_slippage)
+        # Reduce-only on entries too: it can only shrink what the excess just opened
+        unwind = Leg(leg.venue, leg.symbol, side, abs(excess), limit, reduce_only=True)
+        fill = await self.clients[leg.venue].submit(unwind)
+        if METRICS.enabled and fill.latency_ns:
+            METRICS.observe(f"order.unwind.{leg.venue}", fill.latency_ns)
+        return [fill]
@@ -1,28 +1,95 @@
 
+import asyncio
+import logging
 import time
 from datetime import datetime
 from rich.console import Console
-from config import MIN_PROFIT_THRESHOLD, EXIT_PROFIT_THRESHOLD, SIMULATION_SIZE_USD, STRATEGY_MAP, TAKER_FEE_HL, TAKER_FEE_PX
+from config import (
+    MIN_PROFIT_THRESHOLD, EXIT_PROFIT_THRESHOLD, SIMULATION_SIZE_USD, STRATEGY_MAP, VENUE_FEES, QUOTE_MAX_AGE_MS,
+    PNL_PERSIST_SEC, FUNDING_ENTRY_THRESHOLD, FUNDING_EXIT_THRESHOLD, FUNDING_HORIZON_HOURS,
+    SPREAD_Z_ENTRY, SPREAD_Z_EXIT, SPREAD_MIN_SAMPLES, ENTRY_BACKOFF_SEC
+)
+from core.simulator import ExecutionSimulator
+from core.venues import direction
+from core.execution import OPENED, CLOSED, UNHEDGED
+from core.orders import FILLED
+from core.pnl import PnLEngine
+from core.metrics import METRICS
+
+logger = logging.getLogger(__name__)
 
 class Executor:
-    def __init__(self):
+    def __init__(self, journal=None):
         self.console = Console()
         self.active_positions = {}
         self.trade_log = []
         self.min_profit = MIN_PROFIT_THRESHOLD
         self.exit_threshold = EXIT_PROFIT_THRESHOLD
         self.trade_size = SIMULATION_SIZE_USD
+        self.max_quote_age = QUOTE_MAX_AGE_MS
+        # Optional z-score gates on CONVERGENCE trades (SpreadStats), None = off
+        self.z_entry = SPREAD_Z_ENTRY
+        self.z_exit = SPREAD_Z_EXIT
+        self.simulator = ExecutionSimulator()
+        # ExecutionEngine for real orders (EXECUTION_MODE=LIVE), None = paper trading
+        self.engine = None
+        # Journal: every open / close / log line is persisted, None = memory only
+        self.journal = journal
+        # Realized / unrealized PnL, marked on every tick of a held symbol
+        self.pnl = PnLEngine(self.trade_size)
+        # Symbols with orders in flight: ticks arriving during the round trip are not evaluated
+        self.pending = set()
+        # Live entries / exits run as their own tasks (the feed never awaits a round trip)
+        self.tasks = set()
+        # {symbol: monotonic time} no entry before it, after a FAILED / UNHEDGED one
+        self.backoff = {}
+        self.backoff_sec = ENTRY_BACKOFF_SEC
+
+    def restore(self):
+        """Open positions + recent log lines from the journal (startup)"""
+        if self.journal is None:
+            return
+        self.active_positions = {symbol: dict(pos) for symbol, pos in self.journal.positions.items()}
+        self.trade_log = list(self.journal.log)
+        self.pnl = PnLEngine(self.trade_size, self.journal.realized)
+        for symbol, pos in self.active_positions.items():
+            self.pnl.open(symbol, pos)
+        if self.active_positions:
+            self.log_trade(f"RESTORED {len(self.active_positions)} open position(s): {', '.join(self.active_positions)}")
         
     def update_settings(self, min_profit, trade_size):
         self.min_profit = float(min_profit)
         self.trade_size = float(trade_size)
+        self.pnl.size_usd = self.trade_size
         self.log_trade(f"CONFIG UPDATED: Min Profit {self.min_profit}% | Size ${self.trade_size}")
 
     def log_trade(self, message):
         timestamp = datetime.now().strftime('%H:%M:%S')
-        self.trade_log.append(f"[{timestamp}] {message}")
+        line = f"[{timestamp}] {message}"
+        self.trade_log.append(line)
         if len(self.trade_log) > 50:
             self.trade_log.pop(0)
+        if self.journal is not None:
+            self.journal.line(line)
+
+    def open_position(self, symbol: str, pos: dict):
+        pos["fees_pct"] = (VENUE_FEES[pos['short_venue']] + VENUE_FEES[pos['long_venue']]) * 100 # per side of the trade
+        pos["notional"] = self.trade_size
+        self.active_positions[symbol] = pos
+        self.pnl.open(symbol, pos)
+        if self.journal is not None:
+            self.journal.open(symbol, pos)
+
+    def persist_funding(self, symbol: str, pos: dict):
+        """Journal the funding accrued so far (it survives restarts), at most every PNL_PERSIST_SEC"""
+        now = time.time()
+        if self.journal is None or now - pos.get('funding_saved', pos['entry_time']) < PNL_PERSIST_SEC:
+            return
+        pnl = self.pnl.get(symbol)
+        if pnl is not None:
+            pos['funding_accrued'] = pnl.funding
+            pos['funding_saved'] = now
+            self.journal.update(symbol, funding_accrued=pnl.funding, funding_saved=now)
 
     async def evaluate_entry(self, opp: dict):
         symbol = opp['symbol']
@@ -30,6 +97,8 @@ class Executor:
         
         if symbol in self.active_positions:
             return "SKIPPED (ACTIVE)"
+        if self.backoff.get(symbol, 0.0) > time.monotonic():
+            return "BACKOFF"
 
         if strategy == "CONVERGENCE":
             return await self.evaluate_convergence(opp)
@@ -39,112 +108,271 @@ class Executor:
         return "WAITING"
     
     async def evaluate_convergence(self, opp):
-        """Standard Buy Low / Sell High"""
+        """Buy the cheapest venue / sell the richest one"""
         spread = opp['spread']
         symbol = opp['symbol']
-        
-        # Fee Logic
-        total_fees = (TAKER_FEE_HL + TAKER_FEE_PX) * 100 # Convert to %
-        net_spread = abs(spread) - total_fees
-        
-        if net_spread >= self.min_profit:
-            direction = "ShortPX_LongHL" if spread > 0 else "ShortHL_LongPX"
-            self.log_trade(f"⚡ SPREAD: {symbol} | Gross: {spread:+.2f}% | Net: {net_spread:+.2f}% | {direction}")
-            
-            self.active_positions[symbol] = {
+        short, long = opp['sell_venue'], opp['buy_venue']
+        if short is None:
+            return "WAITING" # < 2 venues quoting within QUOTE_SKEW_MS
+        if opp['staleness_ms'] > self.max_quote_age:
+            return "STALE" # a leg stopped updating: its price may be long gone
+
+        # Fee Logic (mid-price pre-filter, cheap)
+        total_fees = (VENUE_FEES[short] + VENUE_FEES[long]) * 100 # Convert to %
+        net_spread = spread - total_fees
+        if net_spread < self.min_profit:
+            return "WAITING"
+        # Unusually wide for this symbol, not just wide in absolute terms
+        if self.z_entry is not None:
+            if opp.spread_samples < SPREAD_MIN_SAMPLES:
+                return "WARMING UP"
+            if not opp.zscore >= self.z_entry:
+                return "WAITING"
+
+        route = direction(short, long)
+
+        # VWAP Gate: executable spread for our size after walking both books
+        fill = self.simulator.simulate_pair(opp, short, long, self.trade_size)
+        if not fill:
+            return "NO L2" # No books yet / not enough depth for this size
+
+        vwap_spread = fill['spread_net']
+        if vwap_spread >= self.min_profit:
+            message = f"⚡ SPREAD: {symbol} | Gross: {spread:+.2f}% | Net VWAP: {vwap_spread:+.2f}% | {route}"
+            return self.enter(symbol, {
                 "strategy": "CONVERGENCE",
                 "entry_time": time.time(),
                 "entry_val": spread, 
-                "direction": direction,
+                "direction": route,
+                "short_venue": short,
+                "long_venue": long,
                 "status": "OPEN",
-                "entry_spread": spread
-            }
-            return "OPENED"
+                "entry_spread": spread,
+                "entry_vwap": vwap_spread,
+                "entry_z": opp.zscore,
+                "entry_short": fill['entry_short'],
+                "entry_long": fill['entry_long']
+            }, fill['entry_short'], fill['entry_long'], message)
         return "WAITING"
 
     async def evaluate_funding(self, opp):
         """Capture Positive Funding Rates"""
-        # Goal: Find net positive funding.
-        # If HL Funding > 0 (Pays Short), PX Funding < 0 (Pays Long).
-        # We want to Receive > Pay.
-        
-        hl_funding = opp.get('hl_funding', 0)
-        px_funding = opp.get('px_funding', 0)
-        symbol = opp['symbol']
-        
-        # Scenario A: Short HL / Long PX
-        # Net = HL_Funding (Receive if >0) + PX_Funding (Receive if <0 is paid.. wait. Short pays +funding, Long pays -funding usually)
-        # Correction:
         # Long pays Funding if > 0. Receives if < 0.
         # Short receives Funding if > 0. Pays if < 0.
-        
-        # Strategy A (Short HL / Long PX):
-        # Income = HL_Funding (Recv) - PX_Funding (Pay)
-        income_a = hl_funding - px_funding 
-        
-        # Strategy B (Long HL / Short PX):
-        # Income = -HL_Funding (Pay) + PX_Funding (Recv)
-        income_b = px_funding - hl_funding
-        
-        best_income = max(income_a, income_b)
-        # Threshold: e.g., 0.001% per hour (approx 8% APR)
-        FUNDING_THRESHOLD = 0.001 
-        
-        if best_income > FUNDING_THRESHOLD:
-            direction = "ShortHL_LongPX" if income_a > income_b else "LongHL_ShortPX"
-            fmt_income = best_income * 24 * 365 # APR approx
-            self.log_trade(f"💸 FUNDING: {symbol} | Net APR: {fmt_income:.0f}% | {direction}")
-             
-            self.active_positions[symbol] = {
+        # Best forecast carry across venues: Short the highest, Long the lowest.
+        # Income = Short_Funding (Recv) - Long_Funding (Pay), per hour, EWMA forecast
+        # (FundingTracker) rather than the last print, which can flip next interval
+        symbol = opp['symbol']
+        best_income, short, long = opp.carry_route()
+        if short is None:
+            return "WAITING" # < 2 venues quoting with enough funding history
+
+        # Carry expected over the hold must pay for both legs in and out
+        round_trip = (VENUE_FEES[short] + VENUE_FEES[long]) * 2
+        if best_income > FUNDING_ENTRY_THRESHOLD and best_income * FUNDING_HORIZON_HOURS > round_trip:
+            route = direction(short, long)
+            fmt_income = best_income * 24 * 365 * 100 # APR approx
+            message = f"💸 FUNDING: {symbol} | Carry: {best_income * 100:.4f}%/h | Net APR: {fmt_income:.0f}% | {route}"
+            return self.enter(symbol, {
                 "strategy": "FUNDING",
                 "entry_time": time.time(),
                 "entry_val": best_income,
-                "direction": direction,
+                "direction": route,
+                "short_venue": short,
+                "long_venue": long,
                 "status": "OPEN",
-                "entry_spread": 0.0 # Placeholder
-            }
-            return "OPENED"
+                "entry_spread": opp.pair_spread(short, long),
+                "entry_short": opp.price(short),
+                "entry_long": opp.price(long)
+            }, opp.price(short), opp.price(long), message)
             
         return "WAITING"
 
-    async def check_active_positions(self, current_opps: list):
-        market_map = {o['symbol']: o for o in current_opps}
-        positions_to_close = []
-        
-        for symbol, pos in self.active_positions.items():
-            if symbol not in market_map: continue
-            opp = market_map[symbol]
-            
-            if pos.get("strategy") == "CONVERGENCE":
-                # Exit on Spread Convergence
-                curr_spread_abs = abs(opp['spread'])
-                if curr_spread_abs <= self.exit_threshold:
-                     positions_to_close.append((symbol, "Converged"))
-                     
-            elif pos.get("strategy") == "FUNDING":
-                # Exit if Funding turns negative/unprofitable
-                # Recalculate income same way
-                hl_f = opp.get('hl_funding', 0)
-                px_f = opp.get('px_funding', 0)
-                
-                direction = pos['direction']
-                current_income = 0
-                if direction == "ShortHL_LongPX":
-                    current_income = hl_f - px_f
-                else:
-                    current_income = px_f - hl_f
-                
-                # Close if income drops to 0 or negative
-                if current_income <= 0:
-                    positions_to_close.append((symbol, "Funding Dried Up"))
-
-        for symbol, reason in positions_to_close:
-            await self.close_position(symbol, reason)
-
-    async def close_position(self, symbol: str, reason: str):
-        self.log_trade(f"CLOSE {symbol} | Reason: {reason}")
+    @METRICS.timed("decision")
+    async def on_opportunity(self, opp: dict):
+        """Engine subscriber: only the symbol that changed is evaluated"""
+        if METRICS.enabled:
+            # How old each venue's quote is when we act on it
+            now = opp.state.clock.perf_ns()
+            for venue in opp.venues:
+                received = opp.recv(venue)
+                if received:
+                    METRICS.observe(f"quote_age.{venue}", now - received)
+            if opp.quoted:
+                METRICS.observe("quote_skew", int(opp.skew_ms * 1e6))
+
+        symbol = opp['symbol']
+        if symbol in self.pending:
+            return "PENDING" # the entry / exit awaiting fills decides what we hold
         if symbol in self.active_positions:
-            del self.active_positions[symbol]
+            self.pnl.mark(opp)
+            self.persist_funding(symbol, self.active_positions[symbol])
+            await self.check_position(opp)
+            return "MANAGED"
+        return await self.evaluate_entry(opp)
+
+    async def check_active_positions(self, market: dict):
+        """market: {symbol: view} (SpreadEngine.opps), no per-call rebuild"""
+        for symbol in list(self.active_positions):
+            opp = market.get(symbol)
+            if opp is not None:
+                await self.check_position(opp)
+
+    async def check_position(self, opp: dict):
+        symbol = opp['symbol']
+        pos = self.active_positions.get(symbol)
+        if not pos: return
+        if pos.get("status") == UNHEDGED:
+            return # sizes may not match (or be known): flattened by hand, not by the exit rules
+        reason = None
+
+        if pos.get("strategy") == "CONVERGENCE":
+            # Exit on Spread Convergence of the pair we hold (not the current best route),
+            # never on a leg that stopped updating
+            short, long = pos['short_venue'], pos['long_venue']
+            if opp.pair_age_ms(short, long) > self.max_quote_age:
+                return
+            spread = abs(opp.pair_spread(short, long))
+            if spread <= self.exit_threshold:
+                 reason = "Converged"
+            elif self.z_exit is not None and opp.spread_samples >= SPREAD_MIN_SAMPLES \
+                    and opp.spread_z(spread) <= self.z_exit:
+                reason = "Reverted"
+
+        elif pos.get("strategy") == "FUNDING":
+            # Exit if the forecast carry of the legs we hold turns unprofitable
+            # (one bad print only moves the EWMA part of the way)
+            if not opp.carry_samples(pos['short_venue'], pos['long_venue']):
+                return # a leg has no rate since the restart
+            current_income = opp.carry(pos['short_venue'], pos['long_venue'])
+            if current_income <= FUNDING_EXIT_THRESHOLD:
+                reason = "Funding Dried Up"
+
+        if reason:
+            await self.close_position(symbol, reason, opp)
+
+    def enter(self, symbol: str, pos: dict, short_px: float, long_px: float, message: str) -> str:
+        """Paper: the position is opened now. Live: the two-leg entry is sent from its own task"""
+        if self.engine is None:
+            self.log_trade(message)
+            self.open_position(symbol, pos)
+            return "OPENED"
+        if not self.engine.supports(pos['short_venue'], pos['long_venue']):
+            return "FAILED"
+        self.spawn(symbol, self.enter_live(symbol, pos, short_px, long_px, message))
+        return "SENT"
+
+    async def enter_live(self, symbol: str, pos: dict, short_px: float, long_px: float, message: str):
+        legs = await self.execute_entry(symbol, pos['short_venue'], pos['long_venue'], short_px, long_px)
+        if legs is None:
+            return
+        if pos['strategy'] == "FUNDING":
+            # No VWAP estimate to keep: the entry is what filled
+            pos['entry_short'] = legs['fill_short'] or pos['entry_short']
+            pos['entry_long'] = legs['fill_long'] or pos['entry_long']
+        self.log_trade(message)
+        self.open_position(symbol, {**pos, **legs})
+
+    async def execute_entry(self, symbol: str, short: str, long: str, short_px: float, long_px: float) -> dict:
+        """
+        Both legs sent at once, returns the filled sizes / prices to store in
+        the position, None when nothing was hedged. An UNHEDGED entry still
+        holds whatever filled: it is returned with status UNHEDGED so it is
+        tracked (and journaled) for manual attention, not forgotten.
+        """
+        size = self.trade_size / long_px
+        result = await self.engine.open(symbol, short, long, size, short_px, long_px)
+        if result.status not in (OPENED, UNHEDGED):
+            self.log_trade(f"✘ ENTRY FAILED {symbol}: {result.short} / {result.long}")
+            self.backoff[symbol] = time.monotonic() + self.backoff_sec
+            return None
+        legs = {
+            "size_short": result.net(result.short),
+            "size_long": result.net(result.long),
+            "fill_short": result.short.avg_px,
+            "fill_long": result.long.avg_px
+        }
+        if result.status == UNHEDGED:
+            self.log_trade(f"⚠ UNHEDGED {symbol}: {result} | held for manual attention")
+            legs["status"] = UNHEDGED
+        return legs
+
+    async def close_position(self, symbol: str, reason: str, opp=None):
+        pos = self.active_positions.get(symbol)
+        if not pos or symbol in self.pending:
+            return
+        if self.engine is not None and 'size_short' in pos:
+            if opp is None:
+                return
+            self.spawn(symbol, self.close_live(
+                symbol, reason, pos, opp, opp.price(pos['short_venue']), opp.price(pos['long_venue'])
+            ))
+            return
+        self.finish_close(symbol, reason, pos, opp)
+
+    async def close_live(self, symbol: str, reason: str, pos: dict, opp, short_px: float, long_px: float):
+        result = await self.engine.close(
+            symbol, pos['short_venue'], pos['long_venue'], pos['size_short'], pos['size_long'], short_px, long_px
+        )
+        exit_short, exit_long = result.short.avg_px, result.long.avg_px
+        if result.status != CLOSED:
+            # Residual stays open, the next check retries with what is left
+            partial = self.pnl.reduce(symbol, result.short.filled, result.long.filled, exit_short, exit_long)
+            for leg, fill in (('size_short', result.short), ('size_long', result.long)):
+                pos[leg] = 0.0 if fill.status == FILLED else pos[leg] - fill.filled
+            pos['realized'] = pos.get('realized', 0.0) + partial
+            if self.journal is not None:
+                self.journal.update(symbol, size_short=pos['size_short'], size_long=pos['size_long'], realized=pos['realized'])
+            self.log_trade(f"✘ CLOSE INCOMPLETE {symbol}: {result.short} / {result.long}")
+            return
+        self.finish_close(symbol, reason, pos, opp, exit_short, exit_long)
+
+    def finish_close(self, symbol: str, reason: str, pos: dict, opp=None, exit_short: float = 0.0, exit_long: float = 0.0):
+        pnl = self.pnl.close(symbol, opp, exit_short, exit_long)
+        if pnl:
+            pnl['realized'] += pos.get('realized', 0.0) # earlier partial exits
+        self.log_trade(f"CLOSE {symbol} | Reason: {reason} | PnL ${pnl.get('realized', 0.0):+.2f}")
+        del self.active_positions[symbol]
+        if self.journal is not None:
+            self.journal.close(symbol, reason, pnl=pnl, **self.exit_record(pos, opp))
+
+    def spawn(self, symbol: str, coro):
+        """Run an order round trip as its own task: symbol is pending until it settles"""
+        self.pending.add(symbol)
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(lambda t: self.settled(symbol, t))
+
+    def settled(self, symbol: str, task: asyncio.Task):
+        self.tasks.discard(task)
+        self.pending.discard(symbol)
+        if task.cancelled() or task.exception() is None:
+            return
+        # What the venues hold is unknown: no new entry on it for a while
+        self.backoff[symbol] = time.monotonic() + self.backoff_sec
+        logger.error("Order task for %s failed", symbol, exc_info=task.exception())
+        self.log_trade(f"✘ ORDER ERROR {symbol}: {task.exception()!r}")
+
+    async def drain(self):
+        """Wait for the order tasks still in flight (shutdown)"""
+        if self.tasks:
+            await asyncio.wait(list(self.tasks))
+
+    @staticmethod
+    def exit_record(pos: dict, opp=None) -> dict:
+        """What the journal keeps about an exit besides the entry it already has"""
+        record = {
+            "entry_spread": pos.get('entry_spread'),
+            "fees_pct": pos.get('fees_pct', 0.0) * 2, # round trip
+            "held_sec": time.time() - pos['entry_time']
+        }
+        if opp is not None:
+            short, long = pos['short_venue'], pos['long_venue']
+            record["exit_spread"] = opp.pair_spread(short, long)
+            record["exit_funding"] = opp.funding(short) - opp.funding(long)
+            record["exit_short"] = opp.price(short)
+            record["exit_long"] = opp.price(long)
+        return record
 
     async def process_opportunity(self, opp):
         return await self.evaluate_entry(opp)
@@ -0,0 +1,260 @@
+import asyncio
+import multiprocessing
+import time
+import numpy as np
+from config import FEED_WORKERS, FEED_RING_SLOTS, FEED_BOOK_DEPTH, FEED_POLL_SEC
+from core.ring import SharedRing
+from core.metrics import METRICS
+
+# record kinds
+QUOTE, BOOK = range(2)
+SUPERVISE_SEC = 1.0 # dead workers are respawned this often at most
+
+def record_dtype(depth: int = FEED_BOOK_DEPTH) -> np.dtype:
+    """One parsed update: a quote, or the top `depth` levels of a book (same size, no pickling)"""
+    return np.dtype([
+        ('seq', '<i8'),
+        ('sent', '<i8'),       # worker perf_counter_ns (system-wide monotonic clock)
+        ('symbol', '<i4'),     # index into the shard's symbol list
+        ('kind', 'u1'),
+        ('n_bids', '<u2'),
+        ('n_asks', '<u2'),
+        ('price', '<f8'),
+        ('funding', '<f8'),    # as quoted (MarketState normalizes it)
+        ('ts', '<i8'),         # venue ms, 0 = unknown
+        ('bids', '<f8', (depth, 2)),
+        ('asks', '<f8', (depth, 2))
+    ])
+
+
+class RingWriter:
+    """Worker side: the feed's on_quote / on_book callbacks, writing records instead of touching the engine"""
+    def __init__(self, ring: SharedRing, symbols: list, poll_sec: float = FEED_POLL_SEC):
+        self.ring = ring
+        self.index = {sym: k for k, sym in enumerate(symbols)}
+        self.depth = ring.dtype['bids'].shape[0]
+        self.poll_sec = poll_sec
+
+    async def claim(self, symbol: str, kind: int):
+        record = self.ring.claim()
+        while record is None:
+            # Trading loop is behind: hold the socket (TCP backpressure) rather than drop the latest state
+            await asyncio.sleep(self.poll_sec)
+            record = self.ring.claim()
+        record['symbol'] = self.index[symbol]
+        record['kind'] = kind
+        return record
+
+    async def on_quote(self, venue: str, symbol: str, quote: dict):
+        if quote is None or symbol not in self.index:
+            return
+        record = await self.claim(symbol, QUOTE)
+        record['price'] = quote['price']
+        record['funding'] = quote.get('funding', 0.0)
+        record['ts'] = quote.get('ts', 0) or 0
+        record['sent'] = time.perf_counter_ns()
+        self.ring.commit(record)
+
+    async def on_book(self, venue: str, symbol: str, book):
+        if symbol not in self.index:
+            return
+        record = await self.claim(symbol, BOOK)
+        depth = self.depth
+        bids = book.bids.view()[:depth]
+        asks = book.asks.view()[:depth]
+        record['bids'][:len(bids)] = bids
+        record['asks'][:len(asks)] = asks
+        record['n_bids'] = len(bids)
+        record['n_asks'] = len(asks)
+        record['ts'] = book.ts or 0
+        record['sent'] = time.perf_counter_ns()
+        self.ring.commit(record)
+
+
+def run_shard(venue: str, symbols: list, universe, ring_name: str, slots: int, depth: int, url: str = None):
+    """Worker process entry point: one venue feed over `symbols`, parsed here, records out"""
+    asyncio.run(_run_shard(venue, symbols, universe, ring_name, slots, depth, url))
+
+async def _run_shard(venue, symbols, universe, ring_name, slots, depth, url):
+    # Imported here: the spawned worker only needs the feed side
+    from core.orderbook import OrderBook
+    from core.venues import ADAPTERS
+    ring = SharedRing(record_dtype(depth), slots, ring_name)
+    writer = RingWriter(ring, symbols)
+    books = {sym: OrderBook() for sym in symbols}
+    feed = ADAPTERS[venue].feed_class(
+        symbols, writer.on_quote, url=url, books=books, on_book=writer.on_book, universe=universe
+    )
+    feed.start()
+    try:
+        # Exit with the trading process, even if it died without stopping us
+        parent = multiprocessing.parent_process()
+        while feed._task and not feed._task.done() and (parent is None or parent.is_alive()):
+            await asyncio.sleep(SUPERVISE_SEC)
+    finally:
+        await feed.stop()
+        ring.close()
+
+
+class Shard:
+    __slots__ = ('venue', 'symbols', 'ring', 'process')
+
+    def __init__(self, venue: str, symbols: list, ring: SharedRing):
+        self.venue = venue
+        self.symbols = symbols
+        self.ring = ring
+        self.process = None
+
+
+class FeedWorkers:
+    """
+    Websocket feeds in worker processes (WS mode with FEED_WORKERS > 0).
+    Each websocket venue's symbols are split round-robin into `workers` shards;
+    a shard is one process running the venue's VenueFeed (socket, JSON parsing,
+    book maintenance) whose callbacks write fixed-size records into its own
+    SharedRing. The trading loop only drains the rings: per batch, the last
+    quote and the last book of each symbol are applied to the engine (earlier
+    ones are superseded state), so a burst of large frames costs the decision
+    process one array copy instead of the parsing.
+    Workers are spawned (no forked event loop) and respawned if they die; their
+    books resync from the venue snapshot on reconnect as in-process feeds do.
+    A universe refresh re-shards the venues whose symbol list changed.
+    Books cross the ring as their top `depth` levels: a deeper local book is
+    cut there, so a size that needs more reads as too thin for the book
+    (simulator: no fill) rather than mispriced. Raise FEED_BOOK_DEPTH for
+    sizes beyond it, or run the feeds in-process (FEED_WORKERS=0).
+    """
+    def __init__(self, engine, universe, venues: list, workers: int = FEED_WORKERS,
+                 slots: int = FEED_RING_SLOTS, depth: int = FEED_BOOK_DEPTH, poll_sec: float = FEED_POLL_SEC,
+                 urls: dict = None):
+        self.engine = engine
+        self.universe = universe
+        self.venues = list(venues)
+        self.workers = max(workers, 1)
+        self.slots = slots
+        self.depth = depth
+        self.poll_sec = poll_sec
+        self.urls = urls or {}
+        self.context = multiprocessing.get_context("spawn")
+        self.shards = []
+        self.applied = 0
+        self.respawns = 0
+        self.stale = False # universe changed: re-shard before the next drain
+        self._task = None
+
+    def start(self):
+        if self._task:
+            return
+        for venue in self.venues:
+            self.shard(venue)
+        self._task = asyncio.create_task(self.run())
+
+    def listed(self, venue: str) -> list:
+        return [s for s in self.universe.symbols if self.universe.listed(venue, s)]
+
+    def shard(self, venue: str):
+        """Split venue's listed symbols round-robin into new shards and spawn them"""
+        dtype = record_dtype(self.depth)
+        listed = self.listed(venue)
+        for k in range(self.workers):
+            symbols = listed[k::self.workers]
+            if symbols:
+                shard = Shard(venue, symbols, SharedRing(dtype, self.slots))
+                self.shards.append(shard)
+                self.spawn(shard)
+
+    def set_symbols(self):
+        """Universe refresh: applied by run() between drains (a ring is never closed mid-read)"""
+        self.stale = True
+
+    async def reshard(self):
+        """Restart the shards of venues whose symbols changed; the new workers resync their books"""
+        self.stale = False
+        retired = []
+        for venue in self.venues:
+            shards = [shard for shard in self.shards if shard.venue == venue]
+            if sorted(sym for shard in shards for sym in shard.symbols) == sorted(self.listed(venue)):
+                continue
+            retired += shards
+            self.shards = [shard for shard in self.shards if shard.venue != venue]
+            self.shard(venue)
+        await self.retire(retired)
+
+    @staticmethod
+    async def retire(shards: list):
+        """Terminate all of them at once, reap them off the loop, then close their rings"""
+        processes = [shard.process for shard in shards if shard.process is not None]
+        for process in processes:
+            process.terminate()
+        try:
+            await asyncio.gather(*(asyncio.to_thread(process.join, 2) for process in processes))
+        finally:
+            for shard in shards:
+                shard.ring.close()
+
+    def spawn(self, shard: Shard):
+        shard.process = self.context.Process(
+            target=run_shard, daemon=True, name=f"feed-{shard.venue}",
+            args=(shard.venue, shard.symbols, self.universe, shard.ring.name, self.slots, self.depth,
+                  self.urls.get(shard.venue))
+        )
+        shard.process.start()
+
+    async def run(self):
+        supervised = time.monotonic()
+        while True:
+            if self.stale:
+                await self.reshard()
+            busy = False
+            for shard in self.shards:
+                # Bounded batch: other shards and the loop get their turn
+                batch = shard.ring.read(self.slots)
+                if len(batch):
+                    busy = True
+                    await self.apply(shard, batch)
+            if time.monotonic() - supervised >= SUPERVISE_SEC:
+                supervised = time.monotonic()
+                for shard in self.shards:
+                    if not shard.process.is_alive():
+                        self.respawns += 1
+                        self.spawn(shard)
+            await asyncio.sleep(0 if busy else self.poll_sec)
+
+    async def apply(self, shard: Shard, batch: np.ndarray):
+        now = time.perf_counter_ns()
+        # Last record per (symbol, kind), in arrival order
+        keys = batch['symbol'].astype(np.int64) * 2 + batch['kind']
+        _, last = np.unique(keys[::-1], return_index=True)
+        keep = np.sort(len(batch) - 1 - last)
+        if METRICS.enabled:
+            METRICS.observe(f"ring.{shard.venue}", now - int(batch['sent'][0]))
+
+        engine = self.engine
+        venue = shard.venue
+        symbols = shard.symbols
+        books = engine.books[venue]
+        for record in batch[keep]:
+            symbol = symbols[record['symbol']]
+            if record['kind'] == QUOTE:
+                await engine.on_quote(venue, symbol, {
+                    "price": float(record['price']), "funding": float(record['funding']), "ts": int(record['ts'])
+                })
+            else:
+                book = books.get(symbol)
+                if book is None:
+                    continue
+                book.apply_snapshot(record['bids'][:record['n_bids']], record['asks'][:record['n_asks']],
+                                    ts=int(record['ts']))
+                await engine.on_book(venue, symbol, book)
+            self.applied += 1
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        shards, self.shards = self.shards, []
+        await self.retire(shards)
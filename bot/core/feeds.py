@@ -0,0 +1,336 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+import websockets
+from config import HL_WS_URL, PARADEX_WS_URL
+from core.recorder import KIND_CTX, KIND_BOOK
+from core.metrics import METRICS
+from core.universe import scale_levels
+
+logger = logging.getLogger(__name__)
+# Malformed payload: the frame is skipped, the socket stays up
+FRAME_ERRORS = (KeyError, TypeError, ValueError, IndexError)
+
+class VenueFeed:
+    """
+    Push-based venue feed.
+    Subscribes only to the given symbols and forwards every parsed quote
+    to on_quote(venue, symbol, quote). When books ({symbol: OrderBook}) are
+    given, L2 updates are applied in place and on_book(venue, symbol, book)
+    is called. Reconnects with backoff on drops (books resync from snapshot).
+    Every raw update goes through ingest(), which is also the replay entry point.
+    With a Universe, subscriptions use venue-native names and updates are mapped
+    back to canonical symbols (k-unit prices scaled per unit).
+    set_symbols() follows universe refreshes on the open socket.
+    A frame that does not decode / parse is logged and skipped, and a callback
+    that raises is logged on its own: neither drops the connection (a BookGap does).
+    """
+    venue = None
+    default_url = None
+
+    def __init__(self, symbols: list, on_quote, url: str = None, books: dict = None, on_book=None, recorder=None, universe=None):
+        self.symbols = list(symbols)
+        self.universe = universe
+        self.on_quote = on_quote
+        self.books = books if books is not None else {}
+        self.on_book = on_book
+        self.recorder = recorder
+        self.url = url or self.default_url
+        self.connected = False
+        self.messages = 0
+        self.bad_frames = 0
+        # {symbol: subscribe frames sent on the open socket}, to unsubscribe with the same names
+        self.subscribed = {}
+        self._ws = None
+        self._task = None
+
+    def subscriptions(self, symbol: str) -> list:
+        """Subscribe frames for one symbol (quotes, and its book when tracked)"""
+        raise NotImplementedError
+
+    async def subscribe(self, ws, symbols: list):
+        for sym in symbols:
+            subs = self.subscriptions(sym)
+            for sub in subs:
+                await ws.send(json.dumps(sub))
+            self.subscribed[sym] = subs
+
+    async def set_symbols(self, symbols: list):
+        """
+        Universe refresh: added symbols are subscribed and dropped ones
+        unsubscribed on the open socket (a reconnect subscribes the new list).
+        """
+        self.symbols = list(symbols)
+        ws = self._ws
+        if ws is None:
+            return
+        keep = set(self.symbols)
+        try:
+            for sym in [s for s in self.subscribed if s not in keep]:
+                # Frames as sent: a delisted symbol may no longer have a native name
+                for sub in self.subscribed.pop(sym):
+                    await ws.send(json.dumps({**sub, "method": "unsubscribe"}))
+            await self.subscribe(ws, [s for s in self.symbols if s not in self.subscribed])
+        except websockets.ConnectionClosed:
+            pass # run() reconnects with the new list
+
+    async def emit_quote(self, symbol: str, quote: dict):
+        try:
+            await self.on_quote(self.venue, symbol, quote)
+        except Exception:
+            logger.exception("%s %s: quote callback failed", self.venue, symbol)
+
+    async def emit_book(self, symbol: str, book):
+        if not self.on_book:
+            return
+        try:
+            await self.on_book(self.venue, symbol, book)
+        except Exception:
+            logger.exception("%s %s: book callback failed", self.venue, symbol)
+
+    def native(self, symbol: str) -> str:
+        return self.universe.native_name(self.venue, symbol) if self.universe else symbol
+
+    def resolve(self, native: str) -> tuple:
+        """Native name -> (symbol, price scale), None if not scanned"""
+        if self.universe:
+            return self.universe.resolve(self.venue, native)
+        return (native, 1.0) if native in self.symbols else None
+
+    async def handle_message(self, msg: dict):
+        """Unwrap the venue envelope and call ingest()"""
+        raise NotImplementedError
+
+    async def ingest(self, kind: int, symbol: str, payload: dict):
+        """Raw venue update (ctx/summary or book) -> quote table / books"""
+        if self.recorder:
+            self.recorder.record(self.venue, kind, symbol, payload)
+        if kind == KIND_BOOK:
+            await self.handle_book(payload)
+        else:
+            await self.handle_ctx(symbol, payload)
+
+    async def handle_ctx(self, symbol: str, payload: dict):
+        raise NotImplementedError
+
+    async def handle_book(self, data: dict):
+        raise NotImplementedError
+
+    async def heartbeat(self, ws):
+        """Optional app-level keepalive (venue specific)"""
+        return
+
+    async def run(self):
+        backoff = 0.5
+        while True:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self.subscribed = {}
+                    await self.subscribe(ws, self.symbols)
+                    self._ws = ws
+                    self.connected = True
+                    backoff = 0.5
+                    pinger = asyncio.create_task(self.heartbeat(ws))
+                    try:
+                        async for raw in ws:
+                            self.messages += 1
+                            # Frame in hand -> decoded -> engine + executor done
+                            t0 = time.perf_counter_ns() if METRICS.enabled else 0
+                            try:
+                                msg = json.loads(raw)
+                                t1 = time.perf_counter_ns() if METRICS.enabled else 0
+                                await self.handle_message(msg)
+                            except FRAME_ERRORS as e:
+                                self.bad_frames += 1
+                                logger.warning("%s: skipped bad frame (%r): %.200s", self.venue, e, raw)
+                                continue
+                            if METRICS.enabled:
+                                METRICS.observe(f"parse.{self.venue}", t1 - t0)
+                                METRICS.observe(f"tick_to_decision.{self.venue}", time.perf_counter_ns() - t0)
+                    finally:
+                        pinger.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Drop / book gap: reconnect below
+                logger.warning("%s: feed reconnecting in %.1fs (%r)", self.venue, backoff, e)
+            finally:
+                self.connected = False
+                self._ws = None
+
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class HyperliquidFeed(VenueFeed):
+    """activeAssetCtx per coin: same ctx shape as metaAndAssetCtxs"""
+    venue = "hl"
+    default_url = HL_WS_URL
+
+    def subscriptions(self, symbol: str) -> list:
+        coin = self.native(symbol)
+        subs = [{"method": "subscribe", "subscription": {"type": "activeAssetCtx", "coin": coin}}]
+        if symbol in self.books:
+            # l2Book pushes a full (top 20) snapshot on every change
+            subs.append({"method": "subscribe", "subscription": {"type": "l2Book", "coin": coin}})
+        return subs
+
+    async def heartbeat(self, ws):
+        # HL closes connections idle for 60s
+        while True:
+            await asyncio.sleep(30)
+            await ws.send(json.dumps({"method": "ping"}))
+
+    async def handle_message(self, msg: dict):
+        channel = msg.get('channel')
+        if channel == 'l2Book':
+            await self.ingest(KIND_BOOK, msg['data']['coin'], msg['data'])
+        elif channel == 'activeAssetCtx':
+            await self.ingest(KIND_CTX, msg['data']['coin'], msg['data']['ctx'])
+
+    async def handle_ctx(self, coin: str, ctx: dict):
+        entry = self.resolve(coin)
+        if not entry:
+            return
+        symbol, scale = entry
+        try:
+            quote = parse_hl_ctx(ctx)
+        except (KeyError, TypeError, ValueError):
+            return
+        if quote is None:
+            return
+        if scale != 1.0:
+            quote['price'] *= scale
+        await self.emit_quote(symbol, quote)
+
+    async def handle_book(self, data: dict):
+        entry = self.resolve(data['coin'])
+        book = self.books.get(entry[0]) if entry else None
+        if book is None:
+            return
+        symbol, scale = entry
+        bids, asks = data['levels']
+        book.apply_snapshot(
+            scale_levels([[l['px'], l['sz']] for l in bids], scale),
+            scale_levels([[l['px'], l['sz']] for l in asks], scale),
+            ts=data.get('time', 0)
+        )
+        await self.emit_book(symbol, book)
+
+
+class BookGap(Exception):
+    """Sequence gap in an incremental book feed: reconnect to resync"""
+
+
+class ParadexFeed(VenueFeed):
+    """JSON-RPC markets_summary.<MARKET> channel: same item shape as /markets/summary"""
+    venue = "px"
+    default_url = PARADEX_WS_URL
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ids = itertools.count(1) # JSON-RPC request ids
+
+    def subscriptions(self, symbol: str) -> list:
+        market = f"{self.native(symbol)}-USD-PERP"
+        channels = [f"markets_summary.{market}"]
+        if symbol in self.books:
+            # Deltas channel: one snapshot ('s') on subscribe, then incremental ('d') updates
+            channels.append(f"order_book.{market}.deltas")
+        return [
+            {"jsonrpc": "2.0", "method": "subscribe", "params": {"channel": channel}, "id": next(self.ids)}
+            for channel in channels
+        ]
+
+    async def handle_message(self, msg: dict):
+        if msg.get('method') != 'subscription':
+            return
+        data = msg['params']['data']
+        if msg['params'].get('channel', '').startswith('order_book.'):
+            await self.ingest(KIND_BOOK, data['market'].split('-')[0], data)
+        else:
+            await self.ingest(KIND_CTX, data.get('symbol', '').split('-')[0], data)
+
+    async def handle_ctx(self, base: str, item: dict):
+        entry = self.resolve(base)
+        if not entry:
+            return
+        symbol, scale = entry
+        try:
+            quote = parse_px_summary(item)
+        except (KeyError, TypeError, ValueError):
+            return
+        if scale != 1.0:
+            quote['price'] *= scale
+        await self.emit_quote(symbol, quote)
+
+    async def handle_book(self, data: dict):
+        entry = self.resolve(data['market'].split('-')[0])
+        book = self.books.get(entry[0]) if entry else None
+        if book is None:
+            return
+        symbol, scale = entry
+        seq = int(data.get('seq_no', 0))
+
+        if data.get('update_type') == 's':
+            levels = data.get('inserts', [])
+            book.apply_snapshot(
+                scale_levels([[l['price'], l['size']] for l in levels if l['side'] == 'BUY'], scale),
+                scale_levels([[l['price'], l['size']] for l in levels if l['side'] == 'SELL'], scale),
+                seq=seq,
+                ts=data.get('last_updated_at', 0)
+            )
+        else:
+            if book.seq and seq != book.seq + 1:
+                raise BookGap(f"{symbol}: expected {book.seq + 1}, got {seq}")
+            for l in data.get('deletes', []):
+                book.apply_delta(l['side'], float(l['price']) * scale, 0)
+            for l in data.get('updates', []) + data.get('inserts', []):
+                book.apply_delta(l['side'], float(l['price']) * scale, float(l['size']) / scale)
+            book.seq = seq
+            book.ts = data.get('last_updated_at', 0)
+
+        await self.emit_book(symbol, book)
+
+
+def parse_hl_ctx(ctx: dict) -> dict:
+    """HL asset ctx -> quote (no venue timestamp: aligned on receive time), None without a mid"""
+    if ctx.get('midPx') is None:
+        return None # no book on the asset (null midPx): skip it, not the whole listing
+    # HL funding is the hourly rate (FUNDING_INTERVAL_HOURS), passed on as quoted
+    return {
+        "price": float(ctx['midPx']),
+        "funding": float(ctx.get('funding', 0.0))
+    }
+
+def parse_px_summary(item: dict) -> dict:
+    """Paradex market summary -> quote"""
+    bid = float(item.get('bid', 0) or 0)
+    ask = float(item.get('ask', 0) or 0)
+    # Use Mid or fallback to Mark Price
+    mid = (bid + ask) / 2 if bid and ask else float(item.get('mark_price', 0))
+
+    # Paradex funding usually 'current_funding_rate' or 'funding_rate': an 8h rate,
+    # MarketState scales it to per hour
+    funding = float(item.get('current_funding_rate', item.get('funding_rate', 0.0)))
+
+    return {
+        "price": mid,
+        "funding": funding,
+        "ts": int(item.get('created_at', 0) or 0) # venue ms, 0 = unknown
+    }
@@ -0,0 +1,137 @@
+import math
+import numpy as np
+from config import FUNDING_WINDOW, FUNDING_SAMPLE_SEC, FUNDING_HALF_LIFE_SEC
+
+# live fields
+RATE, SINCE, EWMA = range(3)
+EMPTY = (np.nan, 0.0, np.nan) # never quoted
+
+class FundingTracker:
+    """
+    Funding history + carry forecast per (symbol row, venue), rates already
+    normalized to a fraction of notional per hour (MarketState does that).
+    Row i is MarketState row i; storage grows with it.
+      live         (capacity, venues, 3) [rate, since, ewma]
+                   rate, since  current rate and when it took effect (seconds, MarketState clock)
+                   ewma         time-decayed mean of the rate path up to `since`
+      ring         (capacity, venues, window) one sample every sample_sec, oldest overwritten
+      head, count  next ring slot / samples held; total, squares are running sums over the ring
+    rate/since/ewma are views of live.
+    The rate is a step function between updates, so the EWMA is exact in
+    continuous time: when the rate moves it is decayed towards the rate that was
+    in force, and read at any later time the same way (forecast()). Half-life
+    is in seconds, independent of how often a venue ticks.
+    update() only runs when a rate moves and is O(1); update_all() is one array
+    pass for a full-universe tick. The ring is filled by sample(), one array pass
+    over the universe every sample_sec, so no tick pays for history upkeep.
+    """
+    def __init__(self, venues: int, capacity: int, window: int = FUNDING_WINDOW,
+                 sample_sec: float = FUNDING_SAMPLE_SEC, half_life_sec: float = FUNDING_HALF_LIFE_SEC):
+        self.venues = venues
+        self.window = window
+        self.sample_sec = sample_sec
+        self.tau = half_life_sec / math.log(2)
+        self.due = -math.inf # next sample(), seconds
+        self.capacity = 0
+        self.grow(capacity)
+
+    def grow(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        shape = (capacity, self.venues)
+        live = np.empty(shape + (3,))
+        live[...] = EMPTY
+        blocks = {
+            'live': live, 'total': np.zeros(shape), 'squares': np.zeros(shape),
+            'head': np.zeros(shape, dtype=np.int64), 'count': np.zeros(shape, dtype=np.int64),
+            'ring': np.full(shape + (self.window,), np.nan)
+        }
+        old = self.capacity
+        for name, block in blocks.items():
+            if old:
+                block[:old] = getattr(self, name)
+            setattr(self, name, block)
+        self.rate = live[..., RATE]
+        self.since = live[..., SINCE]
+        self.ewma = live[..., EWMA]
+        self.capacity = capacity
+
+    def clear(self, i: int):
+        self.live[i] = EMPTY
+        self.ring[i] = np.nan
+        self.total[i] = self.squares[i] = self.head[i] = self.count[i] = 0
+
+    def update(self, i: int, v: int, rate: float, now: float):
+        """Venue v's rate for row i moved to rate at now (seconds)"""
+        live = self.live
+        current, since, ewma = live[i, v].tolist()
+        if current == rate:
+            return
+        if current != current: # first rate
+            ewma = rate
+        else:
+            ewma = current + (ewma - current) * math.exp(-(now - since) / self.tau)
+        # Scalar stores: cheaper than assigning a tuple to the row
+        live[i, v, RATE] = rate
+        live[i, v, SINCE] = now
+        live[i, v, EWMA] = ewma
+
+    def update_all(self, v: int, rates: np.ndarray, now: float):
+        """Full-universe tick of venue v: rates (n,) for rows 0..n-1, NaN = not quoted"""
+        n = len(rates)
+        quoted = ~np.isnan(rates)
+        rate = self.rate[:n, v]
+        first = quoted & np.isnan(rate)
+        moved = quoted & ~first & (rate != rates)
+        ewma = self.ewma[:n, v]
+        decay = np.exp(-(now - self.since[:n, v][moved]) / self.tau)
+        ewma[moved] = rate[moved] + (ewma[moved] - rate[moved]) * decay
+        ewma[first] = rates[first]
+        changed = first | moved
+        rate[changed] = rates[changed]
+        self.since[:n, v][changed] = now
+
+    def sample(self, quoted: np.ndarray, now: float):
+        """Append the current rate of every (row, venue) in quoted (n, venues) to its ring"""
+        self.due = now + self.sample_sec
+        n = len(quoted)
+        rows, venues = np.nonzero(quoted & ~np.isnan(self.rate[:n]))
+        if not len(rows):
+            return
+        heads = self.head[rows, venues]
+        old = self.ring[rows, venues, heads]
+        held = ~np.isnan(old)
+        old = np.where(held, old, 0.0)
+        new = self.rate[rows, venues]
+        self.count[rows, venues] += ~held
+        self.total[rows, venues] += new - old
+        self.squares[rows, venues] += new * new - old * old
+        self.ring[rows, venues, heads] = new
+        self.head[rows, venues] = (heads + 1) % self.window
+
+    def forecast(self, i: int, v: int, now: float) -> float:
+        """EWMA of the rate path as of now, NaN = never quoted"""
+        rate, since, ewma = self.live[i, v].tolist()
+        return rate + (ewma - rate) * math.exp(-(now - since) / self.tau)
+
+    def samples(self, i: int, v: int) -> int:
+        return int(self.count[i, v])
+
+    def mean(self, i: int, v: int) -> float:
+        """Mean rate over the history window"""
+        count = self.count[i, v]
+        return self.total[i, v] / count if count else math.nan
+
+    def std(self, i: int, v: int) -> float:
+        count = self.count[i, v]
+        if not count:
+            return math.nan
+        mean = self.total[i, v] / count
+        return math.sqrt(max(self.squares[i, v] / count - mean * mean, 0.0))
+
+    def history(self, i: int, v: int) -> np.ndarray:
+        """Sampled rates, oldest first"""
+        count = self.count[i, v]
+        h = self.head[i, v]
+        ring = self.ring[i, v]
+        return np.concatenate((ring[h:], ring[:h]))[self.window - count:]
@@ -0,0 +1,133 @@
+import math
+import time
+import numpy as np
+from config import HISTORY_MINUTES, HISTORY_SAMPLE_SEC
+from core.candle_cache import CandleCache
+
+# bar fields
+OPEN, HIGH, LOW, CLOSE = range(4)
+MINUTE_MS = 60_000
+
+# Venues with public 1m candles for backfill: adapter code -> CandleCache venue
+# (Paradex only serves candles to authenticated accounts, it fills from live quotes)
+BACKFILL_SOURCES = {"hl": "hl", "bn": "binance"}
+
+class PriceHistory:
+    """
+    Rolling 1-minute OHLC of every (symbol row, venue) mid for the dashboard chart.
+    Row i is MarketState row i; storage grows with it.
+      bars   (capacity, venues, minutes, 4) [open, high, low, close], NaN = no bar
+      stamp  (capacity, venues, minutes) wall-clock minute (ms // 60000) each slot holds, -1 = empty
+    Slots are indexed by minute % minutes, so a new minute overwrites the bar
+    that fell out of the window and nothing is ever shifted. Bars are built by
+    sample(), one array pass over the universe every sample_sec (OHLC of the mids
+    seen at those instants); backfill() writes closed venue candles in place.
+    version moves on every write and is the cache key of anything derived.
+    """
+    def __init__(self, venues: int, capacity: int, minutes: int = HISTORY_MINUTES,
+                 sample_sec: float = HISTORY_SAMPLE_SEC):
+        self.venues = venues
+        self.minutes = minutes
+        self.sample_sec = sample_sec
+        self.due = -math.inf # next sample(), seconds
+        self.minute = None   # last sampled wall-clock minute
+        self.version = 0
+        self.capacity = 0
+        self.grow(capacity)
+
+    def grow(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        shape = (capacity, self.venues, self.minutes)
+        blocks = {'bars': np.full(shape + (4,), np.nan), 'stamp': np.full(shape, -1, dtype=np.int64)}
+        old = self.capacity
+        for name, block in blocks.items():
+            if old:
+                block[:old] = getattr(self, name)
+            setattr(self, name, block)
+        self.capacity = capacity
+
+    def clear(self, i: int):
+        self.bars[i] = np.nan
+        self.stamp[i] = -1
+        self.version += 1
+
+    def sample(self, prices: np.ndarray, now: float, wall_ms: int):
+        """Fold prices (n, venues) for rows 0..n-1 (NaN = not quoted) into the bar of wall_ms's minute"""
+        self.due = now + self.sample_sec
+        minute = wall_ms // MINUTE_MS
+        self.minute = minute
+        quoted = ~np.isnan(prices)
+        if not quoted.any():
+            return
+        n = len(prices)
+        slot = minute % self.minutes
+        bar = self.bars[:n, :, slot]     # (n, venues, 4) view
+        stamp = self.stamp[:n, :, slot]
+        fresh = quoted & (stamp != minute)
+        held = quoted & ~fresh
+        bar[fresh] = prices[fresh][:, None]
+        stamp[fresh] = minute
+        high, low = bar[..., HIGH], bar[..., LOW]
+        high[held] = np.maximum(high[held], prices[held])
+        low[held] = np.minimum(low[held], prices[held])
+        bar[..., CLOSE][held] = prices[held]
+        self.version += 1
+
+    def backfill(self, i: int, v: int, t_ms: np.ndarray, ohlc: np.ndarray, wall_ms: int = None):
+        """Write closed candles (open times t_ms, (k, 4) OHLC) of row i / venue v that are still in the window"""
+        now = (int(time.time() * 1000) if wall_ms is None else wall_ms) // MINUTE_MS
+        minutes = np.asarray(t_ms, dtype=np.int64) // MINUTE_MS
+        keep = (minutes > now - self.minutes) & (minutes < now)
+        if not keep.any():
+            return
+        minutes = minutes[keep]
+        slots = minutes % self.minutes
+        self.bars[i, v, slots] = np.asarray(ohlc, dtype=float)[keep]
+        self.stamp[i, v, slots] = minutes
+        self.version += 1
+
+    def query(self, i: int, since_ms: int = None) -> tuple:
+        """
+        Bars of row i from since_ms's minute (default the whole window) to the current
+        one, oldest first: (open times ms (k,), bars (venues, k, 4) NaN where a venue
+        has no bar). Minutes where no venue has a bar are skipped.
+        """
+        if self.minute is None:
+            return np.empty(0, dtype=np.int64), np.empty((self.venues, 0, 4))
+        start = self.minute - self.minutes + 1
+        if since_ms is not None:
+            start = max(start, since_ms // MINUTE_MS)
+        minutes = np.arange(start, self.minute + 1)
+        slots = minutes % self.minutes
+        bars = self.bars[i][:, slots]    # (venues, k, 4) copy
+        live = self.stamp[i][:, slots] == minutes
+        bars[~live] = np.nan
+        keep = live.any(axis=0)
+        return minutes[keep] * MINUTE_MS, bars[:, keep]
+
+
+async def backfill(state, universe, session, cache: CandleCache = None):
+    """
+    One-off: load the window's closed 1m candles of every listed symbol from the
+    venues in BACKFILL_SOURCES (through the candle cache, so restarts only fetch
+    the gap) into state.history. Failures just leave the live-built bars.
+    """
+    cache = cache or CandleCache()
+    history = state.history
+    days = history.minutes / 1440
+    for venue, source in BACKFILL_SOURCES.items():
+        v = state.venue_index.get(venue)
+        if v is None:
+            continue
+        for symbol in list(universe.symbols):
+            i = state.index.get(symbol)
+            if i is None or not universe.listed(venue, symbol):
+                continue
+            try:
+                candles = await cache.sync(session, source, universe.native_name(venue, symbol), "1m", days)
+            except Exception:
+                continue
+            if len(candles):
+                ohlc = np.column_stack([candles['o'], candles['h'], candles['l'], candles['c']])
+                history.backfill(i, v, candles['t'], ohlc * universe.scale(venue, symbol))
@@ -0,0 +1,211 @@
+import asyncio
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from config import JOURNAL_PATH, JOURNAL_FSYNC_INTERVAL, JOURNAL_ROTATE_BYTES
+from core.transport import loads, dumps
+
+# Write-ahead position / trade journal.
+# Record = header + payload, payload being compact JSON.
+#   header: <I crc32 (of everything after it), I payload_len, Q ts_ns (wall clock), B kind
+# A record is only trusted when it is complete and its CRC matches: a crash mid-write
+# leaves a torn tail that load() cuts off before appending again.
+HEADER = struct.Struct("<IIQB")
+
+KIND_OPEN = 0     # {"symbol", "position"}: position opened (full Executor position dict)
+KIND_UPDATE = 1   # {"symbol", "fields"}: position fields changed (e.g. residual sizes)
+KIND_CLOSE = 2    # {"symbol", "reason", "pnl", ...exit spreads / fees}: position gone
+KIND_LOG = 3      # {"line"}: trade log line
+KIND_SNAPSHOT = 4 # {"positions", "log", "realized", "seq"}: full state, first record of a rotated journal
+# Every other payload also carries "seq", the journal-wide record number
+
+LOG_LINES = 50 # Executor.trade_log length
+
+def pack(kind: int, data: dict, ts_ns: int = None) -> bytes:
+    body = dumps(data).encode()
+    rest = HEADER.pack(0, len(body), ts_ns or time.time_ns(), kind)[4:] + body
+    return struct.pack("<I", zlib.crc32(rest)) + rest
+
+def read_journal(path: str):
+    """Yields (offset after the record, ts_ns, kind, data). Stops at a torn or corrupt tail."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    pos = 0
+    end = len(data)
+    while pos + HEADER.size <= end:
+        crc, body_len, ts_ns, kind = HEADER.unpack_from(data, pos)
+        stop = pos + HEADER.size + body_len
+        if stop > end or zlib.crc32(data[pos + 4:stop]) != crc:
+            break
+        yield stop, ts_ns, kind, loads(data[pos + HEADER.size:stop])
+        pos = stop
+
+
+class Journal:
+    """
+    Append-only journal of every entry / exit, written off the event loop.
+    append() only packs the record and queues it. A background task writes
+    whatever queued up and fsyncs once per batch, batches at most every
+    fsync_interval seconds (group commit): a crash loses at most that window.
+    The journal keeps its own replay of the records (positions, recent log
+    lines) so that past rotate_bytes it can archive the file and start a new
+    one from a snapshot. Records are numbered and the snapshot keeps the last
+    number it covers: records still queued when it was taken land after it in
+    the new file and are skipped on replay, so a close is never counted twice.
+    """
+    def __init__(self, path: str = JOURNAL_PATH, fsync_interval: float = JOURNAL_FSYNC_INTERVAL,
+                 rotate_bytes: int = JOURNAL_ROTATE_BYTES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.rotate_bytes = rotate_bytes
+        # Replayed state: {symbol: position}, recent log lines, {symbol: realized PnL USD}
+        self.positions = {}
+        self.log = []
+        self.realized = {}
+        self.seq = 0 # last record applied
+        self.file = None
+        self.size = 0
+        self.queue = None
+        self.task = None
+        self.last_sync = 0.0
+        self.records = 0
+        self.syncs = 0
+
+    def apply(self, kind: int, data: dict):
+        if kind == KIND_SNAPSHOT:
+            self.positions = data['positions']
+            self.log = data['log'][-LOG_LINES:]
+            self.realized = data.get('realized', {})
+            self.seq = data.get('seq', self.seq)
+            return
+        seq = data.get('seq')
+        if seq is not None:
+            if seq <= self.seq:
+                return # already in the snapshot
+            self.seq = seq
+        if kind == KIND_OPEN:
+            self.positions[data['symbol']] = dict(data['position'])
+        elif kind == KIND_UPDATE:
+            position = self.positions.get(data['symbol'])
+            if position is not None:
+                position.update(data['fields'])
+        elif kind == KIND_CLOSE:
+            self.positions.pop(data['symbol'], None)
+            realized = data.get('pnl', {}).get('realized')
+            if realized is not None:
+                self.realized[data['symbol']] = self.realized.get(data['symbol'], 0.0) + realized
+        elif kind == KIND_LOG:
+            self.log.append(data['line'])
+            if len(self.log) > LOG_LINES:
+                self.log.pop(0)
+
+    def load(self) -> dict:
+        """Replay the journal, cut a torn tail, open it for appends. Returns the open positions."""
+        good = 0
+        tmp = self.path + ".tmp"
+        if not os.path.exists(self.path) and os.path.exists(tmp):
+            os.replace(tmp, self.path) # crashed between the two renames of rotate()
+        if os.path.exists(self.path):
+            for good, _, kind, data in read_journal(self.path):
+                self.apply(kind, data)
+            if good < os.path.getsize(self.path):
+                with open(self.path, 'r+b') as f:
+                    f.truncate(good)
+                    f.flush()
+                    os.fsync(f.fileno())
+        self.file = open(self.path, 'ab')
+        self.size = good
+        return self.positions
+
+    def start(self):
+        if self.file is None:
+            self.load()
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.task = asyncio.create_task(self.run())
+
+    def append(self, kind: int, data: dict):
+        """Non-blocking: replay + queue for the writer"""
+        data['seq'] = self.seq + 1
+        self.apply(kind, data)
+        self.records += 1
+        record = pack(kind, data)
+        if self.queue is None:
+            self.write(record) # not started (scripts): synchronous
+        else:
+            self.queue.put_nowait(record)
+
+    def open(self, symbol: str, position: dict):
+        self.append(KIND_OPEN, {"symbol": symbol, "position": position})
+
+    def update(self, symbol: str, **fields):
+        self.append(KIND_UPDATE, {"symbol": symbol, "fields": fields})
+
+    def close(self, symbol: str, reason: str, **exit):
+        self.append(KIND_CLOSE, {"symbol": symbol, "reason": reason, **exit})
+
+    def line(self, line: str):
+        self.append(KIND_LOG, {"line": line})
+
+    async def run(self):
+        """Writer task, returns once the stop() sentinel (None) is written behind everything queued"""
+        while True:
+            batch = [await self.queue.get()]
+            wait = self.last_sync + self.fsync_interval - time.monotonic()
+            if wait > 0 and batch[0] is not None:
+                # Group commit: whatever arrives meanwhile shares the fsync
+                await asyncio.sleep(wait)
+            while not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            stop = batch[-1] is None
+            data = b"".join(r for r in batch if r is not None)
+            if data:
+                await asyncio.to_thread(self.write, data)
+                self.last_sync = time.monotonic()
+            if stop:
+                return
+            if self.size >= self.rotate_bytes:
+                await asyncio.to_thread(self.rotate, self.snapshot())
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.size += len(data)
+        self.syncs += 1
+
+    def snapshot(self) -> bytes:
+        return pack(KIND_SNAPSHOT, {"positions": self.positions, "log": self.log, "realized": self.realized, "seq": self.seq})
+
+    def rotate(self, snapshot: bytes):
+        """Archive the journal as <path>.<timestamp>, continue in a new file from snapshot"""
+        self.file.close()
+        archive = f"{self.path}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+        tmp = self.path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path, archive)
+        os.replace(tmp, self.path)
+        fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        try:
+            os.fsync(fd) # the renames themselves
+        finally:
+            os.close(fd)
+        self.file = open(self.path, 'ab')
+        self.size = len(snapshot)
+
+    async def stop(self):
+        """Write + fsync everything still queued, close the file"""
+        if self.task is not None:
+            self.queue.put_nowait(None)
+            await self.task
+            self.task = None
+            self.queue = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
@@ -0,0 +1,521 @@
+import math
+import time
+import numpy as np
+from config import QUOTE_SKEW_MS, QUOTE_MAX_AGE_MS, FUNDING_INTERVAL_HOURS, FUNDING_MIN_SAMPLES
+from core.funding import FundingTracker
+from core.spread_stats import SpreadStats
+from core.history import PriceHistory
+
+SPREAD_HIGHLIGHT = 0.5      # % mid spread shown as (SPREAD)
+FUNDING_HIGHLIGHT = 0.00001 # hourly funding diff shown as (FUNDING), ~8.8% APR
+
+# quote fields
+PRICE, FUNDING, EVENT = range(3)
+# derived columns
+SPREAD, FUNDING_DIFF, SELL, BUY, FUND_SHORT, FUND_LONG, SKEW = range(7)
+NO_ROUTE = (0.0, 0.0, -1, -1, -1, -1, 0.0) # fewer than two venues quoting
+
+class Clock:
+    """
+    Time source of the market table: perf_counter for event times, ages and the
+    history sweeps, wall clock for minute bars and venue timestamps. Replay pins
+    both to the recorded receive time (ns), so sweeps warm up on recorded time.
+    """
+    def __init__(self):
+        self.ns = None # pinned time, None = live clocks
+
+    def perf_ns(self) -> int:
+        return time.perf_counter_ns() if self.ns is None else self.ns
+
+    def wall_ns(self) -> int:
+        return time.time_ns() if self.ns is None else self.ns
+
+class MarketState:
+    """
+    Persistent symbol-indexed market table across N venues.
+    Row i belongs to symbols[i] for the lifetime of the process (delisted rows
+    are just cleared), so views and indices never move. Storage is preallocated
+    and row-major, so a websocket tick reads one row block and writes one back:
+      quotes   (capacity, 3, venues) [price, funding, event], NaN price = no quote on that venue
+               funding  fraction of notional per hour: each venue's quoted rate is
+                        divided by its FUNDING_INTERVAL_HOURS on the way in
+               event  clock ns the quote describes (venue timestamp mapped
+                      onto the local clock by SpreadEngine, else receive time)
+      derived  (capacity, 7) spread, funding_diff, sell, buy, fund_short, fund_long, skew
+               spread       best cross-venue mid spread % = (max - min) / min
+               sell, buy    venue index of the richest / cheapest mid (-1 = < 2 aligned quotes)
+               funding_diff best carry = max funding - min funding
+               fund_short, fund_long  venue index to short (highest funding) / long (lowest)
+               skew         ms between the sell and buy legs' event times
+      recv     (venues, capacity) clock ns of the last quote, 0 = never
+    price/funding/spread/... are column views of those blocks.
+    carry (FundingTracker) keeps each row's funding history and EWMA forecast,
+    stats (SpreadStats) rolling statistics of its best-route spread, history
+    (PriceHistory) 1-minute OHLC of every venue's mid for the dashboard chart; all
+    three are sampled by sample(), one array pass every few ticks at most.
+    Only venues whose event time is within skew_ms of the symbol's newest quote
+    take part in the mid spread, so two quotes from different moments never make
+    a phantom spread (funding, which moves slowly, uses every quote).
+    Best buy/sell is one max/min pass over the venue axis: O(N) per symbol.
+    """
+    def __init__(self, symbols: list, venues: list, capacity: int = 64, skew_ms: float = QUOTE_SKEW_MS,
+                 clock: Clock = None):
+        self.venues = list(venues)
+        self.clock = clock or Clock()
+        self.venue_index = {v: k for k, v in enumerate(self.venues)}
+        self.skew_ns = skew_ms * 1e6
+        # Quoted rate -> per hour, per venue
+        self.funding_scale = [1.0 / FUNDING_INTERVAL_HOURS.get(v, 1) for v in self.venues]
+        self.carry = FundingTracker(len(self.venues), 0)
+        self.stats = SpreadStats(0)
+        self.history = PriceHistory(len(self.venues), 0)
+        self.due = -math.inf # next sample(), seconds
+        self.symbols = []
+        self.index = {}
+        self.n = 0
+        self._alloc(max(capacity, len(symbols)))
+        for sym in symbols:
+            self.add(sym)
+
+    def _alloc(self, capacity: int):
+        n_venues = len(self.venues)
+        quotes = np.full((capacity, 3, n_venues), np.nan)
+        derived = np.zeros((capacity, 7))
+        derived[:, SELL:SKEW] = -1
+        recv = np.zeros((n_venues, capacity), dtype=np.int64)
+        if self.n:
+            quotes[:self.n] = self.quotes[:self.n]
+            derived[:self.n] = self.derived[:self.n]
+            recv[:, :self.n] = self.recv[:, :self.n]
+        self.quotes, self.derived, self.recv = quotes, derived, recv
+        self.carry.grow(capacity)
+        self.stats.grow(capacity)
+        self.history.grow(capacity)
+        # (capacity, venues) views
+        self.price = quotes[:, PRICE, :]
+        self.funding = quotes[:, FUNDING, :]
+        self.event = quotes[:, EVENT, :]
+        # (capacity,) views, venue indices stored as floats in the same block
+        self.spread = derived[:, SPREAD]
+        self.funding_diff = derived[:, FUNDING_DIFF]
+        self.sell = derived[:, SELL]
+        self.buy = derived[:, BUY]
+        self.fund_short = derived[:, FUND_SHORT]
+        self.fund_long = derived[:, FUND_LONG]
+        self.skew = derived[:, SKEW]
+
+    def add(self, symbol: str) -> int:
+        i = self.index.get(symbol)
+        if i is not None:
+            return i
+        if self.n == len(self.derived):
+            self._alloc(self.n * 2)
+        i = self.n
+        self.symbols.append(symbol)
+        self.index[symbol] = i
+        self.n += 1
+        return i
+
+    def clear(self, i: int):
+        self.quotes[i] = np.nan
+        self.carry.clear(i)
+        self.stats.clear(i)
+        self.history.clear(i)
+        self.recompute_row(i)
+
+    def set_quote(self, i: int, venue: str, quote: dict, ts_ns: int, event_ns: int = None) -> bool:
+        """
+        Write one venue quote (None clears it). The event time is always refreshed
+        (event_ns, default ts_ns); False when price and funding did not change.
+        """
+        v = self.venue_index[venue]
+        row = self.quotes[i]
+        if quote is None:
+            if math.isnan(row[PRICE, v]):
+                return False
+            row[:, v] = np.nan
+            return True
+
+        self.recv[v, i] = ts_ns
+        row[EVENT, v] = ts_ns if event_ns is None else event_ns
+        price = quote['price']
+        funding = quote.get('funding', 0.0) * self.funding_scale[v]
+        now = ts_ns / 1e9
+        if now >= self.due:
+            self.sample(now)
+        if row[FUNDING, v] != funding:
+            self.carry.update(i, v, funding, now)
+        elif row[PRICE, v] == price:
+            return False
+        row[PRICE, v] = price
+        row[FUNDING, v] = funding
+        return True
+
+    def sample(self, now: float):
+        """
+        History sweeps: every quoted venue's funding rate once per FUNDING_SAMPLE_SEC,
+        every routed row's spread once per SPREAD_SAMPLE_SEC, every quoted mid into
+        its minute bar once per HISTORY_SAMPLE_SEC
+        """
+        n = self.n
+        if now >= self.carry.due:
+            self.carry.sample(~np.isnan(self.price[:n]), now)
+        if now >= self.stats.due:
+            self.stats.sample(self.spread[:n], self.sell[:n] >= 0, now)
+        if now >= self.history.due:
+            # Bars are wall-clock minutes, unlike the perf_counter sweep clock
+            self.history.sample(self.price[:n], now, self.clock.wall_ns() // 1_000_000)
+        self.due = min(self.carry.due, self.stats.due, self.history.due)
+
+    def recompute_row(self, i: int):
+        """Scalar path for single-symbol (websocket) updates, same rules as recompute()"""
+        prices, fundings, events = self.quotes[i].tolist()
+        self.derived[i] = best_routes(prices, fundings, events, self.skew_ns)
+
+    def load(self, quotes: dict) -> np.ndarray:
+        """
+        Full-universe tick: quotes is {venue: (3, n) [price, funding, event]} for the
+        venues polled this tick (others untouched), funding as quoted. Writes in place, recomputes every
+        row, returns the mask of rows whose quotes or best route changed.
+        """
+        n = self.n
+        now = self.clock.perf_ns() / 1e9
+        changed = np.zeros(n, dtype=bool)
+        route = self.derived[:n, SELL:BUY + 1].copy()
+        for venue, cols in quotes.items():
+            v = self.venue_index[venue]
+            funding = cols[FUNDING] * self.funding_scale[v]
+            self.carry.update_all(v, np.where(np.isnan(cols[PRICE]), np.nan, funding), now)
+            for cur, new in ((self.price[:n, v], cols[PRICE]), (self.funding[:n, v], funding)):
+                same = (cur == new) | (np.isnan(cur) & np.isnan(new))
+                changed |= ~same
+                cur[...] = new
+            self.event[:n, v] = cols[EVENT]
+        self.recompute()
+        if now >= self.due:
+            self.sample(now)
+        # A refreshed event time can re-admit or drop a venue without any price change
+        changed |= (self.derived[:n, SELL:BUY + 1] != route).any(axis=1)
+        return changed
+
+    def recompute(self):
+        """Best buy/sell venue + spread over aligned quotes and best funding carry for every row"""
+        n = self.n
+        rows = np.arange(n)
+        price = self.price[:n]
+        funding = self.funding[:n]
+        event = self.event[:n]
+        quoted = ~np.isnan(price)
+        newest = np.where(quoted, event, -np.inf).max(axis=1)
+        with np.errstate(invalid='ignore'):
+            aligned = quoted & (newest[:, None] - event <= self.skew_ns)
+
+        for values, mask, hi_out, lo_out in (
+            (price, aligned, self.sell, self.buy),
+            (funding, quoted, self.fund_short, self.fund_long)
+        ):
+            ok = mask.sum(axis=1) >= 2
+            hi_vals = np.where(mask, values, -np.inf)
+            hi = hi_vals.argmax(axis=1)
+            lo_vals = np.where(mask, values, np.inf)
+            lo_vals[rows, hi] = np.inf # distinct venue even when all quotes are equal
+            lo = lo_vals.argmin(axis=1)
+            hi_out[:n] = np.where(ok, hi, -1)
+            lo_out[:n] = np.where(ok, lo, -1)
+            if values is price:
+                p_hi = hi_vals[rows, hi]
+                p_lo = values[rows, lo]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    self.spread[:n] = np.where(ok & (p_lo > 0), (p_hi - p_lo) / p_lo * 100, 0.0)
+                self.skew[:n] = np.where(ok, np.abs(event[rows, hi] - event[rows, lo]) / 1e6, 0.0)
+            else:
+                self.funding_diff[:n] = np.where(ok, hi_vals[rows, hi] - values[rows, lo], 0.0)
+
+    def order(self) -> np.ndarray:
+        """Row indices by |spread| descending (display only)"""
+        return np.argsort(-np.abs(self.spread[:self.n]), kind='stable')
+
+def best_routes(prices: list, fundings: list, events: list, skew_ns: float) -> tuple:
+    """
+    One derived row from one symbol's venue quotes: richest/cheapest mid over
+    venues quoting within skew_ns of the newest quote, highest/lowest funding over
+    every venue with a price, the second pick always a different venue.
+    First index wins ties, like argmax/argmin in recompute().
+    """
+    newest = max((e for p, e in zip(prices, events) if p == p), default=None)
+    if newest is None:
+        return NO_ROUTE
+    sell = short = -1
+    for v, p in enumerate(prices):
+        if p == p:
+            if newest - events[v] <= skew_ns and (sell < 0 or p > prices[sell]):
+                sell = v
+            if short < 0 or fundings[v] > fundings[short]:
+                short = v
+    buy = long = -1
+    for v, p in enumerate(prices):
+        if p == p:
+            if v != sell and newest - events[v] <= skew_ns and (buy < 0 or p < prices[buy]):
+                buy = v
+            if v != short and (long < 0 or fundings[v] < fundings[long]):
+                long = v
+    if buy < 0:
+        spread, skew, sell = 0.0, 0.0, -1
+    else:
+        lo = prices[buy]
+        spread = (prices[sell] - lo) / lo * 100 if lo > 0 else 0.0
+        skew = abs(events[sell] - events[buy]) / 1e6
+    if long < 0:
+        carry, short = 0.0, -1
+    else:
+        carry = fundings[short] - fundings[long]
+    return (spread, carry, sell, buy, short, long, skew)
+
+
+class MarketView:
+    """
+    Live read-only row of MarketState. Supports the dict-style access the
+    executor/simulator use (opp['spread'], opp.get('l2_hl'), opp['px_price'])
+    for any venue code. Nothing is copied, and display fields (status, color,
+    *_display) are only formatted when read. Ages are measured when read too,
+    so staleness_ms grows while a venue stays silent.
+    """
+    __slots__ = ('state', 'i', 'symbol', 'books')
+
+    def __init__(self, state: MarketState, symbol: str, books: dict = None):
+        self.state = state
+        self.i = state.add(symbol)
+        self.symbol = symbol
+        self.books = books or {}
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __getattr__(self, name: str):
+        # Per-venue fields: <venue>_price, <venue>_funding, <venue>_display, l2_<venue>, recv_<venue>
+        head, _, tail = name.partition('_')
+        venues = self.state.venue_index
+        if head == 'l2' and tail in venues:
+            return self.books.get(tail)
+        if head == 'recv' and tail in venues:
+            return self.recv(tail)
+        if head in venues:
+            if tail == 'price':
+                return self.price(head)
+            if tail == 'funding':
+                return self.funding(head)
+            if tail == 'display':
+                return f"${self.price(head):.4f}" if self.has(head) else "---"
+        raise AttributeError(name)
+
+    @property
+    def venues(self) -> list:
+        return self.state.venues
+
+    def has(self, venue: str) -> bool:
+        return not math.isnan(self.state.price[self.i, self.state.venue_index[venue]])
+
+    def price(self, venue: str) -> float:
+        v = self.state.price[self.i, self.state.venue_index[venue]].item()
+        return 0.0 if v != v else v
+
+    def funding(self, venue: str) -> float:
+        v = self.state.funding[self.i, self.state.venue_index[venue]].item()
+        return 0.0 if v != v else v
+
+    def recv(self, venue: str) -> int:
+        return int(self.state.recv[self.state.venue_index[venue], self.i]) or None
+
+    def event(self, venue: str) -> int:
+        """Clock ns the venue's quote describes, None = no quote"""
+        v = self.state.event[self.i, self.state.venue_index[venue]].item()
+        return None if v != v else int(v)
+
+    def age_ms(self, venue: str) -> float:
+        event = self.event(venue)
+        return math.inf if event is None else (self.state.clock.perf_ns() - event) / 1e6
+
+    def pair_age_ms(self, short: str, long: str) -> float:
+        """Age of the older leg of a fixed pair (open positions)"""
+        return max(self.age_ms(short), self.age_ms(long))
+
+    def book(self, venue: str):
+        return self.books.get(venue)
+
+    def _venue(self, column) -> str:
+        k = int(column[self.i])
+        return self.state.venues[k] if k >= 0 else None
+
+    @property
+    def spread(self) -> float:
+        return self.state.spread[self.i].item()
+
+    @property
+    def funding_diff(self) -> float:
+        return self.state.funding_diff[self.i].item()
+
+    @property
+    def buy_venue(self) -> str:
+        """Cheapest mid: the long leg"""
+        return self._venue(self.state.buy)
+
+    @property
+    def sell_venue(self) -> str:
+        """Richest mid: the short leg"""
+        return self._venue(self.state.sell)
+
+    @property
+    def funding_short(self) -> str:
+        """Highest funding: shorts get paid"""
+        return self._venue(self.state.fund_short)
+
+    @property
+    def funding_long(self) -> str:
+        return self._venue(self.state.fund_long)
+
+    @property
+    def skew_ms(self) -> float:
+        """Event time distance between the best route's legs"""
+        return self.state.skew[self.i].item()
+
+    @property
+    def staleness_ms(self) -> float:
+        """Age of the best route's older leg, inf without a route"""
+        if not self.quoted:
+            return math.inf
+        return self.pair_age_ms(self.sell_venue, self.buy_venue)
+
+    @property
+    def stale(self) -> bool:
+        return self.staleness_ms > QUOTE_MAX_AGE_MS
+
+    def pair_spread(self, short: str, long: str) -> float:
+        """Mid spread of a fixed pair, % of the long leg (open positions)"""
+        if not (self.has(short) and self.has(long)):
+            return 0.0
+        lo = self.price(long)
+        return (self.price(short) - lo) / lo * 100 if lo > 0 else 0.0
+
+    # Funding forecast (FundingTracker): fractions of notional per hour
+    def forecast(self, venue: str, now: float = None) -> float:
+        """EWMA forecast of one venue's rate, 0.0 = never quoted"""
+        v = self.state.carry.forecast(self.i, self.state.venue_index[venue], now or self.state.clock.perf_ns() / 1e9)
+        return 0.0 if v != v else v
+
+    def carry(self, short: str, long: str, now: float = None) -> float:
+        """Forecast net carry of a fixed pair: short receives its rate, long pays its own"""
+        now = now or self.state.clock.perf_ns() / 1e9
+        return self.forecast(short, now) - self.forecast(long, now)
+
+    def carry_samples(self, short: str, long: str) -> int:
+        """History behind the pair's forecast (samples of the thinner leg)"""
+        carry, index = self.state.carry, self.state.venue_index
+        return min(carry.samples(self.i, index[short]), carry.samples(self.i, index[long]))
+
+    def carry_route(self, now: float = None) -> tuple:
+        """
+        (carry, short, long) of the best forecast pair over quoted venues with at
+        least FUNDING_MIN_SAMPLES of history, (0.0, None, None) below two. O(venues).
+        """
+        state, i = self.state, self.i
+        now = now or self.state.clock.perf_ns() / 1e9
+        short = long = None
+        hi = lo = 0.0
+        for v, venue in enumerate(state.venues):
+            if math.isnan(state.price[i, v]) or state.carry.samples(i, v) < FUNDING_MIN_SAMPLES:
+                continue
+            f = state.carry.forecast(i, v, now)
+            if short is None or f > hi:
+                if short is not None and (long is None or hi < lo):
+                    long, lo = short, hi
+                short, hi = venue, f
+            elif long is None or f < lo:
+                long, lo = venue, f
+        if long is None:
+            return (0.0, None, None)
+        return (hi - lo, short, long)
+
+    # Spread statistics (SpreadStats) of the best-route spread, NaN until there is history
+    @property
+    def spread_samples(self) -> int:
+        return int(self.state.stats.count[self.i])
+
+    @property
+    def spread_mean(self) -> float:
+        return self.state.stats.mean[self.i].item() if self.spread_samples else math.nan
+
+    @property
+    def spread_std(self) -> float:
+        return float(self.state.stats.std(self.i))
+
+    @property
+    def spread_ewma(self) -> float:
+        return self.state.stats.ewma[self.i].item() if self.spread_samples else math.nan
+
+    @property
+    def zscore(self) -> float:
+        """Current best-route spread against its rolling mean / std"""
+        return self.spread_z(self.spread)
+
+    def spread_z(self, spread: float) -> float:
+        """z-score of any spread of this symbol (e.g. |pair_spread| of a held pair)"""
+        return float(self.state.stats.zscore(self.i, spread))
+
+    @property
+    def half_life_sec(self) -> float:
+        """Mean-reversion half-life of the spread, inf = not reverting"""
+        return float(self.state.stats.half_life(self.i))
+
+    # Render-time formatting
+    @property
+    def quoted(self) -> bool:
+        return self.buy_venue is not None
+
+    @property
+    def route(self) -> str:
+        if not self.quoted:
+            return "-"
+        return f"{self.buy_venue.upper()} -> {self.sell_venue.upper()}"
+
+    @property
+    def status(self) -> str:
+        if not self.quoted:
+            # Two venues quote, just not within QUOTE_SKEW_MS of each other
+            return "Skewed" if self.funding_short is not None else "Syncing..."
+        if self.stale:
+            return "Stale"
+        if abs(self.spread) > SPREAD_HIGHLIGHT:
+            return "Watching (SPREAD)"
+        if abs(self.funding_diff) > FUNDING_HIGHLIGHT:
+            return "Watching (FUNDING)"
+        return "Watching"
+
+    @property
+    def color(self) -> str:
+        if not self.quoted or self.stale:
+            return "dim white"
+        return "bold green" if abs(self.spread) > SPREAD_HIGHLIGHT else "white"
+
+    def to_dict(self) -> dict:
+        """Plain snapshot (logging / serialization)"""
+        out = {"symbol": self.symbol}
+        for venue in self.venues:
+            out[f"{venue}_price"] = self.price(venue)
+            out[f"{venue}_funding"] = self.funding(venue)
+        out.update({
+            "spread": self.spread,
+            "funding_diff": self.funding_diff,
+            "buy_venue": self.buy_venue,
+            "sell_venue": self.sell_venue,
+            "skew_ms": self.skew_ms,
+            "staleness_ms": self.staleness_ms,
+            "status": self.status,
+            "color": self.color
+        })
+        return out
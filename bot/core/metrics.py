@@ -0,0 +1,175 @@
+import asyncio
+import functools
+import inspect
+import json
+import os
+import time
+from config import METRICS_ENABLED
+
+# Hot-path latency instrumentation.
+# Call sites guard with `if METRICS.enabled:` (one attribute read when off) and
+# METRICS.timed() returns the function untouched when disabled, so the cost is zero.
+#
+# Stages (ns):
+#   fetch.<venue>, fetch.book.<venue>  REST round trip
+#   parse.<venue>                      JSON decode + quote extraction
+#   poll_gap.<venue>                   time between successful REST snapshots (PollScheduler)
+#   spread                             SpreadEngine rebuild of one symbol
+#   decision                           Executor.on_opportunity
+#   render                             dashboard layout build
+#   tick_to_decision.<venue>           WS frame received -> executor done
+#   quote_age.<venue>                  quote receive -> decision that used it
+#   quote_skew                         event time distance between the best route's legs
+
+SUB_BITS = 7               # 64..128 sub-buckets per power of two: <1.6% relative error
+HALF = 1 << (SUB_BITS - 1)
+MAX_SHIFT = 40 - SUB_BITS  # clamp at ~18 minutes
+BUCKETS = (MAX_SHIFT + 2) * HALF
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of integer nanoseconds.
+    Exact below 128ns, then 64 linear sub-buckets per power of two.
+    record() is a few integer ops and one list increment.
+    """
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.reset()
+
+    def reset(self):
+        for i in range(BUCKETS):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns: int):
+        shift = ns.bit_length() - SUB_BITS
+        if shift <= 0:
+            idx = ns if ns > 0 else 0
+        elif shift > MAX_SHIFT:
+            idx = BUCKETS - 1
+        else:
+            idx = (shift << (SUB_BITS - 1)) + (ns >> shift)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    @staticmethod
+    def bucket_value(idx: int) -> float:
+        """Midpoint of a bucket (exact for the linear range)"""
+        if idx < 2 * HALF:
+            return float(idx)
+        shift = (idx >> (SUB_BITS - 1)) - 1
+        top = idx - (shift << (SUB_BITS - 1))
+        return (top << shift) + (1 << shift) / 2
+
+    def percentiles(self, qs) -> list:
+        """Values (ns) at each quantile in qs (0-100, ascending), one pass over the buckets"""
+        if not self.count:
+            return [0.0] * len(qs)
+        targets = [max(1, -(-self.count * q // 100)) for q in qs]
+        out = []
+        seen = 0
+        t = 0
+        for idx, c in enumerate(self.counts):
+            if not c:
+                continue
+            seen += c
+            while t < len(targets) and seen >= targets[t]:
+                out.append(min(self.bucket_value(idx), float(self.max)))
+                t += 1
+            if t == len(targets):
+                break
+        return out
+
+    def percentile(self, q: float) -> float:
+        return self.percentiles([q])[0]
+
+    def summary(self) -> dict:
+        p0, p50, p99, p999 = self.percentiles([0, 50, 99, 99.9])
+        return {
+            "count": self.count,
+            "mean_us": self.total / self.count / 1e3 if self.count else 0.0,
+            "min_us": p0 / 1e3,
+            "p50_us": p50 / 1e3,
+            "p99_us": p99 / 1e3,
+            "p999_us": p999 / 1e3,
+            "max_us": self.max / 1e3
+        }
+
+
+class Metrics:
+    """Named histogram registry (single event loop, no locking: other threads hand their samples to the loop)"""
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.histograms = {}
+        self.started = time.time()
+
+    def observe(self, name: str, ns: int):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        hist.record(ns)
+
+    def timed(self, name: str):
+        """Decorator for sync or async functions; identity when disabled"""
+        def wrap(fn):
+            if not self.enabled:
+                return fn
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_timed(*args, **kwargs):
+                    t0 = time.perf_counter_ns()
+                    try:
+                        return await fn(*args, **kwargs)
+                    finally:
+                        self.observe(name, time.perf_counter_ns() - t0)
+                return async_timed
+
+            @functools.wraps(fn)
+            def timed(*args, **kwargs):
+                t0 = time.perf_counter_ns()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter_ns() - t0)
+            return timed
+        return wrap
+
+    def summary(self) -> dict:
+        return {name: hist.summary() for name, hist in sorted(self.histograms.items())}
+
+    def reset(self):
+        for hist in self.histograms.values():
+            hist.reset()
+
+    def snapshot(self) -> dict:
+        return {
+            "ts": time.time(),
+            "uptime_s": time.time() - self.started,
+            "stages": self.summary()
+        }
+
+    @staticmethod
+    def write(path: str, snapshot: dict):
+        """Atomic JSON file for external scrapers"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp, path)
+
+    def dump(self, path: str):
+        self.write(path, self.snapshot())
+
+    async def dump_async(self, path: str):
+        """dump() from the event loop: summarized on the loop (no locking), written from a thread"""
+        await asyncio.to_thread(self.write, path, self.snapshot())
+
+
+METRICS = Metrics(METRICS_ENABLED)
@@ -0,0 +1,123 @@
+import numpy as np
+
+class BookSide:
+    """
+    One side of an L2 book kept as preallocated, sorted NumPy arrays.
+    levels[:n] is [[price, size], ...] with the best level at index 0
+    (bids descending, asks ascending). keys mirrors prices with the sign
+    flipped for bids so a single ascending searchsorted serves both sides.
+    """
+    def __init__(self, descending: bool, capacity: int = 128):
+        self.sign = -1.0 if descending else 1.0
+        self.levels = np.zeros((capacity, 2))
+        self.keys = np.zeros(capacity)
+        self.n = 0
+
+    def _grow(self):
+        cap = len(self.keys) * 2
+        levels = np.zeros((cap, 2))
+        keys = np.zeros(cap)
+        levels[:self.n] = self.levels[:self.n]
+        keys[:self.n] = self.keys[:self.n]
+        self.levels, self.keys = levels, keys
+
+    def load(self, prices, sizes):
+        """Replace the whole side (snapshot)"""
+        prices = np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        live = sizes > 0
+        prices, sizes = prices[live], sizes[live]
+        while len(prices) > len(self.keys):
+            self._grow()
+
+        keys = prices * self.sign
+        order = np.argsort(keys, kind='stable')
+        n = len(prices)
+        self.keys[:n] = keys[order]
+        self.levels[:n, 0] = prices[order]
+        self.levels[:n, 1] = sizes[order]
+        self.n = n
+
+    def update(self, price: float, size: float):
+        """Set one level; size <= 0 deletes it"""
+        key = price * self.sign
+        n = self.n
+        i = int(np.searchsorted(self.keys[:n], key))
+        exists = i < n and self.keys[i] == key
+
+        if size <= 0:
+            if exists:
+                self.keys[i:n - 1] = self.keys[i + 1:n]
+                self.levels[i:n - 1] = self.levels[i + 1:n]
+                self.n = n - 1
+        elif exists:
+            self.levels[i, 1] = size
+        else:
+            if n == len(self.keys):
+                self._grow()
+            self.keys[i + 1:n + 1] = self.keys[i:n]
+            self.levels[i + 1:n + 1] = self.levels[i:n]
+            self.keys[i] = key
+            self.levels[i, 0] = price
+            self.levels[i, 1] = size
+            self.n = n + 1
+
+    def view(self) -> np.ndarray:
+        """(n, 2) [price, size] view, best first. No copy."""
+        return self.levels[:self.n]
+
+    def best(self) -> float:
+        return self.levels[0, 0] if self.n else 0.0
+
+
+class OrderBook:
+    """
+    L2 book for one venue/symbol (snapshot + incremental deltas).
+    book['bids'] / book['asks'] return [[price, size], ...] views so it
+    drops into ExecutionSimulator wherever a dict book was expected.
+    """
+    def __init__(self, capacity: int = 128):
+        self.bids = BookSide(descending=True, capacity=capacity)
+        self.asks = BookSide(descending=False, capacity=capacity)
+        self.seq = 0
+        self.ts = 0
+
+    def apply_snapshot(self, bids: list, asks: list, seq: int = 0, ts: int = 0):
+        """bids/asks: [[price, size], ...] or (n, 2) arrays, in any order, str or float"""
+        for side, levels in ((self.bids, bids), (self.asks, asks)):
+            if len(levels):
+                arr = np.asarray(levels, dtype=float)
+                side.load(arr[:, 0], arr[:, 1])
+            else:
+                side.n = 0
+        self.seq = seq
+        self.ts = ts
+
+    def apply_delta(self, side: str, price: float, size: float):
+        """side: 'bids'/'asks' (or venue BUY/SELL), size 0 removes the level"""
+        book_side = self.bids if side in ('bids', 'BUY') else self.asks
+        book_side.update(float(price), float(size))
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key == 'bids':
+            return self.bids.view()
+        if key == 'asks':
+            return self.asks.view()
+        raise KeyError(key)
+
+    def __bool__(self):
+        return self.bids.n > 0 and self.asks.n > 0
+
+    @property
+    def best_bid(self) -> float:
+        return self.bids.best()
+
+    @property
+    def best_ask(self) -> float:
+        return self.asks.best()
+
+    @property
+    def mid(self) -> float:
+        if not self:
+            return 0.0
+        return (self.best_bid + self.best_ask) / 2
@@ -0,0 +1,373 @@
+import asyncio
+import time
+from config import (
+    HL_API_URL, HL_EXCHANGE_URL, HL_PRIVATE_KEY, HL_VAULT_ADDRESS, PARADEX_API_URL, PARADEX_JWT, ORDER_TIMEOUT_SEC,
+    STRATEGY_MAP, SIGNING_POOL, SIGNING_WORKERS
+)
+from core.transport import loads, dumps
+from core.signing import HLSigner, HLTemplate, SignerPool
+
+BUY, SELL = "BUY", "SELL"
+
+# Fill.status
+FILLED = "FILLED"     # whole size
+PARTIAL = "PARTIAL"   # IOC remainder cancelled
+REJECTED = "REJECTED" # venue refused / nothing filled
+ERROR = "ERROR"       # transport failure: fill state unknown
+
+
+class Leg:
+    """One IOC order: size in canonical units, limit per canonical unit"""
+    __slots__ = ('venue', 'symbol', 'side', 'size', 'limit', 'reduce_only')
+
+    def __init__(self, venue: str, symbol: str, side: str, size: float, limit: float, reduce_only: bool = False):
+        self.venue = venue
+        self.symbol = symbol
+        self.side = side
+        self.size = size
+        self.limit = limit
+        self.reduce_only = reduce_only
+
+
+class Fill:
+    """What came back for one Leg (canonical units)"""
+    __slots__ = ('leg', 'status', 'filled', 'avg_px', 'order_id', 'latency_ns', 'error')
+
+    def __init__(self, leg: Leg, status: str, filled: float = 0.0, avg_px: float = 0.0,
+                 order_id=None, latency_ns: int = 0, error: str = None):
+        self.leg = leg
+        self.status = status
+        self.filled = filled
+        self.avg_px = avg_px
+        self.order_id = order_id
+        self.latency_ns = latency_ns
+        self.error = error
+
+    @property
+    def signed(self) -> float:
+        """Filled size, negative when sold"""
+        return self.filled if self.leg.side == BUY else -self.filled
+
+    def __repr__(self):
+        return f"Fill({self.leg.venue} {self.leg.side} {self.filled}/{self.leg.size} @ {self.avg_px} {self.status})"
+
+
+class OrderClient:
+    """
+    One venue's order path. Everything that does not depend on the price is
+    resolved before the decision (prepare: market metadata, rounding rules,
+    warm keep-alive connection), build() turns a Leg into a ready-to-send,
+    signed request, and send() is only the network round trip + response parse.
+    Sizes and prices are canonical (per unit); Universe scale is applied here.
+    """
+    code = None
+    needs_signer = False # signing hook must be passed in (not derivable from config)
+
+    def __init__(self, http, universe):
+        self.http = http
+        self.universe = universe
+        self.markets = {}
+
+    async def prepare(self, symbols: list):
+        raise NotImplementedError
+
+    def build(self, leg: Leg):
+        """Leg -> opaque request ready for send()"""
+        raise NotImplementedError
+
+    async def build_async(self, leg: Leg):
+        """build(), signing on the client's pool when it has one"""
+        return self.build(leg)
+
+    def template_symbols(self) -> list:
+        """Symbols whose order templates are built up front: STRATEGY_MAP + the scanned universe"""
+        symbols = dict.fromkeys(list(STRATEGY_MAP) + list(self.universe.symbols))
+        return [s for s in symbols if self.universe.listed(self.code, s)]
+
+    def close(self):
+        pass
+
+    async def send(self, leg: Leg, request) -> Fill:
+        raise NotImplementedError
+
+    async def submit(self, leg: Leg) -> Fill:
+        return await self.send(leg, self.build(leg))
+
+    async def confirm(self, fill: Fill, request) -> Fill:
+        """ERROR fill -> its settled Fill looked up on the venue, None when the order cannot be found"""
+        return None
+
+    def native(self, symbol: str) -> tuple:
+        """(native name, scale): native px = px / scale, native size = size * scale"""
+        return self.universe.native_name(self.code, symbol), self.universe.scale(self.code, symbol)
+
+
+def hl_wire(x: float) -> str:
+    """HL number format: no trailing zeros, no exponent"""
+    s = f"{x:.8f}".rstrip('0').rstrip('.')
+    return "0" if s in ("", "-0") else s
+
+def hl_round_px(px: float, sz_decimals: int) -> float:
+    """5 significant figures and at most 6 - szDecimals decimals (perps)"""
+    return round(float(f"{px:.5g}"), 6 - sz_decimals)
+
+def step_of(increment: float) -> tuple:
+    """(increment, decimals it is written with)"""
+    return increment, max(0, -int(f"{increment:e}".split('e')[1])) if increment else 0
+
+def step(x: float, increment: float, decimals: int) -> str:
+    """x rounded to a multiple of increment (Paradex tick / size step)"""
+    if not increment:
+        return hl_wire(x)
+    return f"{round(x / increment) * increment:.{decimals}f}"
+
+
+class HyperliquidOrders(OrderClient):
+    """
+    POST /exchange order actions, IOC limit orders.
+    Signing: msgpack(action) + nonce + vault flag -> keccak -> EIP-712 'Agent'
+    digest signed with the API wallet key (core/signing.py). The msgpack of each
+    (symbol, side, reduce_only) action is templated in prepare(), an order only
+    packs its price / size strings.
+    Actions carry no client order id and an ERROR reply no oid, so an ERROR
+    leg cannot be confirmed (confirm() -> None).
+    """
+    code = "hl"
+
+    def __init__(self, http, universe, key: str = HL_PRIVATE_KEY, vault: str = HL_VAULT_ADDRESS,
+                 info_url: str = HL_API_URL, exchange_url: str = HL_EXCHANGE_URL,
+                 pool: str = SIGNING_POOL, workers: int = SIGNING_WORKERS):
+        super().__init__(http, universe)
+        if not key:
+            raise ValueError("HL_PRIVATE_KEY is required for live Hyperliquid orders")
+        self.vault = vault
+        self.info_url = info_url
+        self.exchange_url = exchange_url
+        self.signer = HLSigner(key, vault, "api.hyperliquid.xyz" in exchange_url, pool, workers)
+        # {(symbol, side, reduce_only): HLTemplate}
+        self.templates = {}
+        self.last_nonce = 0
+
+    async def prepare(self, symbols: list):
+        """{native name: (asset index, szDecimals)} from meta, order templates, signer pool"""
+        data = await self.http.post_json(self.info_url, {"type": "meta"})
+        if data is None:
+            raise IOError("HL meta: request failed")
+        self.markets = {u['name']: (i, u['szDecimals']) for i, u in enumerate(data['universe'])}
+        self.templates = {}
+        for symbol in dict.fromkeys(list(symbols) + self.template_symbols()):
+            if self.native(symbol)[0] in self.markets:
+                for side in (BUY, SELL):
+                    for reduce_only in (False, True):
+                        self.template(symbol, side, reduce_only)
+        self.signer.pool.warm()
+
+    def template(self, symbol: str, side: str, reduce_only: bool) -> HLTemplate:
+        key = (symbol, side, reduce_only)
+        template = self.templates.get(key)
+        if template is None:
+            asset = self.markets[self.native(symbol)[0]][0]
+            template = self.templates[key] = HLTemplate(asset, side == BUY, reduce_only)
+        return template
+
+    def nonce(self) -> int:
+        """ms timestamp, strictly increasing"""
+        n = max(int(time.time() * 1000), self.last_nonce + 1)
+        self.last_nonce = n
+        return n
+
+    def order_fields(self, leg: Leg) -> tuple:
+        """(template, price string, size string) in HL units"""
+        name, scale = self.native(leg.symbol)
+        sz_decimals = self.markets[name][1]
+        return (
+            self.template(leg.symbol, leg.side, leg.reduce_only),
+            hl_wire(hl_round_px(leg.limit / scale, sz_decimals)),
+            hl_wire(round(leg.size * scale, sz_decimals))
+        )
+
+    def body(self, template: HLTemplate, px: str, sz: str, nonce: int, signature: dict) -> bytes:
+        return dumps({
+            "action": template.action(px, sz),
+            "nonce": nonce,
+            "signature": signature,
+            "vaultAddress": self.vault
+        }).encode()
+
+    def build(self, leg: Leg) -> bytes:
+        template, px, sz = self.order_fields(leg)
+        nonce = self.nonce()
+        return self.body(template, px, sz, nonce, self.signer.sign(template.packed(px, sz), nonce))
+
+    async def build_async(self, leg: Leg) -> bytes:
+        template, px, sz = self.order_fields(leg)
+        nonce = self.nonce()
+        return self.body(template, px, sz, nonce, await self.signer.sign_async(template.packed(px, sz), nonce))
+
+    def close(self):
+        self.signer.pool.shutdown()
+
+    async def send(self, leg: Leg, request: bytes) -> Fill:
+        t0 = time.perf_counter_ns()
+        status, raw = await self.http.send("POST", self.exchange_url, request, {"Content-Type": "application/json"})
+        latency = time.perf_counter_ns() - t0
+        if status == 0:
+            return Fill(leg, ERROR, latency_ns=latency, error="timeout / connection error")
+        try:
+            data = loads(raw)
+            if status != 200 or data.get('status') != 'ok':
+                return Fill(leg, REJECTED, latency_ns=latency, error=str(data.get('response', data)))
+            result = data['response']['data']['statuses'][0]
+        except Exception as e:
+            return Fill(leg, ERROR if status == 200 else REJECTED, latency_ns=latency, error=f"HTTP {status}: {e}")
+
+        if 'filled' not in result:
+            # {"error": "..."} or an IOC that matched nothing
+            return Fill(leg, REJECTED, latency_ns=latency, error=str(result.get('error', result)))
+        name, scale = self.native(leg.symbol)
+        requested = round(leg.size * scale, self.markets[name][1])
+        filled = float(result['filled']['totalSz'])
+        return Fill(
+            leg, FILLED if filled >= requested * (1 - 1e-9) else PARTIAL, filled / scale,
+            float(result['filled']['avgPx']) * scale, result['filled'].get('oid'), latency
+        )
+
+
+class ParadexOrders(OrderClient):
+    """
+    POST /orders (JWT bearer), IOC limit orders; fills are confirmed with
+    GET /orders/{id} until the order is CLOSED.
+    Paradex signs orders with a StarkNet key: signer(order) -> signature string
+    is pluggable, None sends unsigned orders (mock exchange only). With a
+    signing pool the hook runs on a thread pool (it need not be picklable).
+    The static part of each (symbol, side, reduce_only) order and its rounding
+    steps are templated in prepare().
+    """
+    code = "px"
+    needs_signer = True
+
+    def __init__(self, http, universe, jwt: str = PARADEX_JWT, api_url: str = PARADEX_API_URL, signer=None,
+                 timeout: float = ORDER_TIMEOUT_SEC, pool: str = SIGNING_POOL, workers: int = SIGNING_WORKERS):
+        super().__init__(http, universe)
+        if not jwt:
+            raise ValueError("PARADEX_JWT is required for live Paradex orders")
+        self.api_url = api_url
+        self.signer = signer
+        self.pool = SignerPool("THREAD" if signer and pool.upper() != "NONE" else "NONE", workers)
+        self.timeout = timeout
+        self.headers = {"Authorization": f"Bearer {jwt}", "Content-Type": "application/json"}
+        # {(symbol, side, reduce_only): (static order fields, (tick, decimals), (increment, decimals))}
+        self.templates = {}
+
+    async def prepare(self, symbols: list):
+        """{market: ((price tick, decimals), (size increment, decimals))} from /markets, order templates"""
+        data = await self.http.get_json(f"{self.api_url}/markets")
+        if data is None:
+            raise IOError("Paradex markets: request failed")
+        self.markets = {
+            m['symbol']: (
+                step_of(float(m.get('price_tick_size', 0) or 0)),
+                step_of(float(m.get('order_size_increment', 0) or 0))
+            )
+            for m in data.get('results', [])
+        }
+        self.templates = {}
+        for symbol in dict.fromkeys(list(symbols) + self.template_symbols()):
+            if f"{self.native(symbol)[0]}-USD-PERP" in self.markets:
+                for side in (BUY, SELL):
+                    for reduce_only in (False, True):
+                        self.template(symbol, side, reduce_only)
+        self.pool.warm()
+
+    def template(self, symbol: str, side: str, reduce_only: bool) -> tuple:
+        key = (symbol, side, reduce_only)
+        template = self.templates.get(key)
+        if template is None:
+            market = f"{self.native(symbol)[0]}-USD-PERP"
+            fields = {"market": market, "side": side, "type": "LIMIT", "instruction": "IOC"}
+            if reduce_only:
+                fields["flags"] = ["REDUCE_ONLY"]
+            tick, increment = self.markets.get(market, ((0.0, 0), (0.0, 0)))
+            template = self.templates[key] = (fields, tick, increment)
+        return template
+
+    def order(self, leg: Leg) -> dict:
+        fields, tick, increment = self.template(leg.symbol, leg.side, leg.reduce_only)
+        scale = self.universe.scale(self.code, leg.symbol)
+        return {
+            **fields,
+            "size": step(leg.size * scale, *increment),
+            "price": step(leg.limit / scale, *tick),
+            "client_id": f"arb-{time.time_ns()}",
+            "signature_timestamp": int(time.time() * 1000)
+        }
+
+    def build(self, leg: Leg) -> bytes:
+        order = self.order(leg)
+        if self.signer:
+            order["signature"] = self.signer(order)
+        return dumps(order).encode()
+
+    async def build_async(self, leg: Leg) -> bytes:
+        if self.pool.executor is None:
+            return self.build(leg)
+        order = self.order(leg)
+        order["signature"] = await asyncio.get_running_loop().run_in_executor(self.pool.executor, self.signer, order)
+        return dumps(order).encode()
+
+    def close(self):
+        self.pool.shutdown()
+
+    async def send(self, leg: Leg, request: bytes) -> Fill:
+        t0 = time.perf_counter_ns()
+        status, raw = await self.http.send("POST", f"{self.api_url}/orders", request, self.headers)
+        latency = time.perf_counter_ns() - t0
+        if status == 0:
+            return Fill(leg, ERROR, latency_ns=latency, error="timeout / connection error")
+        try:
+            order = loads(raw)
+        except Exception as e:
+            return Fill(leg, REJECTED, latency_ns=latency, error=f"HTTP {status}: {e}")
+        if status not in (200, 201):
+            return Fill(leg, REJECTED, latency_ns=latency, error=str(order.get('message', order)))
+
+        # Accepted: IOC settles quickly, poll until CLOSED
+        deadline = time.monotonic() + self.timeout
+        while order.get('status') != 'CLOSED' and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            status, raw = await self.http.send("GET", f"{self.api_url}/orders/{order['id']}", None, self.headers)
+            if status == 200:
+                order = loads(raw)
+        if order.get('status') != 'CLOSED':
+            return Fill(leg, ERROR, order_id=order.get('id'), latency_ns=latency, error="fill not confirmed")
+        return self.settled(leg, order, latency)
+
+    async def confirm(self, fill: Fill, request: bytes) -> Fill:
+        """GET the order by id, or by client_id when the POST never answered"""
+        if fill.order_id is not None:
+            url = f"{self.api_url}/orders/{fill.order_id}"
+        else:
+            url = f"{self.api_url}/orders/by_client_id/{loads(request)['client_id']}"
+        status, raw = await self.http.send("GET", url, None, self.headers)
+        if status != 200:
+            return None
+        try:
+            order = loads(raw)
+        except Exception:
+            return None
+        if order.get('status') != 'CLOSED':
+            return None
+        return self.settled(fill.leg, order, fill.latency_ns)
+
+    def settled(self, leg: Leg, order: dict, latency: int) -> Fill:
+        """Fill of a CLOSED order"""
+        _, scale = self.native(leg.symbol)
+        remaining = float(order.get('remaining_size', 0) or 0)
+        filled = (float(order['size']) - remaining) / scale
+        avg_px = float(order.get('avg_fill_price', 0) or 0) * scale
+        if filled <= 0:
+            return Fill(leg, REJECTED, order_id=order['id'], latency_ns=latency, error=order.get('cancel_reason'))
+        return Fill(leg, FILLED if remaining <= 0 else PARTIAL, filled, avg_px, order['id'], latency)
+
+
+ORDER_CLIENTS = {client.code: client for client in (HyperliquidOrders, ParadexOrders)}
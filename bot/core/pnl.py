@@ -0,0 +1,185 @@
+import time
+from config import VENUE_FEES, SIMULATION_SIZE_USD
+
+
+class PositionPnL:
+    """
+    Running PnL of one two-leg position, USD.
+    Legs are marked at venue mids; funding accrues continuously at the last seen
+    hourly rates (short receives its venue's rate, long pays its own) on the
+    marked notional, i.e. the per-interval payment spread over the interval.
+    """
+    __slots__ = (
+        'symbol', 'short', 'long', 'size_short', 'size_long', 'entry_short', 'entry_long',
+        'fee_short', 'fee_long', 'fees', 'funding', 'mark_short', 'mark_long',
+        'rate', 'marked', 'unrealized'
+    )
+
+    def __init__(self, symbol: str, pos: dict, size_usd: float):
+        self.symbol = symbol
+        self.short = pos['short_venue']
+        self.long = pos['long_venue']
+        # Live fills when there are any, the decision prices otherwise (paper)
+        self.entry_short = pos.get('fill_short') or pos['entry_short']
+        self.entry_long = pos.get('fill_long') or pos['entry_long']
+        notional = pos.get('notional', size_usd)
+        self.size_short = pos['size_short'] if 'size_short' in pos else notional / self.entry_long
+        self.size_long = pos['size_long'] if 'size_long' in pos else notional / self.entry_long
+        self.fee_short = VENUE_FEES[self.short]
+        self.fee_long = VENUE_FEES[self.long]
+        # Taker fees of the entry, paid already
+        self.fees = self.fee_short * self.entry_short * self.size_short + self.fee_long * self.entry_long * self.size_long
+        self.funding = pos.get('funding_accrued', 0.0)
+        self.mark_short = self.entry_short
+        self.mark_long = self.entry_long
+        self.rate = 0.0         # net funding income, USD per hour
+        self.marked = time.time()
+        self.unrealized = self.value()
+
+    @property
+    def notional(self) -> float:
+        return self.mark_short * self.size_short + self.mark_long * self.size_long
+
+    @property
+    def legs(self) -> float:
+        """Mark-to-market of both legs"""
+        return (self.entry_short - self.mark_short) * self.size_short + (self.mark_long - self.entry_long) * self.size_long
+
+    @property
+    def exit_fees(self) -> float:
+        """Taker fees closing at the marks would cost"""
+        return self.fee_short * self.mark_short * self.size_short + self.fee_long * self.mark_long * self.size_long
+
+    def value(self) -> float:
+        """Net PnL if closed at the marks now"""
+        return self.legs + self.funding - self.fees - self.exit_fees
+
+    def mark(self, mark_short: float, mark_long: float, rate_short: float, rate_long: float, now: float) -> float:
+        """Accrue funding since the last mark, re-mark the legs. Returns the change in value."""
+        hours = (now - self.marked) / 3600
+        if hours > 0:
+            self.funding += self.rate * hours
+        self.marked = now
+        if mark_short > 0:
+            self.mark_short = mark_short
+        if mark_long > 0:
+            self.mark_long = mark_long
+        # USD per hour (rates are hourly): short receives its rate, long pays its own
+        self.rate = rate_short * self.mark_short * self.size_short - rate_long * self.mark_long * self.size_long
+        old = self.unrealized
+        self.unrealized = self.value()
+        return self.unrealized - old
+
+    def reduce(self, closed_short: float, closed_long: float, exit_short: float, exit_long: float) -> float:
+        """
+        Part of the position closed at exit prices (live partial exits). Realizes
+        the closed sizes' leg PnL and their share of funding / fees, keeps the rest.
+        """
+        share_short = min(1.0, closed_short / self.size_short) if self.size_short else 1.0
+        share_long = min(1.0, closed_long / self.size_long) if self.size_long else 1.0
+        share = (share_short + share_long) / 2
+        realized = (
+            (self.entry_short - exit_short) * closed_short + (exit_long - self.entry_long) * closed_long
+            + share * (self.funding - self.fees)
+            - self.fee_short * exit_short * closed_short - self.fee_long * exit_long * closed_long
+        )
+        self.size_short -= closed_short
+        self.size_long -= closed_long
+        self.funding *= 1 - share
+        self.fees *= 1 - share
+        self.unrealized = self.value()
+        return realized
+
+    def to_dict(self) -> dict:
+        return {
+            "notional": self.notional,
+            "legs": self.legs,
+            "funding": self.funding,
+            "fees": self.fees + self.exit_fees,
+            "unrealized": self.unrealized
+        }
+
+
+class PnLEngine:
+    """
+    Realized / unrealized PnL of the Executor's positions.
+    mark() runs on every tick of a held symbol and is O(1): the position is
+    re-marked and the aggregate adjusted by its change, nothing else is touched.
+    mark_all() re-marks every open position (O(open positions)), so funding
+    keeps accruing on symbols that stopped ticking.
+    """
+    def __init__(self, size_usd: float = SIMULATION_SIZE_USD, realized: dict = None):
+        self.size_usd = size_usd
+        self.positions = {}
+        # {symbol: realized USD} of closed positions (journal history included)
+        self.closed = dict(realized or {})
+        self.realized = sum(self.closed.values())
+        self.unrealized = 0.0 # sum of open positions' value
+
+    def open(self, symbol: str, pos: dict) -> PositionPnL:
+        pnl = self.positions[symbol] = PositionPnL(symbol, pos, pos.get('notional', self.size_usd))
+        self.unrealized += pnl.unrealized
+        return pnl
+
+    def mark(self, opp, now: float = None):
+        pnl = self.positions.get(opp['symbol'])
+        if pnl is None:
+            return
+        self.unrealized += pnl.mark(
+            opp.price(pnl.short), opp.price(pnl.long), opp.funding(pnl.short), opp.funding(pnl.long),
+            now or time.time()
+        )
+
+    def mark_all(self, market: dict):
+        now = time.time()
+        for symbol in self.positions:
+            opp = market.get(symbol)
+            if opp is not None:
+                self.mark(opp, now)
+        # Exact re-sum: no drift from weeks of incremental updates
+        self.unrealized = sum(pnl.unrealized for pnl in self.positions.values())
+
+    def close(self, symbol: str, opp=None, exit_short: float = 0.0, exit_long: float = 0.0) -> dict:
+        """
+        Final mark at the exit fills (exit_short / exit_long, live) or the mids of
+        opp, returns the position's PnL breakdown.
+        """
+        pnl = self.positions.get(symbol)
+        if pnl is None:
+            return {}
+        if opp is not None:
+            self.mark(opp)
+        if exit_short or exit_long:
+            self.unrealized += pnl.mark(exit_short, exit_long, 0.0, 0.0, time.time())
+        del self.positions[symbol]
+        self.unrealized -= pnl.unrealized
+        self.realized += pnl.unrealized
+        self.closed[symbol] = self.closed.get(symbol, 0.0) + pnl.unrealized
+        record = pnl.to_dict()
+        record["realized"] = record.pop("unrealized")
+        return record
+
+    def reduce(self, symbol: str, closed_short: float, closed_long: float, exit_short: float, exit_long: float) -> float:
+        """Partial exit: realize the closed part, returns its PnL"""
+        pnl = self.positions.get(symbol)
+        if pnl is None:
+            return 0.0
+        old = pnl.unrealized
+        realized = pnl.reduce(closed_short, closed_long, exit_short or pnl.mark_short, exit_long or pnl.mark_long)
+        self.unrealized += pnl.unrealized - old
+        self.realized += realized
+        self.closed[symbol] = self.closed.get(symbol, 0.0) + realized
+        return realized
+
+    def get(self, symbol: str) -> PositionPnL:
+        return self.positions.get(symbol)
+
+    def summary(self) -> dict:
+        """Aggregate + per-symbol figures for the dashboard"""
+        return {
+            "realized": self.realized,
+            "unrealized": self.unrealized,
+            "total": self.realized + self.unrealized,
+            "positions": {symbol: pnl.to_dict() for symbol, pnl in self.positions.items()},
+            "closed": dict(self.closed)
+        }
@@ -0,0 +1,72 @@
+import json
+import os
+import struct
+import time
+
+# Append-only market data log.
+# Record = header + symbol + payload, payload being the raw venue update as compact JSON
+# (HL asset ctx / l2Book data, Paradex summary item / order_book data).
+#   header: <Q ts_ns (local receive time), B venue, B kind, H symbol_len, I payload_len
+HEADER = struct.Struct("<QBBHI")
+
+VENUES = ("hl", "px", "bn") # append only: the index is on disk
+VENUE_CODES = {v: i for i, v in enumerate(VENUES)}
+
+KIND_CTX = 0  # ticker / funding context
+KIND_BOOK = 1 # L2 snapshot or delta
+
+class MarketRecorder:
+    """
+    Buffered writer: records are packed into memory and flushed to disk when the
+    buffer passes flush_bytes or flush_interval seconds, so the hot path never
+    waits on a syscall per update.
+    """
+    def __init__(self, path: str, flush_bytes: int = 1 << 16, flush_interval: float = 1.0):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.file = open(path, 'ab')
+        self.buffer = bytearray()
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.records = 0
+
+    def record(self, venue: str, kind: int, symbol: str, payload, ts_ns: int = None):
+        sym = symbol.encode()
+        body = json.dumps(payload, separators=(',', ':')).encode()
+        self.buffer += HEADER.pack(ts_ns or time.time_ns(), VENUE_CODES[venue], kind, len(sym), len(body))
+        self.buffer += sym
+        self.buffer += body
+        self.records += 1
+
+        if len(self.buffer) >= self.flush_bytes or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.file.flush()
+            self.buffer.clear()
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+def read_log(path: str):
+    """Yields (ts_ns, venue, kind, symbol, payload) in recorded order. Stops at a torn tail."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    pos = 0
+    end = len(data)
+    while pos + HEADER.size <= end:
+        ts_ns, venue, kind, sym_len, body_len = HEADER.unpack_from(data, pos)
+        pos += HEADER.size
+        if pos + sym_len + body_len > end:
+            break
+        symbol = data[pos:pos + sym_len].decode()
+        pos += sym_len
+        payload = json.loads(data[pos:pos + body_len])
+        pos += body_len
+        yield ts_ns, VENUES[venue], kind, symbol, payload
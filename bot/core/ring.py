@@ -0,0 +1,75 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+HEADER_BYTES = 64 # head, tail cursors (own cache line)
+
+class SharedRing:
+    """
+    Single-producer / single-consumer ring of fixed-size NumPy records in a
+    SharedMemory block, for handing parsed updates from a worker process to the
+    trading loop without pickling or a pipe.
+      cursor   int64[2]: head = records ever written, tail = records ever read
+               (the producer only moves head, the consumer only moves tail)
+      records  (slots,) of dtype, record k lives in slot k % slots
+    dtype must have an int64 'seq' field: the producer stamps it with k before
+    publishing head, and the consumer stops at the first record whose seq is not
+    the expected one, so a half-written record is never applied.
+    """
+    def __init__(self, dtype: np.dtype, slots: int, name: str = None):
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+        size = HEADER_BYTES + slots * self.dtype.itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            # Spawned workers share the creator's resource tracker, so attaching
+            # does not hand them the unlink: only the creator owns the block
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.name = self.shm.name
+        self.cursor = np.ndarray(2, dtype=np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray(slots, dtype=self.dtype, buffer=self.shm.buf, offset=HEADER_BYTES)
+        if self.owner:
+            self.cursor[:] = 0
+
+    # Producer side
+    def claim(self):
+        """Next free record (a writable view), None when the ring is full"""
+        head, tail = self.cursor.tolist()
+        if head - tail >= self.slots:
+            return None
+        return self.records[head % self.slots]
+
+    def commit(self, record):
+        """Publish the record returned by claim()"""
+        head = int(self.cursor[0])
+        record['seq'] = head
+        self.cursor[0] = head + 1
+
+    # Consumer side
+    def read(self, limit: int = None) -> np.ndarray:
+        """Copy of the unread records (at most limit), oldest first; marks them read"""
+        head, tail = self.cursor.tolist()
+        if limit is not None:
+            head = min(head, tail + limit)
+        if head == tail:
+            return self.records[:0].copy()
+        expected = np.arange(tail, head)
+        batch = self.records[expected % self.slots]
+        torn = np.flatnonzero(batch['seq'] != expected)
+        if len(torn):
+            batch = batch[:torn[0]]
+        self.cursor[1] = tail + len(batch)
+        return batch
+
+    def backlog(self) -> int:
+        head, tail = self.cursor.tolist()
+        return head - tail
+
+    def close(self):
+        # Views into the buffer must go before the mapping can close
+        self.cursor = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
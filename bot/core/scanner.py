@@ -1,150 +1,107 @@
 
-import asyncio
-import aiohttp
-import json
-from config import SYMBOLS, HL_API_URL, PARADEX_API_URL, SIMULATION_SIZE_USD
+from config import FEED_MODE, RECORD_PATH, FEED_WORKERS
 from core.simulator import ExecutionSimulator
+from core.engine import SpreadEngine
+from core.recorder import MarketRecorder
+from core.universe import Universe
+from core.venues import ADAPTERS
+from core.transport import Transport
+from core.scheduler import PollScheduler
+from core.feed_workers import FeedWorkers
 
 class Scanner:
-    def __init__(self):
-        self.session = None
+    def __init__(self, mode: str = FEED_MODE, record_path: str = RECORD_PATH, workers: int = FEED_WORKERS):
+        # Pooled HTTP client shared by the adapters, one keep-alive pool per venue host
+        self.http = None
         self.simulator = ExecutionSimulator()
+        self.mode = mode.upper()
+        # STATIC: config.SYMBOLS, AUTO: every perp listed on at least two VENUES
+        self.universe = Universe()
+        self.engine = SpreadEngine(self.universe.symbols, self.universe.venues)
+        # Columnar market table (prices, funding, spreads), updated in place
+        self.state = self.engine.state
+        # {venue: VenueFeed}, websocket venues only (WS mode)
+        self.feeds = {}
+        # Same feeds in worker processes instead (WS mode, workers > 0, not recording)
+        self.workers = workers if self.mode == "WS" and not record_path else 0
+        self.feed_workers = None
+        # Raw venue updates -> append-only log (replay.py feeds it back)
+        self.recorder = MarketRecorder(record_path) if record_path else None
+        # {venue: VenueAdapter}, one per config.VENUES entry
+        self.adapters = {code: ADAPTERS[code](self.universe, self.recorder) for code in self.universe.venues}
+        # Per-venue REST polling (every venue in REST mode, REST-only venues in WS mode)
+        self.scheduler = None
 
     async def start(self):
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        self.http = Transport()
+
+        if await self.universe.maybe_refresh(self.http, self.adapters):
+            self.engine.set_symbols(self.universe.symbols)
+
+        if self.workers and not self.feed_workers:
+            self.feed_workers = FeedWorkers(
+                self.engine, self.universe, [code for code, a in self.adapters.items() if a.feed_class], self.workers
+            )
+            self.feed_workers.start()
+        elif self.mode == "WS" and not self.workers and not self.feeds:
+            self.feeds = self.make_feeds(self.recorder)
+            for feed in self.feeds.values():
+                feed.start()
+
+        streamed = set(self.feeds) | set(self.feed_workers.venues if self.feed_workers else ())
+        polled = [a for code, a in self.adapters.items() if code not in streamed]
+        if polled and not self.scheduler:
+            self.scheduler = PollScheduler(self.engine, self.universe, polled, self.http)
+            self.scheduler.start()
+
+    def make_feeds(self, recorder=None) -> dict:
+        """Websocket feeds for the venues that have one, each subscribed to the symbols it lists"""
+        return {
+            code: adapter.feed_class(
+                self.listed(code),
+                self.update_quote, books=self.engine.books[code], on_book=self.engine.on_book,
+                recorder=recorder, universe=self.universe
+            )
+            for code, adapter in self.adapters.items() if adapter.feed_class
         }
-        # FIX: Disable SSL Verification for macOS compatibility
-        connector = aiohttp.TCPConnector(ssl=False)
-        self.session = aiohttp.ClientSession(headers=headers, connector=connector)
 
-    async def stop(self):
-        if self.session:
-            await self.session.close()
+    def listed(self, venue: str) -> list:
+        return [s for s in self.universe.symbols if self.universe.listed(venue, s)]
 
-    async def fetch_hyperliquid(self):
-        """Fetches Ticker (MidPx) & Funding for initial scan"""
-        try:
-            async with self.session.post(HL_API_URL, json={"type": "metaAndAssetCtxs"}) as resp:
-                if resp.status != 200: return {}
-                data = await resp.json()
-                universe = data[0]['universe']
-                ctxs = data[1]
-                market_data = {}
-                for i, u in enumerate(universe):
-                   symbol = u['name']
-                   if symbol in SYMBOLS:
-                       # Extract Price and Funding
-                       # Funding in HL is hourly? Need to verify. Usually it's funding rate per hour.
-                       market_data[symbol] = {
-                           "price": float(ctxs[i]['midPx']),
-                           "funding": float(ctxs[i].get('funding', 0.0))
-                       }
-                return market_data
-        except Exception as e:
-            return {}
+    async def stop(self):
+        if self.scheduler:
+            await self.scheduler.stop()
+            self.scheduler = None
+        for feed in self.feeds.values():
+            await feed.stop()
+        self.feeds = {}
+        if self.feed_workers:
+            await self.feed_workers.stop()
+            self.feed_workers = None
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+        if self.http:
+            await self.http.close()
+            self.http = None
 
-    async def fetch_paradex(self):
-        """Fetches Paradex Ticker & Funding"""
-        try:
-            # FIX: Add market=ALL to get all summaries
-            async with self.session.get(f"{PARADEX_API_URL}/markets/summary?market=ALL") as resp:
-                if resp.status != 200: 
-                    # Try reading text to log error if needed, but return empty for safety
-                    return {}
-                data = await resp.json()
-                market_data = {}
-                for item in data.get('results', []):
-                    base = item['symbol'].split('-')[0]
-                    if base in SYMBOLS:
-                        bid = float(item.get('bid', 0))
-                        ask = float(item.get('ask', 0))
-                        # Use Mid or fallback to Mark Price
-                        mid = (bid + ask) / 2 if bid and ask else float(item.get('mark_price', 0))
-                        
-                        # Paradex funding usually 'current_funding_rate' or 'funding_rate'
-                        # Using get('funding_rate', 0) as generic fallback
-                        funding = float(item.get('current_funding_rate', item.get('funding_rate', 0.0)))
-                        
-                        market_data[base] = {
-                            "price": mid,
-                            "funding": funding
-                        }
-                return market_data
-        except Exception as e:
-            return {}
-            
-    # ... (L2 methods remain same) ...
+    async def update_quote(self, venue: str, symbol: str, quote: dict):
+        """Feed callback: recompute only the symbol that ticked"""
+        await self.engine.on_quote(venue, symbol, quote)
 
     async def scan(self):
-        if not self.session: await self.start()
-            
-        hl_data, px_data = await asyncio.gather(self.fetch_hyperliquid(), self.fetch_paradex())
-        opps = []
-        
-        for sym in SYMBOLS:
-            hl = hl_data.get(sym)
-            px = px_data.get(sym)
-            
-            # Default values
-            hl_price = hl['price'] if hl else 0.0
-            px_price = px['price'] if px else 0.0
-            
-            hl_display = f"${hl_price:.4f}" if hl else "---"
-            px_display = f"${px_price:.4f}" if px else "---"
-            
-            spread_display = 0.0
-            funding_diff = 0.0
-            
-            status = "Syncing..."
-            color = "dim white"
-
-            if hl and px:
-                # 1. Price Spread Calculation
-                raw_diff = px_price - hl_price
-                raw_spread = (raw_diff / hl_price) * 100 if hl_price > 0 else 0
-                spread_display = raw_spread
-                
-                # 2. Funding Diff Calculation (Annualized %)
-                # Funding is usually hourly (HL) or 8h? Assume hourly for simplified diff
-                # Need to normalize to APR for display or just raw diff
-                funding_hl = hl.get('funding', 0)
-                funding_px = px.get('funding', 0)
-                funding_diff = funding_hl - funding_px 
-                
-                status = "Watching"
-                color = "white"
-                
-                # 3. Strategy Routing (Visual Only here, execution logic in Executor)
-                # We can hint which strategy is active in the status
-                
-                # ... (L2 Check kept for convergence strategy, can skip for Funding) ...
-                
-                real_spread = raw_spread
-                
-                # Visualization Logic
-                spread_display = real_spread
-                
-                if abs(real_spread) > 0.5:
-                    color = "bold green"
-                    status += " (SPREAD)"
-                elif abs(funding_diff) > 0.001: # Arbitrary small threshold for funding
-                     status += " (FUNDING)"
+        """
+        Universe upkeep + display snapshot. Quotes arrive on their own:
+        websocket feeds and the PollScheduler push into the engine, which emits
+        every change to the subscribers.
+        """
+        if not self.http: await self.start()
 
-            # Always append to show row
-            opps.append({
-                "symbol": sym,
-                "hl_price": hl_price,
-                "px_price": px_price,
-                "hl_funding": hl.get('funding', 0) if hl else 0,
-                "px_funding": px.get('funding', 0) if px else 0,
-                "hl_display": hl_display, 
-                "px_display": px_display,
-                "spread": spread_display,
-                "funding_diff": funding_diff,
-                "status": status,
-                "color": color
-            })
-        
-        opps.sort(key=lambda x: abs(x['spread']), reverse=True)
-        return opps
+        if await self.universe.maybe_refresh(self.http, self.adapters):
+            # Rows + books first, then the open sockets subscribe the new symbols
+            self.engine.set_symbols(self.universe.symbols)
+            for code, feed in self.feeds.items():
+                await feed.set_symbols(self.listed(code))
+            if self.feed_workers:
+                self.feed_workers.set_symbols()
+        return self.engine.snapshot()
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from config import (
+    STRATEGY_MAP, VENUE_FEES, MIN_PROFIT_THRESHOLD, BOOK_CANDIDATES_MAX,
+    VENUE_RATE_LIMITS, VENUE_QUOTE_WEIGHT, VENUE_BOOK_WEIGHT, RATE_BUDGET_FRACTION,
+    POLL_INTERVAL_HOT, POLL_INTERVAL_IDLE, BOOK_INTERVAL_HOT, BOOK_INTERVAL_IDLE,
+    HOT_BAND, POLL_BACKOFF_MAX
+)
+from core.metrics import METRICS
+from core.transport import RETRYABLE
+
+logger = logging.getLogger(__name__)
+MIN_SLEEP_SEC = 0.01
+# Venue unreachable / sent something unparseable: the call counts as failed
+POLL_ERRORS = RETRYABLE + (KeyError, TypeError, ValueError, IndexError)
+
+class RateBudget:
+    """
+    Token bucket in request weight: refills fraction * limit per second, holds
+    one second of burst (at least one of the venue's heaviest calls).
+    """
+    def __init__(self, per_minute: float, max_weight: float, fraction: float = RATE_BUDGET_FRACTION):
+        self.rate = per_minute * fraction / 60.0
+        self.capacity = max(self.rate, max_weight)
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def take(self, weight: float, now: float) -> bool:
+        self.refill(now)
+        if self.tokens < weight:
+            return False
+        self.tokens -= weight
+        return True
+
+    def wait(self, weight: float, now: float) -> float:
+        """Seconds until weight is affordable"""
+        self.refill(now)
+        return max(0.0, (weight - self.tokens) / self.rate)
+
+
+class VenueSchedule:
+    """Polling state of one REST venue"""
+    def __init__(self, adapter):
+        code = adapter.code
+        self.adapter = adapter
+        self.quote_weight = VENUE_QUOTE_WEIGHT.get(code, 1)
+        self.book_weight = VENUE_BOOK_WEIGHT.get(code, 1)
+        self.budget = RateBudget(VENUE_RATE_LIMITS.get(code, 60), max(self.quote_weight, self.book_weight))
+        self.last_poll = float('-inf')  # monotonic time of the last snapshot attempt
+        self.last_quotes = None         # monotonic time of the last successful snapshot
+        self.last_book = {}             # {symbol: monotonic time of the last book attempt}
+        self.failures = 0
+        self.polls = 0
+        self.book_polls = 0
+        self.held = 0                   # loops that waited on the budget
+
+    def quotes_due(self, hot: bool) -> float:
+        interval = POLL_INTERVAL_HOT if hot else POLL_INTERVAL_IDLE
+        if self.failures:
+            interval = min(interval * 2 ** self.failures, POLL_BACKOFF_MAX)
+        return self.last_poll + interval
+
+
+class PollScheduler:
+    """
+    Adaptive REST polling, one task per venue so a slow or throttled venue never
+    delays another. Each loop spends the venue's RateBudget on, in order:
+      1. the full-universe quote snapshot when due: every POLL_INTERVAL_HOT while a
+         symbol routed through the venue is within HOT_BAND of min_profit (net of
+         fees), POLL_INTERVAL_IDLE otherwise
+      2. L2 books of CONVERGENCE symbols routed through the venue, closest to the
+         threshold first: hot ones every BOOK_INTERVAL_HOT, the rest (STATIC only)
+         every BOOK_INTERVAL_IDLE, at most BOOK_CANDIDATES_MAX per loop in AUTO
+    A failed snapshot keeps the last quotes and backs off exponentially (capped at
+    POLL_BACKOFF_MAX); a 429 parks the venue for the Transport cooldown.
+    Requests go out once (no Transport retries / hedges) so each one costs exactly
+    the weight taken from the budget; the next loop is the retry.
+    """
+    def __init__(self, engine, universe, adapters: list, http, min_profit: float = MIN_PROFIT_THRESHOLD):
+        self.engine = engine
+        self.universe = universe
+        self.http = http.single_attempt()
+        self.min_profit = min_profit
+        self.venues = {adapter.code: VenueSchedule(adapter) for adapter in adapters}
+        # Taker fee by MarketState venue index
+        self.fees = np.array([VENUE_FEES[v] for v in engine.state.venues])
+        self.tasks = []
+
+    def start(self):
+        if not self.tasks:
+            self.tasks = [asyncio.create_task(self.run_venue(s)) for s in self.venues.values()]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def net_spreads(self) -> tuple:
+        """(net spread % after route fees, -inf when unquoted; buy; sell) per MarketState row"""
+        state = self.engine.state
+        n = state.n
+        buy = state.buy[:n].astype(int)
+        sell = state.sell[:n].astype(int)
+        quoted = buy >= 0
+        fees = self.fees[np.where(quoted, buy, 0)] + self.fees[np.where(quoted, sell, 0)]
+        net = np.where(quoted, state.spread[:n] - fees * 100, -np.inf)
+        return net, buy, sell
+
+    def book_candidates(self, venue: str) -> tuple:
+        """(hot symbols closest to the threshold first, idle symbols) whose books matter on venue"""
+        state = self.engine.state
+        k = state.venue_index[venue]
+        net, buy, sell = self.net_spreads()
+        near = (net >= self.min_profit - HOT_BAND) & ((buy == k) | (sell == k))
+        rows = np.flatnonzero(near)
+        rows = rows[np.argsort(-net[rows], kind='stable')].tolist()
+        hot = [
+            state.symbols[i] for i in rows
+            if STRATEGY_MAP.get(state.symbols[i], "CONVERGENCE") == "CONVERGENCE"
+            and self.universe.listed(venue, state.symbols[i])
+        ]
+        if self.universe.auto:
+            return hot[:BOOK_CANDIDATES_MAX], []
+        hot_set = set(hot)
+        idle = [
+            s for s in self.universe.symbols
+            if s not in hot_set and STRATEGY_MAP.get(s, "CONVERGENCE") == "CONVERGENCE" and self.universe.listed(venue, s)
+        ]
+        return hot, idle
+
+    async def run_venue(self, sched: VenueSchedule):
+        adapter = sched.adapter
+        while True:
+            cooldown = self.http.cooldown(adapter.api_url)
+            if cooldown:
+                await asyncio.sleep(cooldown)
+                continue
+
+            now = time.monotonic()
+            hot, idle = self.book_candidates(adapter.code)
+            quotes_due = sched.quotes_due(bool(hot))
+            quotes = now >= quotes_due
+            if quotes and not sched.budget.take(sched.quote_weight, now):
+                # Snapshot first: books don't get to spend its tokens
+                sched.held += 1
+                await asyncio.sleep(max(MIN_SLEEP_SEC, sched.budget.wait(sched.quote_weight, now)))
+                continue
+
+            books = []
+            next_due = quotes_due
+            held = False
+            for symbols, period in ((hot, BOOK_INTERVAL_HOT), (idle, BOOK_INTERVAL_IDLE)):
+                for sym in symbols:
+                    due = sched.last_book.get(sym, float('-inf')) + period
+                    if now < due:
+                        next_due = min(next_due, due)
+                    elif not held and sched.budget.take(sched.book_weight, now):
+                        books.append(sym)
+                    else:
+                        held = True
+
+            if not quotes and not books:
+                if held:
+                    sched.held += 1
+                    wait = sched.budget.wait(sched.book_weight, now)
+                else:
+                    # Re-plan at least every POLL_INTERVAL_HOT: symbols can turn hot
+                    wait = min(next_due - now, POLL_INTERVAL_HOT)
+                await asyncio.sleep(max(MIN_SLEEP_SEC, wait))
+                continue
+
+            try:
+                await self.poll(sched, quotes, books)
+            except Exception:
+                # Not the venue's fault (engine / subscriber bug): no backoff, but not silent
+                logger.exception("%s: poll failed", sched.adapter.code)
+
+    async def poll(self, sched: VenueSchedule, quotes: bool, books: list):
+        adapter = sched.adapter
+        code = adapter.code
+        store = self.engine.books[code]
+        books = [s for s in books if s in store]
+        results = await asyncio.gather(
+            *([self.guarded(code, "quotes", adapter.poll_quotes(self.http))] if quotes else []),
+            *[self.guarded(code, s, adapter.poll_book(self.http, s, store[s])) for s in books]
+        )
+        now = time.monotonic()
+
+        snapshot = {}
+        if quotes:
+            data, results = results[0], results[1:]
+            sched.last_poll = now
+            if data:
+                if METRICS.enabled and sched.last_quotes is not None:
+                    METRICS.observe(f"poll_gap.{code}", int((now - sched.last_quotes) * 1e9))
+                sched.last_quotes = now
+                sched.failures = 0
+                sched.polls += 1
+                snapshot[code] = data
+            else:
+                # Failed / throttled: keep the last quotes, back off
+                sched.failures += 1
+        for sym in books:
+            sched.last_book[sym] = now
+        sched.book_polls += len(books)
+        booked = [s for s, ok in zip(books, results) if ok]
+
+        if snapshot or booked:
+            await self.engine.on_snapshot(snapshot, booked)
+
+    @staticmethod
+    async def guarded(code: str, what: str, call):
+        """Result of one venue call, None when the venue failed it"""
+        try:
+            return await call
+        except POLL_ERRORS as e:
+            logger.warning("%s %s: %r", code, what, e)
+            return None
+
+    def stats(self) -> dict:
+        return {
+            code: {
+                "polls": s.polls,
+                "book_polls": s.book_polls,
+                "failures": s.failures,
+                "held": s.held,
+                "tokens": round(s.budget.tokens, 1)
+            }
+            for code, s in self.venues.items()
+        }
@@ -1,115 +1,249 @@
+import numpy as np
+from config import VENUE_FEES
+from core.venues import direction
+
+# Unfilled USD tolerated before a size is considered too large for the book
+FILL_TOLERANCE_USD = 1.0
+# Fills within this many levels are walked as Python floats: for a few levels
+# NumPy's per-call setup costs more than the walk (bench_simulator.py)
+SCALAR_LEVELS = 8
+FLOAT = np.dtype(float)
+
+def book_venues(opportunity) -> list:
+    """Venue codes with a non-empty L2 book (MarketView or {'l2_<venue>': book} dict)"""
+    if hasattr(opportunity, 'books'):
+        return [v for v, book in opportunity.books.items() if book]
+    return [k[3:] for k, book in opportunity.items() if k.startswith('l2_') and book]
 
 class ExecutionSimulator:
     def __init__(self):
-        # Taker Fees (Approximate public rates)
-        # Hyperliquid: 0.025% Taker
-        # Paradex: 0.03% Taker (Adjust as needed)
-        self.FEES = {
-            'Hyperliquid': 0.00025,
-            'Paradex': 0.0003
-        }
+        # Taker Fees by venue code: same source as Executor's mid-price filter (config.py)
+        self.FEES = dict(VENUE_FEES)
 
-    def calculate_vwap(self, book: list, size_usd: float) -> float:
+    def calculate_vwap(self, book, size_usd: float) -> float:
         """
         Calculates Volume Weighted Average Price for a buy/sell.
-        book: List of [price, size_in_token] sorted by best price first.
+        book: [[price, size_in_token], ...] sorted by best price first
+              (list of str/float or a preconverted (n, 2) array / OrderBook side).
         size_usd: Total USD amount to execute.
         """
-        remaining_usd = size_usd
-        total_tokens = 0.0
-        weighted_sum = 0.0
-
-        for price, size in book:
-            price = float(price)
-            size = float(size)
-            
-            # Value of this level
-            level_usd = price * size
-            
-            take_usd = min(remaining_usd, level_usd)
-            take_tokens = take_usd / price
-            
-            weighted_sum += price * take_tokens
-            total_tokens += take_tokens
-            remaining_usd -= take_usd
-            
-            if remaining_usd <= 0.0001:
-                break
-        
-        # If we exhausted the book but didn't fill trade
-        if remaining_usd > 1.0: 
-            return None # Liquidity too low for this size
-            
-        if total_tokens == 0:
+        levels = as_levels(book)
+        if size_usd <= 0:
             return 0.0
+        if len(levels) == 0:
+            return None if size_usd > FILL_TOLERANCE_USD else 0.0
+
+        # Top level covers the size (the usual small trade): the fill is its price
+        price = levels.item(0, 0)
+        if price * levels.item(0, 1) >= size_usd:
+            return price
+        # Shallow fill / shallow book: plain walk over the top levels
+        usd_before = tok_before = 0.0
+        for price, size in levels[:SCALAR_LEVELS].tolist():
+            level_usd = price * size
+            if usd_before + level_usd >= size_usd:
+                return size_usd / (tok_before + (size_usd - usd_before) / price)
+            usd_before += level_usd
+            tok_before += size
+        if len(levels) <= SCALAR_LEVELS:
+            # Exhausted the book without filling the trade
+            if size_usd - usd_before > FILL_TOLERANCE_USD:
+                return None
+            return usd_before / tok_before if tok_before > 0 else 0.0
+
+        # Deep fill, scalar case of vwap_curve: one cumsum + one searchsorted
+        prices = levels[:, 0]
+        cum_usd = np.cumsum(prices * levels[:, 1])
+        k = int(cum_usd.searchsorted(size_usd))
+
+        if k == len(prices):
+            # If we exhausted the book but didn't fill trade
+            if size_usd - cum_usd[-1] > FILL_TOLERANCE_USD:
+                return None # Liquidity too low for this size
+            total_tokens = float(levels[:, 1].sum())
+            return float(cum_usd[-1]) / total_tokens if total_tokens > 0 else 0.0
 
-        return weighted_sum / total_tokens
+        usd_before = float(cum_usd[k - 1]) if k else 0.0
+        tok_before = float(levels[:k, 1].sum())
+        return size_usd / (tok_before + (size_usd - usd_before) / float(prices[k]))
 
-    def simulate_trade(self, opportunity: dict, size_usd: float = 1000.0) -> dict:
+    def simulate_pair(self, opportunity, short: str, long: str, size_usd: float = 1000.0) -> dict:
         """
-        Simulates entry and exit with fees and slippage.
-        opportunity: Contains 'l2_hl' and 'l2_px' books.
+        Sell size_usd into short's bids, buy it from long's asks.
+        Returns {'spread_net', 'entry_short', 'entry_long', 'entry_<venue>', 'fees_paid'}
+        or None when a book is missing / too thin for the size.
         """
-        symbol = opportunity['symbol']
-        
-        # Hyperliquid Book (l2_hl)
-        # Paradex Book (l2_px)
-        # format: {'bids': [[px, sz], ...], 'asks': [[px, sz], ...]}
-        
-        l2_hl = opportunity.get('l2_hl')
-        l2_px = opportunity.get('l2_px')
-        
-        if not l2_hl or not l2_px:
+        short_book = opportunity.get(f'l2_{short}')
+        long_book = opportunity.get(f'l2_{long}')
+        if not short_book or not long_book:
+            return None
+
+        bid_vwap = self.calculate_vwap(short_book['bids'], size_usd) # Sell to bids
+        ask_vwap = self.calculate_vwap(long_book['asks'], size_usd)  # Buy from asks
+        if not bid_vwap or not ask_vwap:
+            return None
+
+        # Profit = (Short_Entry - Long_Entry) / Long_Entry, fees approximated in price terms
+        fees_pct = self.FEES[short] + self.FEES[long]
+        net_upside = bid_vwap - ask_vwap - ask_vwap * fees_pct
+        return {
+            'spread_net': net_upside / ask_vwap * 100,
+            'entry_short': bid_vwap,
+            'entry_long': ask_vwap,
+            f'entry_{short}': bid_vwap,
+            f'entry_{long}': ask_vwap,
+            'fees_paid': fees_pct * 100
+        }
+
+    def simulate_trade(self, opportunity, size_usd: float = 1000.0) -> dict:
+        """
+        Simulates entry with fees and slippage for every ordered venue pair with books.
+        opportunity: MarketView or dict with 'l2_<venue>' books (OrderBook or dict of lists).
+        Returns {'Short<S>_Long<L>': simulate_pair result}.
+        """
+        venues = book_venues(opportunity)
+        if len(venues) < 2:
             return {"error": "No L2 Data"}
 
-        # Direction logic from Scanner (Simplified here, usually passed in)
-        # If HL > PX => Short HL (Bid), Long PX (Ask)
-        # If PX > HL => Short PX (Bid), Long HL (Ask)
-        
-        # We need to re-detect direction based on mid or use passed direction.
-        # Let's assume passed direction or re-calc best.
-        
-        # Calculate raw execution prices (slippage included)
-        # Scenario A: Short HL, Long PX
-        hl_bid_vwap = self.calculate_vwap(l2_hl['bids'], size_usd) # Sell to bids
-        px_ask_vwap = self.calculate_vwap(l2_px['asks'], size_usd) # Buy from asks
-        
-        # Scenario B: Short PX, Long HL
-        px_bid_vwap = self.calculate_vwap(l2_px['bids'], size_usd) # Sell to bids
-        hl_ask_vwap = self.calculate_vwap(l2_hl['asks'], size_usd) # Buy from asks
-        
         results = {}
+        for short in venues:
+            for long in venues:
+                if short == long:
+                    continue
+                fill = self.simulate_pair(opportunity, short, long, size_usd)
+                if fill:
+                    results[direction(short, long)] = fill
+        return results
+
+    def simulate_curve(self, opportunity, sizes_usd) -> dict:
+        """
+        Size-vs-net-spread curve for one opportunity.
+        Returns {direction: {'sizes', 'spread_net', 'entry_short', 'entry_long'}} arrays,
+        NaN where the book is too thin for that size.
+        """
+        return self.simulate_batch([opportunity], sizes_usd).get(opportunity['symbol'], {})
+
+    def simulate_batch(self, opportunities: list, sizes_usd) -> dict:
+        """
+        Net spread curves for many symbols x many sizes, vectorized per venue set.
+        Returns {symbol: simulate_curve-style dict}. Symbols with < 2 books are skipped.
+        """
+        sizes = np.atleast_1d(np.asarray(sizes_usd, dtype=float))
+
+        # Symbols sharing the same booked venues -> one padded matrix walk
+        groups = {}
+        for o in opportunities:
+            venues = tuple(book_venues(o))
+            if len(venues) >= 2:
+                groups.setdefault(venues, []).append(o)
+
+        results = {}
+        for venues, opps in groups.items():
+            # bids, asks per venue: side row 2k = venues[k] bids, 2k + 1 = asks
+            books = [as_levels(o[f'l2_{v}'][side]) for o in opps for v in venues for side in ('bids', 'asks')]
+            vwaps = vwap_matrix(books, sizes).reshape(len(opps), 2 * len(venues), len(sizes))
 
-        # Analyze Scenario A (Short HL / Long PX)
-        if hl_bid_vwap and px_ask_vwap:
-            # Profit = (Short_Entry - Long_Entry) / Long_Entry
-            # or simply PnL in USD = (Sell Price - Buy Price) * Token_Amt?
-            # Let's stick to % Spread for normalization
-            
-            gross_upside = hl_bid_vwap - px_ask_vwap
-            # Fees: size * (fee_hl + fee_px)
-            fees_pct = self.FEES['Hyperliquid'] + self.FEES['Paradex']
-            net_upside = gross_upside - (px_ask_vwap * fees_pct) # Approx fee deduction in price terms
-            
-            spread_pct = (net_upside / px_ask_vwap) * 100
-            results['ShortHL_LongPX'] = {
-                'spread_net': spread_pct, 
-                'entry_hl': hl_bid_vwap, 
-                'entry_px': px_ask_vwap
-            }
-
-        # Analyze Scenario B (Short PX / Long HL)
-        if px_bid_vwap and hl_ask_vwap:
-            gross_upside = px_bid_vwap - hl_ask_vwap
-            fees_pct = self.FEES['Hyperliquid'] + self.FEES['Paradex']
-            net_upside = gross_upside - (hl_ask_vwap * fees_pct)
-            
-            spread_pct = (net_upside / hl_ask_vwap) * 100
-            results['ShortPX_LongHL'] = {
-                'spread_net': spread_pct, 
-                'entry_hl': hl_ask_vwap, 
-                'entry_px': px_bid_vwap,
-                'fees_paid': fees_pct * 100
-            }
+            curves = [{} for _ in opps]
+            for s, short in enumerate(venues):
+                for l, long in enumerate(venues):
+                    if s == l:
+                        continue
+                    bid = vwaps[:, 2 * s]
+                    ask = vwaps[:, 2 * l + 1]
+                    fees_pct = self.FEES[short] + self.FEES[long]
+                    with np.errstate(divide='ignore', invalid='ignore'):
+                        net = (bid - ask - ask * fees_pct) / ask * 100
+                    name = direction(short, long)
+                    for i in range(len(opps)):
+                        curves[i][name] = {'sizes': sizes, 'spread_net': net[i], 'entry_short': bid[i], 'entry_long': ask[i]}
 
+            for o, curve in zip(opps, curves):
+                results[o['symbol']] = curve
         return results
+
+
+def as_levels(book) -> np.ndarray:
+    """[[price, size], ...] -> float (n, 2) array. No copy if already float."""
+    if type(book) is np.ndarray and book.dtype is FLOAT and book.ndim == 2:
+        return book # OrderBook side view: skip asarray on the per-decision path
+    levels = np.asarray(book, dtype=float)
+    return levels.reshape(-1, 2)
+
+def vwap_curve(levels: np.ndarray, sizes_usd) -> np.ndarray:
+    """
+    VWAP for every size in sizes_usd against one book side.
+    Cumulative notional + searchsorted: O(levels + sizes * log levels), no Python loop.
+    NaN = not enough liquidity, 0.0 = nothing to fill.
+    """
+    sizes = np.atleast_1d(np.asarray(sizes_usd, dtype=float))
+    if len(levels) == 0:
+        return np.where(sizes > FILL_TOLERANCE_USD, np.nan, 0.0)
+
+    prices = levels[:, 0]
+    cum_usd = np.cumsum(prices * levels[:, 1])
+    cum_tok = np.cumsum(levels[:, 1])
+    k = np.searchsorted(cum_usd, sizes)
+
+    filled = k < len(prices)
+    kk = np.minimum(k, len(prices) - 1)
+    prev = kk - 1
+    usd_before = np.where(kk > 0, cum_usd[prev], 0.0)
+    tok_before = np.where(kk > 0, cum_tok[prev], 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = sizes / (tok_before + (sizes - usd_before) / prices[kk])
+        if not filled.all():
+            exhausted_vwap = cum_usd[-1] / cum_tok[-1] if cum_tok[-1] > 0 else 0.0
+            short = sizes - cum_usd[-1]
+            out = np.where(filled, out, np.where(short > FILL_TOLERANCE_USD, np.nan, exhausted_vwap))
+
+    out[sizes <= 0] = 0.0
+    return out
+
+def vwap_matrix(books: list, sizes_usd) -> np.ndarray:
+    """
+    VWAP for many book sides x many sizes -> (len(books), len(sizes)) array.
+    Books are padded into one matrix; row offsets make the flattened cumulative
+    notional monotonic so a single searchsorted serves every row.
+    """
+    sizes = np.atleast_1d(np.asarray(sizes_usd, dtype=float))
+    n_books = len(books)
+    depth = max((len(b) for b in books), default=0)
+    out = np.zeros((n_books, len(sizes)))
+    if n_books == 0:
+        return out
+
+    prices = np.ones((n_books, max(depth, 1)))
+    qty = np.zeros((n_books, max(depth, 1)))
+    for i, b in enumerate(books):
+        prices[i, :len(b)] = b[:, 0]
+        qty[i, :len(b)] = b[:, 1]
+    depth = prices.shape[1]
+
+    cum_usd = np.cumsum(prices * qty, axis=1)
+    cum_tok = np.cumsum(qty, axis=1)
+    total_usd = cum_usd[:, -1]
+
+    # Flatten rows into one monotonic array
+    offset = (np.arange(n_books) * (total_usd.max() + sizes.max() + 1.0))[:, None]
+    flat = (cum_usd + offset).ravel()
+    k = np.searchsorted(flat, (sizes[None, :] + offset).ravel()).reshape(n_books, len(sizes))
+    k -= (np.arange(n_books) * depth)[:, None]
+
+    filled = k < depth
+    kk = np.minimum(k, depth - 1)
+    rows = np.arange(n_books)[:, None]
+    usd_before = np.where(kk > 0, cum_usd[rows, kk - 1], 0.0)
+    tok_before = np.where(kk > 0, cum_tok[rows, kk - 1], 0.0)
+    tokens = tok_before + (sizes[None, :] - usd_before) / prices[rows, kk]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Level k completes the fill
+        out = np.where(filled, sizes[None, :] / tokens, 0.0)
+        # Book exhausted: partial fill within tolerance, else NaN
+        exhausted_vwap = np.where(cum_tok[:, -1] > 0, total_usd / cum_tok[:, -1], 0.0)[:, None]
+        short = sizes[None, :] - total_usd[:, None]
+        out = np.where(~filled, np.where(short > FILL_TOLERANCE_USD, np.nan, exhausted_vwap), out)
+
+    out[:, sizes <= 0] = 0.0
+    return out
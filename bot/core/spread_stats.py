@@ -0,0 +1,152 @@
+import math
+import numpy as np
+from config import SPREAD_WINDOW, SPREAD_SAMPLE_SEC, SPREAD_EWMA_HALF_LIFE_SEC
+
+LN2 = math.log(2)
+
+class SpreadStats:
+    """
+    Rolling statistics of one spread series per row (MarketState row = symbol,
+    or one historical series per row in backtests), fed one sample per row at a
+    time by sample(): O(1) per row, one array pass for all of them.
+      ring          (capacity, window) last `window` samples, head = next slot, count held
+      mean, m2      Welford mean / sum of squared deviations over the window: a full
+                    window replaces its oldest sample in place (no re-sum)
+      ewma, ewma2   exponentially weighted mean / mean of squares, half-life in samples
+      sx .. sxy     running sums of the AR(1) regression dx_t = a + b * x_{t-1} over the
+                    window's consecutive pairs, half-life of mean reversion = -ln 2 / ln(1 + b)
+    Reads are O(1) per row too. Samples should be evenly spaced (sample_sec):
+    the half-life comes out in samples and is scaled by it.
+    """
+    def __init__(self, capacity: int, window: int = SPREAD_WINDOW, sample_sec: float = SPREAD_SAMPLE_SEC,
+                 ewma_half_life: float = SPREAD_EWMA_HALF_LIFE_SEC / SPREAD_SAMPLE_SEC):
+        self.window = max(window, 2)
+        self.sample_sec = sample_sec
+        self.alpha = 1 - 0.5 ** (1 / ewma_half_life)
+        self.due = -math.inf # next sample(), seconds
+        self.capacity = 0
+        self.grow(capacity)
+
+    def grow(self, capacity: int):
+        if capacity <= self.capacity:
+            return
+        old = self.capacity
+        blocks = {
+            'ring': np.full((capacity, self.window), np.nan),
+            'head': np.zeros(capacity, dtype=np.int64), 'count': np.zeros(capacity, dtype=np.int64),
+            'sums': np.zeros((capacity, 8))
+        }
+        for name, block in blocks.items():
+            if old:
+                block[:old] = getattr(self, name)
+            setattr(self, name, block)
+        # (capacity,) views of sums
+        (self.mean, self.m2, self.ewma, self.ewma2,
+         self.sx, self.sy, self.sxx, self.sxy) = (self.sums[:, k] for k in range(8))
+        self.capacity = capacity
+
+    def clear(self, i: int):
+        self.ring[i] = np.nan
+        self.head[i] = self.count[i] = 0
+        self.sums[i] = 0.0
+
+    def sample(self, values: np.ndarray, mask: np.ndarray = None, now: float = None):
+        """Append values[r] to row r for rows 0..len(values)-1 (where mask), NaN rows skipped"""
+        if now is not None:
+            self.due = now + self.sample_sec
+        ok = ~np.isnan(values)
+        if mask is not None:
+            ok &= mask
+        rows = np.flatnonzero(ok)
+        if not len(rows):
+            return
+        x = values[rows]
+        window = self.window
+        count = self.count[rows]
+        head = self.head[rows]
+        full = count == window
+        held = count > 0
+        first = ~held
+        old = self.ring[rows, head]                     # evicted when full
+        nxt = self.ring[rows, (head + 1) % window]      # its successor: the evicted pair is (old, nxt - old)
+        last = self.ring[rows, (head - 1) % window]     # previous sample: the new pair is (last, x - last)
+
+        # Welford, growing window / sliding full window
+        mean = self.mean[rows]
+        n = np.where(full, window, count + 1)
+        out = np.where(full, old, 0.0)
+        delta = np.where(full, x - old, x - mean)
+        new_mean = mean + delta / n
+        self.m2[rows] += np.where(full, delta * (x - new_mean + old - mean), delta * (x - new_mean))
+        self.mean[rows] = new_mean
+
+        # EWMA, seeded with the first sample
+        self.ewma[rows] = np.where(first, x, self.ewma[rows] + self.alpha * (x - self.ewma[rows]))
+        self.ewma2[rows] = np.where(first, x * x, self.ewma2[rows] + self.alpha * (x * x - self.ewma2[rows]))
+
+        # AR(1) pairs: add (last, x - last), drop (old, nxt - old)
+        u = np.where(held, last, 0.0)
+        d = np.where(held, x - last, 0.0)
+        u_out = out
+        d_out = np.where(full, nxt - old, 0.0)
+        self.sx[rows] += u - u_out
+        self.sy[rows] += d - d_out
+        self.sxx[rows] += u * u - u_out * u_out
+        self.sxy[rows] += u * d - u_out * d_out
+
+        self.ring[rows, head] = x
+        self.head[rows] = (head + 1) % window
+        self.count[rows] = n
+
+    # Reads: rows = int or index array
+    def std(self, rows) -> np.ndarray:
+        """Sample standard deviation over the window"""
+        count = self.count[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(count > 1, np.sqrt(np.maximum(self.m2[rows], 0.0) / (count - 1)), np.nan)
+
+    def ewm_std(self, rows) -> np.ndarray:
+        return np.sqrt(np.maximum(self.ewma2[rows] - self.ewma[rows] ** 2, 0.0))
+
+    def zscore(self, rows, x) -> np.ndarray:
+        """How many window standard deviations x sits above the window mean"""
+        std = self.std(rows)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(std > 0, (x - self.mean[rows]) / std, np.nan)
+
+    def half_life(self, rows) -> np.ndarray:
+        """Mean-reversion half-life in seconds (sample_sec per sample), inf = not reverting"""
+        n = self.count[rows] - 1
+        sx, sy = self.sx[rows], self.sy[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            b = (n * self.sxy[rows] - sx * sy) / (n * self.sxx[rows] - sx * sx)
+            life = np.where((b > -1) & (b < 0), -LN2 / np.log1p(np.where(b > -1, b, 0.0)), np.inf)
+        return np.where(n > 1, life * self.sample_sec, np.nan)
+
+    @classmethod
+    def replay(cls, series, window: int = SPREAD_WINDOW, ewma_half_life: float = 60, sample_sec: float = 1.0) -> dict:
+        """
+        Run the streaming statistics over historical series (rows, T) or (T,),
+        all rows stepping together. Returns {name: array like series} where index t
+        holds what a live reader saw before sample t arrived (no look-ahead):
+        mean, std, ewma, z (of sample t against the stats before it), half_life.
+        """
+        data = np.asarray(series, dtype=float)
+        flat = data.ndim == 1
+        data = np.atleast_2d(data)
+        rows, steps = data.shape
+        stats = cls(rows, window, sample_sec, ewma_half_life)
+        everyone = np.arange(rows)
+        out = {name: np.full(data.shape, np.nan) for name in ("mean", "std", "ewma", "z", "half_life")}
+        for t in range(steps):
+            x = data[:, t]
+            held = stats.count > 0
+            out["mean"][:, t] = np.where(held, stats.mean, np.nan)
+            out["ewma"][:, t] = np.where(held, stats.ewma, np.nan)
+            out["std"][:, t] = stats.std(everyone)
+            out["z"][:, t] = stats.zscore(everyone, x)
+            out["half_life"][:, t] = stats.half_life(everyone)
+            stats.sample(x)
+        if flat:
+            out = {name: values[0] for name, values in out.items()}
+        return out
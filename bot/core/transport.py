@@ -0,0 +1,188 @@
+import asyncio
+import copy
+import time
+import aiohttp
+import orjson
+from urllib.parse import urlsplit
+from config import (
+    HTTP_POOL_SIZE, HTTP_KEEPALIVE_SEC, HTTP_DNS_TTL_SEC, HTTP_TIMEOUT_SEC,
+    HTTP_RETRIES, HTTP_HEDGE_AFTER_SEC, HTTP_VERIFY_SSL
+)
+
+RETRY_BACKOFF_SEC = 0.05
+RATE_LIMIT_COOLDOWN_SEC = 1.0 # 429 without Retry-After
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Encoding": "gzip, deflate"
+}
+
+class RetryableStatus(IOError):
+    """5xx: worth another attempt"""
+
+RETRYABLE = (asyncio.TimeoutError, aiohttp.ClientError, RetryableStatus)
+
+def loads(raw):
+    """Fast JSON decode (bytes or str)"""
+    return orjson.loads(raw)
+
+def dumps(obj) -> str:
+    return orjson.dumps(obj).decode()
+
+
+class Transport:
+    """
+    Pooled HTTP client for the REST venue fetches.
+    One ClientSession per host, each with its own keep-alive pool and DNS cache,
+    so a slow venue never holds connections another venue needs.
+    Every venue request is an idempotent read (HL /info is a POST but read-only), so:
+      - each attempt is bounded by timeout; timeouts, connection errors and 5xx
+        are retried up to retries times
+      - a 429 is not retried: the host cools down for Retry-After (or
+        RATE_LIMIT_COOLDOWN_SEC) and requests to it return None until then
+      - an attempt still pending after hedge_after gets a duplicate on a second
+        pooled connection, the first answer wins and the other is cancelled
+    Bodies are returned raw (fetch) or decoded with orjson (fetch_json).
+    """
+    def __init__(self, headers: dict = HEADERS, pool_size: int = HTTP_POOL_SIZE,
+                 keepalive: float = HTTP_KEEPALIVE_SEC, dns_ttl: int = HTTP_DNS_TTL_SEC,
+                 timeout: float = HTTP_TIMEOUT_SEC, retries: int = HTTP_RETRIES,
+                 hedge_after: float = HTTP_HEDGE_AFTER_SEC, verify_ssl: bool = HTTP_VERIFY_SSL):
+        self.headers = headers
+        self.pool_size = pool_size
+        self.keepalive = keepalive
+        self.dns_ttl = dns_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.hedge_after = hedge_after
+        self.verify_ssl = verify_ssl
+        # {host: ClientSession}
+        self.sessions = {}
+        # {host: monotonic time the last 429 cooldown ends}
+        self.cooldowns = {}
+        self.requests = 0
+        self.retried = 0
+        self.hedged = 0
+        self.throttled = 0
+
+    def session(self, url: str) -> aiohttp.ClientSession:
+        host = urlsplit(url).netloc
+        session = self.sessions.get(host)
+        if session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+                ssl=None if self.verify_ssl else False
+            )
+            session = self.sessions[host] = aiohttp.ClientSession(
+                headers=self.headers, connector=connector, timeout=self.timeout, json_serialize=dumps
+            )
+        return session
+
+    def single_attempt(self) -> "Transport":
+        """
+        View sharing the sessions and cooldowns, without retries or hedges:
+        for callers pacing requests with a weight budget (PollScheduler), where
+        every extra attempt would be spent without being charged.
+        """
+        view = copy.copy(self)
+        view.retries = 0
+        view.hedge_after = 0
+        return view
+
+    def cooldown(self, url: str) -> float:
+        """Seconds left before the host of url may be called again (0 = now)"""
+        until = self.cooldowns.get(urlsplit(url).netloc)
+        return max(0.0, until - time.monotonic()) if until else 0.0
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+        self.sessions.clear() # in place: single_attempt() views share it
+
+    async def get_json(self, url: str, params: dict = None):
+        return await self.fetch_json("GET", url, params=params)
+
+    async def post_json(self, url: str, body: dict):
+        return await self.fetch_json("POST", url, body=body)
+
+    async def fetch_json(self, method: str, url: str, body: dict = None, params: dict = None):
+        """Decoded JSON of a 200 response, None when it could not be had"""
+        raw = await self.fetch(method, url, body, params)
+        return None if raw is None else loads(raw)
+
+    async def fetch(self, method: str, url: str, body: dict = None, params: dict = None) -> bytes:
+        """Raw body of a 200 response, None on a non-retryable status, a cooling down host or when every attempt failed"""
+        if self.cooldown(url):
+            return None
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._hedged(method, url, body, params)
+            except RETRYABLE:
+                if attempt == self.retries:
+                    return None
+                self.retried += 1
+                await asyncio.sleep(RETRY_BACKOFF_SEC * (attempt + 1))
+        return None
+
+    async def send(self, method: str, url: str, data: bytes = None, headers: dict = None) -> tuple:
+        """
+        One attempt, never retried or hedged (orders are not idempotent).
+        Reuses the host's warm keep-alive pool. Returns (status, body);
+        status 0 = timeout / connection error, body None when unread.
+        """
+        if self.cooldown(url):
+            return 429, None
+        self.requests += 1
+        try:
+            async with self.session(url).request(method, url, data=data, headers=headers) as resp:
+                if resp.status == 429:
+                    self.throttle(url, resp.headers.get("Retry-After"))
+                return resp.status, await resp.read()
+        except RETRYABLE:
+            return 0, None
+
+    async def _hedged(self, method: str, url: str, body, params) -> bytes:
+        first = asyncio.ensure_future(self._attempt(method, url, body, params))
+        if not self.hedge_after:
+            return await first
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self.hedged += 1
+        pending = {first, asyncio.ensure_future(self._attempt(method, url, body, params))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(self, method: str, url: str, body, params) -> bytes:
+        self.requests += 1
+        async with self.session(url).request(method, url, json=body, params=params) as resp:
+            if resp.status != 200:
+                if resp.status == 429:
+                    self.throttle(url, resp.headers.get("Retry-After"))
+                    return None
+                if resp.status >= 500:
+                    raise RetryableStatus(f"{url}: HTTP {resp.status}")
+                return None
+            return await resp.read()
+
+    def throttle(self, url: str, retry_after: str = None):
+        try:
+            wait = float(retry_after) if retry_after else RATE_LIMIT_COOLDOWN_SEC
+        except ValueError:
+            wait = RATE_LIMIT_COOLDOWN_SEC # HTTP-date form
+        self.throttled += 1
+        self.cooldowns[urlsplit(url).netloc] = time.monotonic() + wait
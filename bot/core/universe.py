@@ -0,0 +1,100 @@
+import asyncio
+import re
+import time
+from config import SYMBOLS, VENUES, UNIVERSE_MODE, UNIVERSE_REFRESH_SEC, SYMBOL_ALIASES
+
+MIN_VENUES = 2 # a symbol needs at least two venues to be arbitraged
+
+# 1000PEPE / 1000000MOG style multi-unit contracts
+MULTI_UNIT = re.compile(r"^(1(?:000)+)([A-Z].*)$")
+
+def canonical(venue: str, name: str) -> tuple:
+    """
+    Venue-native market name -> (canonical symbol, price scale).
+    Explicit SYMBOL_ALIASES win; otherwise a 'k' prefix (kPEPE) or a 1000..
+    prefix (1000PEPE) means the contract is that many units, so prices are
+    scaled down to compare per unit.
+    """
+    alias = SYMBOL_ALIASES.get(venue, {}).get(name)
+    if alias:
+        return alias
+    if len(name) > 1 and name[0] == 'k' and name[1].isupper():
+        return name[1:], 0.001
+    m = MULTI_UNIT.match(name)
+    if m:
+        return m.group(2), 1.0 / int(m.group(1))
+    return name, 1.0
+
+
+class Universe:
+    """
+    Symbols scanned across venues, with native name mapping.
+    STATIC: config.SYMBOLS as-is (native == canonical) on every venue.
+    AUTO: every perp listed on at least MIN_VENUES venues, refreshed
+    every UNIVERSE_REFRESH_SEC from the adapters' list_markets().
+    """
+    def __init__(self, mode: str = UNIVERSE_MODE, static: list = SYMBOLS, venues: list = VENUES):
+        self.mode = mode.upper()
+        self.venues = list(venues)
+        self.symbols = list(static)
+        # {venue: {native: (canonical, scale)}} and the reverse {venue: {canonical: native}}
+        self.lookup = {v: {s: (s, 1.0) for s in self.symbols} for v in self.venues}
+        self.native = {v: {s: s for s in self.symbols} for v in self.venues}
+        self.refreshed = 0.0
+
+    @property
+    def auto(self) -> bool:
+        return self.mode == "AUTO"
+
+    def resolve(self, venue: str, native: str) -> tuple:
+        """(canonical, scale) or None if the market is not scanned"""
+        return self.lookup[venue].get(native)
+
+    def listed(self, venue: str, symbol: str) -> bool:
+        return symbol in self.native.get(venue, ())
+
+    def native_name(self, venue: str, symbol: str) -> str:
+        return self.native[venue].get(symbol, symbol)
+
+    def scale(self, venue: str, symbol: str) -> float:
+        entry = self.lookup[venue].get(self.native_name(venue, symbol))
+        return entry[1] if entry else 1.0
+
+    async def maybe_refresh(self, http, adapters: dict) -> bool:
+        """Re-discover if due (AUTO only). True when the symbol set changed."""
+        if not self.auto or time.monotonic() - self.refreshed < UNIVERSE_REFRESH_SEC:
+            return False
+        self.refreshed = time.monotonic()
+        codes = [v for v in self.venues if v in adapters]
+        results = await asyncio.gather(*[adapters[v].list_markets(http) for v in codes], return_exceptions=True)
+        listings = {v: r for v, r in zip(codes, results) if not isinstance(r, Exception) and r}
+        if len(listings) < min(MIN_VENUES, len(codes)):
+            # Keep the current universe, retry next interval
+            return False
+        return self.update(listings)
+
+    def update(self, listings: dict) -> bool:
+        """listings: {venue: [native names]}"""
+        markets = {}
+        for venue, names in listings.items():
+            for name in names:
+                sym, scale = canonical(venue, name)
+                markets.setdefault(sym, {})[venue] = (name, scale)
+
+        symbols = sorted(s for s, by_venue in markets.items() if len(by_venue) >= MIN_VENUES)
+        self.lookup = {v: {} for v in self.venues}
+        self.native = {v: {} for v in self.venues}
+        for sym in symbols:
+            for venue, (name, scale) in markets[sym].items():
+                self.lookup[venue][name] = (sym, scale)
+                self.native[venue][sym] = name
+        changed = symbols != self.symbols
+        self.symbols = symbols
+        return changed
+
+
+def scale_levels(levels, scale: float) -> list:
+    """[[px, sz], ...] from a multi-unit contract -> per unit"""
+    if scale == 1.0:
+        return levels
+    return [[float(p) * scale, float(s) / scale] for p, s in levels]
@@ -0,0 +1,318 @@
+import asyncio
+import time
+from config import HL_API_URL, PARADEX_API_URL, BINANCE_API_URL, VENUE_FEES
+from core.feeds import HyperliquidFeed, ParadexFeed, parse_hl_ctx, parse_px_summary
+from core.recorder import KIND_CTX, KIND_BOOK
+from core.metrics import METRICS
+from core.universe import scale_levels
+from core.transport import loads
+
+def direction(short: str, long: str) -> str:
+    """('px', 'hl') -> 'ShortPX_LongHL'"""
+    return f"Short{short.upper()}_Long{long.upper()}"
+
+def parse_direction(name: str) -> tuple:
+    """'ShortPX_LongHL' -> ('px', 'hl')"""
+    short, long = name.split('_')
+    return short[len("Short"):].lower(), long[len("Long"):].lower()
+
+
+class VenueAdapter:
+    """
+    One exchange, REST side. Adding a venue = one subclass + a code in config.VENUES:
+      list_markets(http)             -> native names for universe discovery
+      fetch_quotes(http)             -> {symbol: {"price", "funding"}} for the whole universe
+      fetch_book(http, sym, book)    -> L2 snapshot into an OrderBook, True on success
+      parse_quote(payload)           -> quote from one recorded ctx payload, None when it has no price
+      load_book(book, payload, scale) -> recorded book payload into an OrderBook (replay, REST-only venues)
+    feed_class: websocket VenueFeed, None = polled over REST even in WS mode.
+    Prices are per unit of the canonical symbol (Universe scale applied here).
+    http is the shared core.transport.Transport (pooled, retried, hedged);
+    api_url can be overridden per instance (stub servers, testnets).
+    A request that got no answer gives {} / False; a malformed answer raises
+    (KeyError, ValueError, ...) for the caller to count against the venue.
+    """
+    code = None
+    name = None
+    api_url = None
+    feed_class = None
+
+    def __init__(self, universe, recorder=None):
+        self.universe = universe
+        self.recorder = recorder
+
+    @property
+    def fee(self) -> float:
+        return VENUE_FEES[self.code]
+
+    async def poll_quotes(self, http) -> dict:
+        if not METRICS.enabled:
+            return await self.fetch_quotes(http)
+        t0 = time.perf_counter_ns()
+        try:
+            return await self.fetch_quotes(http)
+        finally:
+            METRICS.observe(f"fetch.{self.code}", time.perf_counter_ns() - t0)
+
+    async def poll_book(self, http, symbol: str, book) -> bool:
+        if not METRICS.enabled:
+            return await self.fetch_book(http, symbol, book)
+        t0 = time.perf_counter_ns()
+        try:
+            return await self.fetch_book(http, symbol, book)
+        finally:
+            METRICS.observe(f"fetch.book.{self.code}", time.perf_counter_ns() - t0)
+
+    async def list_markets(self, http) -> list:
+        raise NotImplementedError
+
+    async def fetch_quotes(self, http) -> dict:
+        raise NotImplementedError
+
+    async def fetch_book(self, http, symbol: str, book) -> bool:
+        raise NotImplementedError
+
+    def parse_quote(self, payload: dict) -> dict:
+        raise NotImplementedError
+
+    def load_book(self, book, payload, scale: float = 1.0):
+        raise NotImplementedError
+
+    async def ingest(self, engine, kind: int, native: str, payload):
+        """Replay one recorded REST payload for a venue without a websocket feed"""
+        entry = self.universe.resolve(self.code, native)
+        if entry is None:
+            return
+        if kind == KIND_CTX:
+            symbol, quote = self.scaled(entry, payload)
+            if quote is not None:
+                await engine.on_quote(self.code, symbol, quote)
+        elif kind == KIND_BOOK:
+            symbol, scale = entry
+            book = engine.books[self.code].get(symbol)
+            if book is not None:
+                self.load_book(book, payload, scale)
+                await engine.on_book(self.code, symbol, book)
+
+    def record(self, kind: int, native: str, payload):
+        if self.recorder:
+            self.recorder.record(self.code, kind, native, payload)
+
+    def scaled(self, entry: tuple, payload: dict) -> tuple:
+        """(symbol, scale) + raw payload -> (symbol, per-unit quote or None)"""
+        symbol, scale = entry
+        quote = self.parse_quote(payload)
+        if quote is not None and scale != 1.0:
+            quote['price'] *= scale
+        return symbol, quote
+
+
+class HyperliquidAdapter(VenueAdapter):
+    code = "hl"
+    name = "Hyperliquid"
+    api_url = HL_API_URL
+    feed_class = HyperliquidFeed
+
+    def __init__(self, universe, recorder=None):
+        super().__init__(universe, recorder)
+        # [(asset index, native name, (symbol, scale))] of the scanned assets, valid
+        # while the HL listing length and our lookup table are unchanged
+        self.slots = []
+        self.slots_key = None
+
+    def scanned_slots(self, universe: list) -> list:
+        """Positions of the scanned assets in a metaAndAssetCtxs listing (O(scanned) when cached)"""
+        lookup = self.universe.lookup['hl']
+        slots = self.slots
+        if self.slots_key is not None and self.slots_key[0] == len(universe) and self.slots_key[1] is lookup \
+                and all(universe[i]['name'] == name for i, name, _ in slots):
+            return slots
+        slots = []
+        for i, u in enumerate(universe):
+            entry = lookup.get(u['name'])
+            if entry:
+                slots.append((i, u['name'], entry))
+        self.slots = slots
+        self.slots_key = (len(universe), lookup)
+        return slots
+
+    async def list_markets(self, http) -> list:
+        """Listed (non delisted) perp names"""
+        data = await http.post_json(self.api_url, {"type": "meta"})
+        if data is None:
+            raise IOError("HL meta: request failed")
+        return [u['name'] for u in data.get('universe', []) if not u.get('isDelisted')]
+
+    def parse_quote(self, ctx: dict) -> dict:
+        return parse_hl_ctx(ctx)
+
+    async def fetch_quotes(self, http) -> dict:
+        """Ticker (MidPx) & Funding for the whole universe in one call"""
+        raw = await http.fetch("POST", self.api_url, {"type": "metaAndAssetCtxs"})
+        if raw is None: return {}
+        t0 = time.perf_counter_ns()
+        data = loads(raw)
+        ctxs = data[1]
+        market_data = {}
+        for i, name, entry in self.scanned_slots(data[0]['universe']):
+            self.record(KIND_CTX, name, ctxs[i])
+            symbol, quote = self.scaled(entry, ctxs[i])
+            if quote is None:
+                continue
+            market_data[symbol] = quote
+        if METRICS.enabled: METRICS.observe("parse.hl", time.perf_counter_ns() - t0)
+        return market_data
+
+    async def fetch_book(self, http, symbol: str, book) -> bool:
+        coin = self.universe.native_name('hl', symbol)
+        data = await http.post_json(self.api_url, {"type": "l2Book", "coin": coin})
+        if data is None: return False
+        self.record(KIND_BOOK, coin, data)
+        bids, asks = data['levels']
+        scale = self.universe.scale('hl', symbol)
+        book.apply_snapshot(
+            scale_levels([[l['px'], l['sz']] for l in bids], scale),
+            scale_levels([[l['px'], l['sz']] for l in asks], scale),
+            ts=data.get('time', 0)
+        )
+        return True
+
+
+class ParadexAdapter(VenueAdapter):
+    code = "px"
+    name = "Paradex"
+    api_url = PARADEX_API_URL
+    feed_class = ParadexFeed
+
+    async def list_markets(self, http) -> list:
+        """USD perp bases (ETH-USD-PERP -> ETH)"""
+        data = await http.get_json(f"{self.api_url}/markets")
+        if data is None:
+            raise IOError("Paradex markets: request failed")
+        return [
+            m['symbol'][:-len("-USD-PERP")]
+            for m in data.get('results', [])
+            if m.get('symbol', '').endswith("-USD-PERP") and m.get('asset_kind', 'PERP') == 'PERP'
+        ]
+
+    def parse_quote(self, item: dict) -> dict:
+        return parse_px_summary(item)
+
+    async def fetch_quotes(self, http) -> dict:
+        # FIX: Add market=ALL to get all summaries
+        raw = await http.fetch("GET", f"{self.api_url}/markets/summary", params={"market": "ALL"})
+        if raw is None: return {}
+        t0 = time.perf_counter_ns()
+        data = loads(raw)
+        market_data = {}
+        resolve = self.universe.lookup['px'].get
+        for item in data.get('results', []):
+            market = item['symbol']
+            if not market.endswith("-USD-PERP"):
+                continue
+            base = market[:-len("-USD-PERP")]
+            entry = resolve(base)
+            if entry:
+                self.record(KIND_CTX, base, item)
+                symbol, quote = self.scaled(entry, item)
+                market_data[symbol] = quote
+        if METRICS.enabled: METRICS.observe("parse.px", time.perf_counter_ns() - t0)
+        return market_data
+
+    async def fetch_book(self, http, symbol: str, book) -> bool:
+        market = self.universe.native_name('px', symbol)
+        data = await http.get_json(f"{self.api_url}/orderbook/{market}-USD-PERP", params={"depth": 20})
+        if data is None: return False
+        # Same shape as a WS 's' message so replay uses one code path
+        self.record(KIND_BOOK, market, {
+            "market": f"{market}-USD-PERP",
+            "seq_no": data.get('seq_no', 0),
+            "last_updated_at": data.get('last_updated_at', 0),
+            "update_type": "s",
+            "inserts": [{"side": "BUY", "price": p, "size": sz} for p, sz in data.get('bids', [])]
+                     + [{"side": "SELL", "price": p, "size": sz} for p, sz in data.get('asks', [])]
+        })
+        scale = self.universe.scale('px', symbol)
+        book.apply_snapshot(
+            scale_levels(data.get('bids', []), scale),
+            scale_levels(data.get('asks', []), scale),
+            seq=int(data.get('seq_no', 0)),
+            ts=data.get('last_updated_at', 0)
+        )
+        return True
+
+
+class BinanceAdapter(VenueAdapter):
+    """USDT-M perps (REST only). Native names are bases without USDT (BTC, 1000PEPE)."""
+    code = "bn"
+    name = "Binance"
+    api_url = BINANCE_API_URL
+
+    async def list_markets(self, http) -> list:
+        data = await http.get_json(f"{self.api_url}/exchangeInfo")
+        if data is None:
+            raise IOError("Binance exchangeInfo: request failed")
+        return [
+            s['baseAsset']
+            for s in data.get('symbols', [])
+            if s.get('contractType') == 'PERPETUAL' and s.get('quoteAsset') == 'USDT' and s.get('status') == 'TRADING'
+        ]
+
+    def parse_quote(self, item: dict) -> dict:
+        """Merged bookTicker + premiumIndex row"""
+        bid = float(item.get('bidPrice', 0) or 0)
+        ask = float(item.get('askPrice', 0) or 0)
+        mid = (bid + ask) / 2 if bid and ask else float(item.get('markPrice', 0))
+        return {
+            "price": mid,
+            "funding": float(item.get('lastFundingRate', 0.0) or 0.0),
+            "ts": int(item.get('time', 0) or 0) # venue ms, 0 = unknown
+        }
+
+    async def fetch_quotes(self, http) -> dict:
+        """Top of book + funding for every symbol: two all-symbol calls"""
+        raw_tickers, raw_premium = await asyncio.gather(
+            http.fetch("GET", f"{self.api_url}/ticker/bookTicker"),
+            http.fetch("GET", f"{self.api_url}/premiumIndex")
+        )
+        if raw_tickers is None: return {}
+        t0 = time.perf_counter_ns()
+        tickers = loads(raw_tickers)
+        funding = {p['symbol']: p for p in loads(raw_premium)} if raw_premium is not None else {}
+        market_data = {}
+        resolve = self.universe.lookup['bn'].get
+        for t in tickers:
+            pair = t['symbol']
+            if not pair.endswith("USDT"):
+                continue
+            base = pair[:-4]
+            entry = resolve(base)
+            if entry:
+                item = {**funding.get(pair, {}), **t}
+                self.record(KIND_CTX, base, item)
+                symbol, quote = self.scaled(entry, item)
+                market_data[symbol] = quote
+        if METRICS.enabled: METRICS.observe("parse.bn", time.perf_counter_ns() - t0)
+        return market_data
+
+    async def fetch_book(self, http, symbol: str, book) -> bool:
+        base = self.universe.native_name('bn', symbol)
+        data = await http.get_json(f"{self.api_url}/depth", params={"symbol": f"{base}USDT", "limit": 20})
+        if data is None: return False
+        self.record(KIND_BOOK, base, data)
+        self.load_book(book, data, self.universe.scale('bn', symbol))
+        return True
+
+    def load_book(self, book, data: dict, scale: float = 1.0):
+        book.apply_snapshot(
+            scale_levels(data.get('bids', []), scale),
+            scale_levels(data.get('asks', []), scale),
+            seq=int(data.get('lastUpdateId', 0)),
+            ts=data.get('T', 0)
+        )
+
+
+ADAPTERS = {
+    adapter.code: adapter
+    for adapter in (HyperliquidAdapter, ParadexAdapter, BinanceAdapter)
+}
@@ -1,7 +1,11 @@
 
+import argparse
 import asyncio
+import logging
 import os
 import sys
+import time
+from collections import deque
 from datetime import datetime
 from rich.layout import Layout
 from rich.live import Live
@@ -11,11 +15,41 @@ from rich.text import Text
 from rich.console import Console
 from core.scanner import Scanner
 from core.executor import Executor
-from config import REFRESH_RATE, MIN_PROFIT_THRESHOLD
+from core.execution import ExecutionEngine
+from core.journal import Journal
+from core.bus import SnapshotBus
+from core.history import backfill
+from core.metrics import METRICS
+from config import REFRESH_RATE, RENDER_FPS, HEADLESS, MIN_PROFIT_THRESHOLD, METRICS_PATH, METRICS_DUMP_INTERVAL, EXECUTION_MODE, BUS_ENABLED, HISTORY_BACKFILL, HL_API_URL
+
+class DashboardLogHandler(logging.Handler):
+    """Warnings logged by core modules (feeds, scheduler) as dashboard log lines"""
+    def __init__(self, dashboard):
+        super().__init__(logging.WARNING)
+        self.dashboard = dashboard
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if record.exc_info:
+            message += f": {record.exc_info[1]!r}"
+        self.dashboard.log(message, "ERROR" if record.levelno >= logging.ERROR else "WARNING")
 
 class ArbiBotDashboard:
-    def __init__(self):
+    """
+    Independent consumer of trading state.
+    The trading loop only calls publish(), which copies what is displayed into
+    plain rows; Live's refresh thread calls __rich__ at RENDER_FPS and builds
+    every Table/Panel from them, never touching the market columns or METRICS.
+    Headless: no Rich layout at all, log lines go straight to stdout.
+    """
+    def __init__(self, headless: bool = False):
         self.console = Console()
+        self.headless = headless
+        # Latest published state: (scanner rows, positions, held pair spreads, PnL summary,
+        # latency summary), swapped atomically
+        self.state = ([], {}, {}, None, None)
+        # Render durations (ns) from the render thread, recorded into METRICS by publish()
+        self.renders = deque(maxlen=1024)
         self.layout = Layout()
         self.layout.split(
             Layout(name="header", size=3),
@@ -31,8 +65,13 @@ class ArbiBotDashboard:
             Layout(name="positions", ratio=1)
         )
         # We will render logs directly into 'right'
+        if METRICS.enabled:
+            self.layout["right"].split_column(
+                Layout(name="logs", ratio=1),
+                Layout(name="metrics", ratio=1)
+            )
         
-        self.log_history = []
+        self.log_history = deque(maxlen=30)
 
     def log(self, message: str, level: str = "INFO"):
         time_str = datetime.now().strftime('%H:%M:%S')
@@ -41,9 +80,35 @@ class ArbiBotDashboard:
         if level == "WARNING": color = "yellow"
         if level == "ERROR": color = "red"
         
-        self.log_history.append(f"[dim]{time_str}[/dim] [{color}]{level}[/{color}] {message}")
-        if len(self.log_history) > 30:
-            self.log_history.pop(0)
+        line = f"[dim]{time_str}[/dim] [{color}]{level}[/{color}] {message}"
+        self.log_history.append(line)
+        if self.headless:
+            self.console.print(line)
+
+    def publish(self, opps: dict, positions: dict, pnl: dict = None):
+        """Trading loop side: snapshot of everything displayed (views read the columns live)"""
+        if self.headless:
+            return
+        rows = [(opp.symbol, opp['route'], opp.spread, opp['color'], opp['status']) for opp in opps.values()]
+        spreads = {
+            sym: opps[sym].pair_spread(pos['short_venue'], pos['long_venue'])
+            for sym, pos in positions.items() if sym in opps and 'short_venue' in pos
+        }
+        metrics = None
+        if METRICS.enabled:
+            while self.renders:
+                METRICS.observe("render", self.renders.popleft())
+            metrics = METRICS.summary()
+        self.state = (rows, {sym: dict(pos) for sym, pos in positions.items()}, spreads, pnl, metrics)
+
+    def __rich__(self):
+        """Render thread side: build the layout from the last published state"""
+        if METRICS.enabled:
+            t0 = time.perf_counter_ns()
+            layout = self.update(*self.state)
+            self.renders.append(time.perf_counter_ns() - t0)
+            return layout
+        return self.update(*self.state)
 
     def generate_header(self) -> Panel:
         grid = Table.grid(expand=True)
@@ -55,77 +120,101 @@ class ArbiBotDashboard:
         )
         return Panel(grid, style="white on black")
 
-    def generate_scanner_table(self, opps: list) -> Panel:
+    def generate_scanner_table(self, rows: list) -> Panel:
         table = Table(title="Live Arbitrage Scanner", expand=True, border_style="green", header_style="bold green")
         table.add_column("Symbol", justify="center")
+        table.add_column("Route", justify="center")
         table.add_column("Spread", justify="right")
         table.add_column("Status", justify="center")
 
-        if not opps:
-             table.add_row("-", "-", "Scanning...")
+        if not rows:
+             table.add_row("-", "-", "-", "Scanning...")
         else:
-            for opp in opps:
-                sym = opp['symbol']
-                spread = f"[{opp['color']}]{opp['spread']:+.2f}%[/{opp['color']}]"
-                status = f"[{opp['color']}]{opp['status']}[/{opp['color']}]"
-                table.add_row(sym, spread, status)
+            for sym, route, spread, color, status in rows:
+                table.add_row(sym, route, f"[{color}]{spread:+.2f}%[/{color}]", f"[{color}]{status}[/{color}]")
         
         return Panel(table, title="Market Feeds", border_style="blue")
 
-    def generate_positions_table(self, positions: dict, current_opps: dict) -> Panel:
+    def generate_positions_table(self, positions: dict, spreads: dict, pnl: dict = None) -> Panel:
         table = Table(title="Active Strategies", expand=True, border_style="magenta")
         table.add_column("Symbol")
         table.add_column("Entry")
         table.add_column("Current")
-        table.add_column("PnL (Est)")
+        table.add_column("Funding", justify="right")
+        table.add_column("PnL", justify="right")
 
+        pnl = pnl or {"realized": 0.0, "unrealized": 0.0, "positions": {}}
         if not positions:
-            table.add_row("-", "-", "-", "-")
+            table.add_row("-", "-", "-", "-", "-")
         else:
             for sym, pos in positions.items():
                 entry = f"{pos['entry_spread']:.2f}%"
+                # Legs left unmatched by an entry: flattened by hand
+                label = f"[bold red]{sym} ⚠[/bold red]" if pos.get('status') == "UNHEDGED" else sym
                 
-                # Find current spread from scanner data
-                curr_spread = 0.0
-                if sym in current_opps:
-                    curr_spread = current_opps[sym]['spread']
-                
-                current = f"{curr_spread:.2f}%"
-                
-                # PnL: entry - current (approx)
-                # Entry 0.5, Current 0.1 => Gain 0.4
-                # Entry -0.5, Current -0.1 => Gain 0.4
-                pnl_pts = abs(pos['entry_spread']) - abs(curr_spread)
-                color = "green" if pnl_pts > 0 else "red"
-                pnl = f"[{color}]{pnl_pts:+.2f}%[/{color}]"
-                
-                table.add_row(sym, entry, current, pnl)
+                # Current spread of the pair we hold, from scanner data
+                current = f"{spreads.get(sym, 0.0):.2f}%"
+
+                # Net of fees (entry paid + exit at the marks) and accrued funding
+                p = pnl['positions'].get(sym)
+                if p is None:
+                    table.add_row(label, entry, current, "-", "-")
+                    continue
+                color = "green" if p['unrealized'] > 0 else "red"
+                table.add_row(label, entry, current, f"${p['funding']:+.2f}", f"[{color}]${p['unrealized']:+.2f}[/{color}]")
 
-        return Panel(table, title="Active Portfolio (Convergence)", border_style="magenta")
+        title = f"Active Portfolio | Realized ${pnl['realized']:+.2f} | Unrealized ${pnl['unrealized']:+.2f}"
+        return Panel(table, title=title, border_style="magenta")
 
     def generate_log_panel(self) -> Panel:
-        text = Text("\n".join(self.log_history))
+        text = Text("\n".join(list(self.log_history)))
         return Panel(text, title="System Logs", border_style="yellow")
 
+    def generate_metrics_panel(self, metrics: dict) -> Panel:
+        table = Table(expand=True, border_style="cyan", header_style="bold cyan")
+        table.add_column("Stage")
+        table.add_column("n", justify="right")
+        table.add_column("p50", justify="right")
+        table.add_column("p99", justify="right")
+        table.add_column("p999", justify="right")
+        table.add_column("max", justify="right")
+
+        for name, s in (metrics or {}).items():
+            table.add_row(
+                name, str(s['count']),
+                fmt_us(s['p50_us']), fmt_us(s['p99_us']), fmt_us(s['p999_us']), fmt_us(s['max_us'])
+            )
+        return Panel(table, title="Latency", border_style="cyan")
+
     def generate_footer(self) -> Panel:
         text = Text(f"Press Ctrl+C to stop | Mode: AUTO-PILOT (Limit: {MIN_PROFIT_THRESHOLD}%)", justify="center", style="dim")
         return Panel(text, style="white on black")
 
-    def update(self, opps: list = None, positions: dict = None):
+    def update(self, rows: list = None, positions: dict = None, spreads: dict = None, pnl: dict = None,
+               metrics: dict = None):
         self.layout["header"].update(self.generate_header())
+
+        # Display order + table building only happen here, off the trading loop
+        rows = sorted(rows or [], key=lambda row: abs(row[2]), reverse=True)
         
-        # Convert opps list to dict for position lookup
-        opps_dict = {o['symbol']: o for o in opps} if opps else {}
-        
-        self.layout["scanner"].update(self.generate_scanner_table(opps))
-        self.layout["positions"].update(self.generate_positions_table(positions, opps_dict))
+        self.layout["scanner"].update(self.generate_scanner_table(rows))
+        self.layout["positions"].update(self.generate_positions_table(positions or {}, spreads or {}, pnl))
         
         # Fixed: Update 'right' directly instead of looking for 'log'
-        self.layout["right"].update(self.generate_log_panel())
+        if METRICS.enabled:
+            self.layout["logs"].update(self.generate_log_panel())
+            self.layout["metrics"].update(self.generate_metrics_panel(metrics))
+        else:
+            self.layout["right"].update(self.generate_log_panel())
         
         self.layout["footer"].update(self.generate_footer())
         return self.layout
 
+def fmt_us(us: float) -> str:
+    if us >= 1000:
+        return f"{us / 1000:.1f}ms"
+    return f"{us:.0f}us"
+
 from rich.prompt import Prompt
 import re
 
@@ -166,40 +255,75 @@ def run_settings(console, current_profit, current_size):
         
     return float(new_profit), float(new_size)
 
-async def main():
-    dashboard = ArbiBotDashboard()
+async def main(headless: bool = HEADLESS):
+    dashboard = ArbiBotDashboard(headless=headless)
+    logging.getLogger("core").addHandler(DashboardLogHandler(dashboard))
     scanner = Scanner()
-    executor = Executor()
+    journal = Journal()
+    executor = Executor(journal)
+    # Web dashboard reads the bot's state from here instead of polling the venues
+    bus = SnapshotBus(scanner.engine.state) if BUS_ENABLED else None
+    # Open positions survive restarts: replay the journal before any decision
+    journal.start()
+    executor.restore()
     
     # Initialize from config (runtime copy)
     runtime_profit = MIN_PROFIT_THRESHOLD
     runtime_size = getattr(executor, 'trade_size', 100) # Get from executor init
     
     dashboard.log("Initializing Core Systems...", "INFO")
+    if executor.active_positions:
+        dashboard.log(f"Restored {len(executor.active_positions)} open position(s) from {journal.path}", "WARNING")
+
+    # Event-driven: executor only sees symbols whose quotes changed
+    async def on_opportunity(opp):
+        action = await executor.on_opportunity(opp)
+        if action == "OPENED":
+            dashboard.log(f"Opened Position on {opp['symbol']}", "TRADE")
+        elif action == "SENT":
+            dashboard.log(f"Entry orders sent on {opp['symbol']}", "TRADE")
+
     await scanner.start()
-    dashboard.log(f"Connected to Feeds. Threshold: {runtime_profit}%", "INFO")
+    if EXECUTION_MODE.upper() == "LIVE":
+        # Market metadata + warm order connections before the first decision
+        executor.engine = ExecutionEngine.from_config(scanner.http, scanner.universe)
+        await executor.engine.start(scanner.universe.symbols)
+        dashboard.log(f"LIVE execution on {', '.join(executor.engine.clients)}", "WARNING")
+    scanner.engine.subscribe(on_opportunity)
+    dashboard.log(f"Connected to Feeds ({scanner.mode}). Threshold: {runtime_profit}%", "INFO")
+    if bus:
+        await bus.start()
+        dashboard.log(f"Dashboard bus on http://{bus.host}:{bus.port}/stream", "INFO")
+    history_task = None
+    if HISTORY_BACKFILL:
+        # Chart history: venue 1m candles once, live quotes extend it from there
+        history_task = asyncio.create_task(backfill(scanner.engine.state, scanner.universe, scanner.http.session(HL_API_URL)))
     
+    if headless:
+        try:
+            await trading_loop(scanner, executor, dashboard, bus)
+        finally:
+            if history_task:
+                history_task.cancel()
+            if bus:
+                await bus.stop()
+            # In-flight orders settle (and are journaled) before their session closes
+            await executor.drain()
+            await scanner.stop()
+            if executor.engine:
+                executor.engine.stop()
+            await journal.stop()
+            if METRICS.enabled:
+                await METRICS.dump_async(METRICS_PATH)
+        return
+
     app_running = True
     
     while app_running:
         try:
-            # Live Dashboard Loop
-            with Live(dashboard.update([], {}), refresh_per_second=4, screen=True) as live:
-                while True:
-                    # Fetch Live Data
-                    opps = await scanner.scan()
-                    
-                    # 1. Executor: Evaluate Entries
-                    for opp in opps:
-                        action = await executor.evaluate_entry(opp)
-                        if action == "OPENED":
-                            dashboard.log(f"Opened Position on {opp['symbol']}", "TRADE")
-
-                    # 2. Executor: Manage Exits
-                    await executor.check_active_positions(opps)
-                    
-                    live.update(dashboard.update(opps, executor.active_positions))
-                    await asyncio.sleep(REFRESH_RATE)
+            # Live renders the dashboard from its own refresh thread at RENDER_FPS
+            with Live(dashboard, refresh_per_second=RENDER_FPS, screen=True):
+                await trading_loop(scanner, executor, dashboard, bus)
                     
         except KeyboardInterrupt:
             # Pause Menu
@@ -211,6 +335,8 @@ async def main():
             elif choice == "2":
                 runtime_profit, runtime_size = run_settings(dashboard.console, runtime_profit, runtime_size)
                 executor.update_settings(runtime_profit, runtime_size)
+                if scanner.scheduler:
+                    scanner.scheduler.min_profit = runtime_profit
                 # Update Footer info if needed or log it
                 dashboard.log(f"Settings Updated: >{runtime_profit}%", "WARNING")
                 input("Press Enter to Resume...")
@@ -221,11 +347,44 @@ async def main():
                 
         finally:
             if not app_running:
+                if history_task:
+                    history_task.cancel()
+                if bus:
+                    await bus.stop()
+                # In-flight orders settle (and are journaled) before their session closes
+                await executor.drain()
                 await scanner.stop()
+                if executor.engine:
+                    executor.engine.stop()
+                await journal.stop()
+                if METRICS.enabled:
+                    await METRICS.dump_async(METRICS_PATH)
+
+async def trading_loop(scanner: Scanner, executor: Executor, dashboard: ArbiBotDashboard, bus: SnapshotBus = None):
+    """Scan + publish. Never touches Rich, so rendering can't delay decisions."""
+    last_dump = time.monotonic()
+    while True:
+        # Decisions already ran in the feed / PollScheduler callbacks,
+        # this only refreshes the universe and publishes
+        await scanner.scan()
+        # Funding keeps accruing on held symbols that did not tick: O(open positions)
+        executor.pnl.mark_all(scanner.engine.opps)
+        summary = executor.pnl.summary()
+        dashboard.publish(scanner.engine.opps, executor.active_positions, summary)
+        if bus:
+            bus.publish(scanner.engine.opps, executor.active_positions, summary)
+
+        if METRICS.enabled and time.monotonic() - last_dump >= METRICS_DUMP_INTERVAL:
+            await METRICS.dump_async(METRICS_PATH)
+            last_dump = time.monotonic()
+        await asyncio.sleep(REFRESH_RATE)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ArbiBot")
+    parser.add_argument("--headless", action="store_true", default=HEADLESS, help="No dashboard, log to stdout (servers)")
+    args = parser.parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(args.headless))
     except KeyboardInterrupt:
         pass
     except Exception as e:
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from aiohttp import web
+from core.transport import loads, dumps
+
+# Local stand-in for the order endpoints ExecutionEngine talks to:
+#   Hyperliquid  :8780  POST /info {"type": "meta"}, POST /exchange (order actions)
+#   Paradex      :8781  GET /v1/markets, POST /v1/orders, GET /v1/orders/{id}
+# Orders are IOC: each fills `fill` of its size (0..1) at its limit price,
+# `reject` of them are refused, every response is delayed by latency_ms.
+# Signatures are not verified. Point the bot at it with
+#   HL_API_URL=http://127.0.0.1:8780/info HL_EXCHANGE_URL=http://127.0.0.1:8780/exchange
+#   PARADEX_API_URL=http://127.0.0.1:8781/v1 PARADEX_UNSIGNED=1 EXECUTION_MODE=LIVE
+# Usage: python bot/mock_exchange.py [--fill 1.0] [--latency-ms 5] [--reject 0.0]
+
+HL_PORT = 8780
+PX_PORT = 8781
+ASSETS = ["BTC", "ETH", "SOL", "AVAX", "ARB", "DOGE", "WIF", "kPEPE"]
+SZ_DECIMALS = {"BTC": 5, "ETH": 4, "SOL": 2, "kPEPE": 0, "DOGE": 0}
+
+
+class MockExchange:
+    def __init__(self, fill: float = 1.0, latency_ms: float = 5.0, reject: float = 0.0, settle_ms: float = 10.0):
+        self.fill = {"hl": fill, "px": fill} # per venue, change between runs for imbalance cases
+        self.latency = latency_ms / 1000
+        self.reject = reject
+        self.settle = settle_ms / 1000 # Paradex: order stays OPEN this long before CLOSED
+        self.oids = itertools.count(1)
+        self.orders = {}               # Paradex {id: order}
+        self.received = []             # (venue, monotonic ns, order) for every accepted request
+
+    async def delay(self):
+        if self.latency:
+            await asyncio.sleep(self.latency * random.uniform(0.8, 1.2))
+
+    def filled(self, venue: str, size: float, decimals: int) -> float:
+        return round(size * self.fill[venue], decimals)
+
+    # Hyperliquid
+    async def hl_info(self, request):
+        body = loads(await request.read())
+        await self.delay()
+        if body.get('type') != 'meta':
+            return web.json_response({"error": "unsupported"}, status=400)
+        universe = [{"name": n, "szDecimals": SZ_DECIMALS.get(n, 1), "maxLeverage": 20} for n in ASSETS]
+        return web.Response(text=dumps({"universe": universe}), content_type="application/json")
+
+    async def hl_exchange(self, request):
+        body = loads(await request.read())
+        self.received.append(("hl", time.perf_counter_ns(), body))
+        await self.delay()
+        if 'signature' not in body or body.get('action', {}).get('type') != 'order':
+            return web.json_response({"status": "err", "response": "bad request"})
+        statuses = []
+        for order in body['action']['orders']:
+            name = ASSETS[order['a']]
+            if random.random() < self.reject:
+                statuses.append({"error": "Order could not immediately match against any resting orders."})
+                continue
+            size = self.filled("hl", float(order['s']), SZ_DECIMALS.get(name, 1))
+            if size <= 0:
+                statuses.append({"error": "Order could not immediately match against any resting orders."})
+                continue
+            statuses.append({"filled": {"totalSz": str(size), "avgPx": order['p'], "oid": next(self.oids)}})
+        return web.Response(
+            text=dumps({"status": "ok", "response": {"type": "order", "data": {"statuses": statuses}}}),
+            content_type="application/json"
+        )
+
+    # Paradex
+    async def px_markets(self, request):
+        await self.delay()
+        results = [
+            {"symbol": f"{n}-USD-PERP", "asset_kind": "PERP", "price_tick_size": "0.01",
+             "order_size_increment": f"{10 ** -SZ_DECIMALS.get(n, 1):.{SZ_DECIMALS.get(n, 1)}f}"}
+            for n in ASSETS if not n.startswith("k")
+        ]
+        return web.Response(text=dumps({"results": results}), content_type="application/json")
+
+    async def px_create(self, request):
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"error": "NOT_AUTHENTICATED", "message": "missing JWT"}, status=401)
+        body = loads(await request.read())
+        self.received.append(("px", time.perf_counter_ns(), body))
+        await self.delay()
+        if random.random() < self.reject:
+            return web.json_response({"error": "ORDER_REJECTED", "message": "mock reject"}, status=400)
+        oid = str(next(self.oids))
+        size = float(body['size'])
+        filled = self.filled("px", size, SZ_DECIMALS.get(body['market'].split('-')[0], 1))
+        order = {
+            "id": oid, "market": body['market'], "side": body['side'], "type": body['type'],
+            "size": body['size'], "price": body['price'], "status": "NEW",
+            "remaining_size": body['size'], "avg_fill_price": "0", "flags": body.get('flags', []),
+            "created_at": int(time.time() * 1000), "cancel_reason": "", "client_id": body.get('client_id', "")
+        }
+        self.orders[oid] = order
+        asyncio.get_running_loop().call_later(self.settle, self.settle_px, oid, filled)
+        return web.Response(text=dumps({**order, "status": "OPEN"}), status=201, content_type="application/json")
+
+    def settle_px(self, oid: str, filled: float):
+        order = self.orders[oid]
+        order['status'] = "CLOSED"
+        order['remaining_size'] = f"{float(order['size']) - filled:.8f}"
+        if filled > 0:
+            order['avg_fill_price'] = order['price']
+        if float(order['remaining_size']) > 0:
+            order['cancel_reason'] = "IOC_REMAINDER" if filled > 0 else "NO_LIQUIDITY"
+
+    async def px_order(self, request):
+        await self.delay()
+        order = self.orders.get(request.match_info['id'])
+        if order is None:
+            return web.json_response({"error": "ORDER_ID_NOT_FOUND", "message": "unknown order"}, status=404)
+        return web.Response(text=dumps(order), content_type="application/json")
+
+    async def px_order_by_client_id(self, request):
+        await self.delay()
+        client_id = request.match_info['client_id']
+        order = next((o for o in self.orders.values() if o['client_id'] == client_id), None)
+        if order is None:
+            return web.json_response({"error": "CLIENT_ORDER_ID_NOT_FOUND", "message": "unknown order"}, status=404)
+        return web.Response(text=dumps(order), content_type="application/json")
+
+    def apps(self) -> tuple:
+        hl = web.Application()
+        hl.router.add_post("/info", self.hl_info)
+        hl.router.add_post("/exchange", self.hl_exchange)
+        px = web.Application()
+        px.router.add_get("/v1/markets", self.px_markets)
+        px.router.add_post("/v1/orders", self.px_create)
+        px.router.add_get("/v1/orders/by_client_id/{client_id}", self.px_order_by_client_id)
+        px.router.add_get("/v1/orders/{id}", self.px_order)
+        return hl, px
+
+    async def start(self, host: str = "127.0.0.1", hl_port: int = HL_PORT, px_port: int = PX_PORT) -> list:
+        runners = []
+        for app, port in zip(self.apps(), (hl_port, px_port)):
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, host, port).start()
+            runners.append(runner)
+        return runners
+
+
+def serve(fill: float = 1.0, latency_ms: float = 5.0, reject: float = 0.0, ready=None):
+    """Blocking: run both mock venues until killed (multiprocessing target)"""
+    async def main():
+        await MockExchange(fill, latency_ms, reject).start()
+        if ready is not None:
+            ready.set()
+        await asyncio.Event().wait()
+    asyncio.run(main())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock HL / Paradex order endpoints")
+    parser.add_argument("--fill", type=float, default=1.0, help="Share of each IOC order that fills")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Delay added to every response")
+    parser.add_argument("--reject", type=float, default=0.0, help="Share of orders refused")
+    args = parser.parse_args()
+    print(f"Mock exchange: HL :{HL_PORT}, Paradex :{PX_PORT}")
+    try:
+        serve(args.fill, args.latency_ms, args.reject)
+    except KeyboardInterrupt:
+        pass
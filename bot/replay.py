@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from core.scanner import Scanner
+from core.executor import Executor
+from core.feeds import BookGap
+from core.recorder import read_log
+
+# Deterministic replay of a MarketRecorder log through Feed -> SpreadEngine -> Executor.
+# Same ingest() path as live websockets, no network. The market table's clock is pinned
+# to each record's receive time, so funding / spread history and quote ages follow the
+# recording rather than the replay speed.
+#
+# Usage:
+#   RECORD_PATH=bot/data/session.mdlog python bot/main.py   # record
+#   python bot/replay.py bot/data/session.mdlog             # as fast as possible
+#   python bot/replay.py bot/data/session.mdlog --speed 1   # recorded speed
+
+console = Console()
+
+async def replay(path: str, speed: float = 0.0, trade_size: float = None) -> dict:
+    scanner = Scanner(mode="REPLAY", record_path=None)
+    executor = Executor()
+    if trade_size:
+        executor.trade_size = trade_size
+
+    actions = {}
+    async def on_opportunity(opp):
+        action = await executor.on_opportunity(opp)
+        actions[action] = actions.get(action, 0) + 1
+
+    scanner.engine.subscribe(on_opportunity)
+    # Websocket venues replay through their feed, REST-only venues through the adapter
+    feeds = scanner.make_feeds()
+    adapters = scanner.adapters
+    clock = scanner.engine.clock
+
+    latencies = []
+    records = 0
+    first_ts = last_ts = None
+    t0 = time.perf_counter()
+
+    for ts_ns, venue, kind, symbol, payload in read_log(path):
+        if first_ts is None:
+            first_ts = ts_ns
+        last_ts = ts_ns
+
+        if speed > 0:
+            # Pace to recorded time
+            delay = (ts_ns - first_ts) / 1e9 / speed - (time.perf_counter() - t0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        clock.ns = ts_ns
+        start = time.perf_counter_ns()
+        try:
+            if venue in feeds:
+                await feeds[venue].ingest(kind, symbol, payload)
+            elif venue in adapters:
+                await adapters[venue].ingest(scanner.engine, kind, symbol, payload)
+        except BookGap:
+            # Recording spans a reconnect: wait for the next snapshot
+            feeds[venue].books[symbol].seq = 0
+        latencies.append(time.perf_counter_ns() - start)
+        records += 1
+
+    wall = time.perf_counter() - t0
+    lat = np.asarray(latencies, dtype=np.int64)
+    return {
+        "records": records,
+        "recorded_s": (last_ts - first_ts) / 1e9 if records else 0.0,
+        "wall_s": wall,
+        "decisions": scanner.engine.updates,
+        "actions": actions,
+        "p50_us": float(np.percentile(lat, 50)) / 1e3 if records else 0.0,
+        "p99_us": float(np.percentile(lat, 99)) / 1e3 if records else 0.0,
+        "max_us": float(lat.max()) / 1e3 if records else 0.0,
+        "trade_log": executor.trade_log,
+        "open_positions": list(executor.active_positions)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded market data log through Scanner -> Executor")
+    parser.add_argument("log")
+    parser.add_argument("--speed", type=float, default=0.0, help="1.0 = recorded speed, 0 = as fast as possible")
+    parser.add_argument("--size", type=float, default=None, help="Override trade size (USD)")
+    args = parser.parse_args()
+
+    stats = asyncio.run(replay(args.log, args.speed, args.size))
+
+    table = Table(title=f"Replay: {args.log}")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_row("Records", f"{stats['records']:,}")
+    table.add_row("Recorded span", f"{stats['recorded_s']:.1f}s")
+    table.add_row("Wall time", f"{stats['wall_s']:.3f}s")
+    table.add_row("Throughput", f"{stats['records'] / stats['wall_s']:,.0f} updates/s" if stats['wall_s'] else "-")
+    table.add_row("Decisions (engine events)", f"{stats['decisions']:,}")
+    table.add_row("Update -> decision p50", f"{stats['p50_us']:.1f} us")
+    table.add_row("Update -> decision p99", f"{stats['p99_us']:.1f} us")
+    table.add_row("Update -> decision max", f"{stats['max_us']:.1f} us")
+    for action, count in sorted(stats['actions'].items()):
+        table.add_row(f"Executor: {action}", f"{count:,}")
+    table.add_row("Open at end", ", ".join(stats['open_positions']) or "-")
+    console.print(table)
+
+    for line in stats['trade_log'][-10:]:
+        console.print(line)
+
+if __name__ == "__main__":
+    main()
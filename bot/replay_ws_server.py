@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+import websockets
+from config import SYMBOLS
+
+# Local stand-in for the Hyperliquid & Paradex websocket APIs.
+# Speaks just enough of both protocols for HyperliquidFeed / ParadexFeed:
+#   HL: {"method":"subscribe","subscription":{"type":"activeAssetCtx"|"l2Book","coin":X}}
+#   PX: {"jsonrpc":"2.0","method":"subscribe","params":{"channel":"markets_summary.X-USD-PERP"}}
+#       {"jsonrpc":"2.0","method":"subscribe","params":{"channel":"order_book.X-USD-PERP.deltas"}}
+#
+# Usage:
+#   python bot/replay_ws_server.py                       # synthetic random walk
+#   python bot/replay_ws_server.py --file capture.jsonl  # replay {"venue","symbol","data"} lines
+#   FEED_MODE=WS HL_WS_URL=ws://127.0.0.1:8765 PARADEX_WS_URL=ws://127.0.0.1:8766 python bot/main.py
+
+BASE_PRICES = {"BTC": 95000.0, "ETH": 3300.0, "HYPE": 25.0, "PAXG": 2650.0}
+
+class ReplayHub:
+    def __init__(self):
+        # venue -> set of (ws, kind, symbol), kind: "ctx" | "book"
+        self.clients = {"hl": set(), "px": set()}
+        # Paradex book state for snapshots on subscribe: sym -> {"BUY": {px: sz}, "SELL": {px: sz}}
+        self.px_books = {}
+        self.px_seq = {}
+
+    async def publish(self, venue: str, symbol: str, data: dict, kind: str = "ctx"):
+        if venue == "hl":
+            if kind == "book":
+                msg = {"channel": "l2Book", "data": data}
+            else:
+                msg = {"channel": "activeAssetCtx", "data": {"coin": symbol, "ctx": data}}
+        else:
+            channel = f"order_book.{symbol}-USD-PERP.deltas" if kind == "book" else f"markets_summary.{symbol}-USD-PERP"
+            msg = {
+                "jsonrpc": "2.0",
+                "method": "subscription",
+                "params": {"channel": channel, "data": data}
+            }
+        raw = json.dumps(msg)
+        for client in list(self.clients[venue]):
+            ws, k, sym = client
+            if sym != symbol or k != kind:
+                continue
+            try:
+                await ws.send(raw)
+            except websockets.ConnectionClosed:
+                self.clients[venue].discard(client)
+
+    async def publish_px_book(self, symbol: str, bids: dict, asks: dict):
+        """Diff against the last Paradex book and publish a 'd' delta"""
+        old = self.px_books.get(symbol, {"BUY": {}, "SELL": {}})
+        new = {"BUY": bids, "SELL": asks}
+        deletes, inserts, updates = [], [], []
+        for side in ("BUY", "SELL"):
+            for price in old[side].keys() - new[side].keys():
+                deletes.append({"side": side, "price": price, "size": "0"})
+            for price, size in new[side].items():
+                if price not in old[side]:
+                    inserts.append({"side": side, "price": price, "size": size})
+                elif old[side][price] != size:
+                    updates.append({"side": side, "price": price, "size": size})
+        self.px_books[symbol] = new
+        self.px_seq[symbol] = self.px_seq.get(symbol, 0) + 1
+        await self.publish("px", symbol, {
+            "market": f"{symbol}-USD-PERP",
+            "seq_no": self.px_seq[symbol],
+            "last_updated_at": int(time.time() * 1000),
+            "update_type": "d",
+            "deletes": deletes,
+            "inserts": inserts,
+            "updates": updates
+        }, kind="book")
+
+    def px_snapshot(self, symbol: str) -> dict:
+        book = self.px_books.get(symbol, {"BUY": {}, "SELL": {}})
+        return {
+            "market": f"{symbol}-USD-PERP",
+            "seq_no": self.px_seq.get(symbol, 0),
+            "last_updated_at": int(time.time() * 1000),
+            "update_type": "s",
+            "deletes": [],
+            "inserts": [{"side": side, "price": p, "size": sz} for side in ("BUY", "SELL") for p, sz in book[side].items()],
+            "updates": []
+        }
+
+    async def hl_handler(self, ws):
+        subs = set()
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                if msg.get('method') == 'ping':
+                    await ws.send(json.dumps({"channel": "pong"}))
+                elif msg.get('method') == 'subscribe':
+                    sub = msg['subscription']
+                    client = (ws, "book" if sub['type'] == 'l2Book' else "ctx", sub['coin'])
+                    subs.add(client)
+                    self.clients['hl'].add(client)
+                    await ws.send(json.dumps({"channel": "subscriptionResponse", "data": msg}))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients['hl'] -= subs
+
+    async def px_handler(self, ws):
+        subs = set()
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                if msg.get('method') == 'subscribe':
+                    channel = msg['params']['channel']
+                    base = channel.split('.')[1].split('-')[0]
+                    kind = "book" if channel.startswith('order_book.') else "ctx"
+                    client = (ws, kind, base)
+                    subs.add(client)
+                    self.clients['px'].add(client)
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "result": {"channel": channel}, "id": msg.get('id')}))
+                    if kind == "book":
+                        await ws.send(json.dumps({
+                            "jsonrpc": "2.0",
+                            "method": "subscription",
+                            "params": {"channel": channel, "data": self.px_snapshot(base)}
+                        }))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.clients['px'] -= subs
+
+
+async def synthetic_source(hub: ReplayHub, rate: float):
+    """Random walk around BASE_PRICES with a noisy cross-venue basis"""
+    prices = {s: BASE_PRICES.get(s, 100.0) for s in SYMBOLS}
+    interval = 1.0 / rate
+    while True:
+        sym = random.choice(SYMBOLS)
+        prices[sym] *= 1 + random.gauss(0, 0.0002)
+        hl_mid = prices[sym]
+        px_mid = hl_mid * (1 + random.gauss(0, 0.0005))
+        await hub.publish("hl", sym, {
+            "midPx": f"{hl_mid:.6f}",
+            "markPx": f"{hl_mid:.6f}",
+            "funding": f"{random.gauss(0.0000125, 0.00001):.8f}"
+        })
+        await hub.publish("px", sym, {
+            "symbol": f"{sym}-USD-PERP",
+            "bid": f"{px_mid * 0.9999:.6f}",
+            "ask": f"{px_mid * 1.0001:.6f}",
+            "mark_price": f"{px_mid:.6f}",
+            "funding_rate": f"{random.gauss(0.0001, 0.00008):.8f}",
+            "created_at": int(time.time() * 1000)
+        })
+
+        # 10 levels each side, 1bp apart, random depth
+        step = hl_mid * 0.0001
+        hl_levels = [
+            [{"px": f"{hl_mid - step * (i + 1):.6f}", "sz": f"{random.uniform(0.5, 5):.4f}", "n": 1} for i in range(10)],
+            [{"px": f"{hl_mid + step * (i + 1):.6f}", "sz": f"{random.uniform(0.5, 5):.4f}", "n": 1} for i in range(10)]
+        ]
+        await hub.publish("hl", sym, {"coin": sym, "time": int(time.time() * 1000), "levels": hl_levels}, kind="book")
+        await hub.publish_px_book(
+            sym,
+            {f"{px_mid - step * (i + 1):.6f}": f"{random.uniform(0.5, 5):.4f}" for i in range(10)},
+            {f"{px_mid + step * (i + 1):.6f}": f"{random.uniform(0.5, 5):.4f}" for i in range(10)}
+        )
+        await asyncio.sleep(interval)
+
+async def file_source(hub: ReplayHub, path: str, rate: float):
+    """Replay a JSONL capture, one {"venue","symbol","data"[,"kind"]} object per line, in a loop"""
+    while True:
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                await hub.publish(rec['venue'], rec['symbol'], rec['data'], rec.get('kind', 'ctx'))
+                await asyncio.sleep(1.0 / rate)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Local HL/Paradex websocket stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--hl-port", type=int, default=8765)
+    parser.add_argument("--px-port", type=int, default=8766)
+    parser.add_argument("--file", help="JSONL capture to replay (default: synthetic)")
+    parser.add_argument("--rate", type=float, default=50.0, help="Updates per second")
+    args = parser.parse_args()
+
+    hub = ReplayHub()
+    async with websockets.serve(hub.hl_handler, args.host, args.hl_port), \
+               websockets.serve(hub.px_handler, args.host, args.px_port):
+        print(f"HL  stand-in: ws://{args.host}:{args.hl_port}")
+        print(f"PX  stand-in: ws://{args.host}:{args.px_port}")
+        if args.file:
+            await file_source(hub, args.file, args.rate)
+        else:
+            await synthetic_source(hub, args.rate)
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
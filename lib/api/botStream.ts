@@ -0,0 +1,145 @@
+// Client of the bot's dashboard bus (bot/core/bus.py): one EventSource per tab,
+// shared by every hook, instead of each page polling the venues itself.
+// The bus sends a "snapshot" event, then "delta" events each valid on seq - 1 only.
+
+export const BOT_URL = process.env.NEXT_PUBLIC_BOT_URL || 'http://127.0.0.1:8790';
+
+// Flat row per symbol: <venue>_price / _bid / _ask / _funding (hourly fraction), null = unknown
+export interface BotMarket {
+    spread: number | null;
+    buy: string | null;
+    sell: string | null;
+    funding_diff: number | null;
+    carry: number | null;
+    z: number | null;
+    status: string;
+    [field: string]: number | string | null;
+}
+
+export interface BotPosition {
+    strategy: string;
+    short: string;
+    long: string;
+    entry_time: number;
+    entry_spread: number;
+    entry_short: number | null;
+    entry_long: number | null;
+    unrealized?: number;
+    funding?: number;
+    [field: string]: number | string | null | undefined;
+}
+
+export interface BotState {
+    seq: number;
+    ts: number;
+    venues: string[];
+    markets: Record<string, BotMarket>;
+    positions: Record<string, BotPosition>;
+    pnl: { realized?: number; unrealized?: number; total?: number };
+}
+
+export type BotStatus = 'disconnected' | 'connecting' | 'connected' | 'error';
+
+export interface BotStream {
+    state: BotState;
+    status: BotStatus;
+}
+
+const EMPTY: BotStream = {
+    state: { seq: 0, ts: 0, venues: [], markets: {}, positions: {}, pnl: {} },
+    status: 'disconnected'
+};
+
+let current: BotStream = EMPTY;
+let source: EventSource | null = null;
+let resyncing = false;
+const listeners = new Set<() => void>();
+
+function emit(next: BotStream) {
+    current = next;
+    listeners.forEach(listener => listener());
+}
+
+function applyDelta(state: BotState, delta: any): BotState {
+    // Only touched rows are copied, so unchanged rows keep their identity for memoized consumers
+    const markets = { ...state.markets };
+    if (delta.markets) {
+        for (const [symbol, fields] of Object.entries<Partial<BotMarket>>(delta.markets)) {
+            markets[symbol] = { ...markets[symbol], ...fields } as BotMarket;
+        }
+    }
+    if (delta.removed) {
+        for (const symbol of delta.removed) delete markets[symbol];
+    }
+    return {
+        ...state,
+        seq: delta.seq,
+        ts: delta.ts,
+        markets,
+        positions: delta.positions ?? state.positions,
+        pnl: delta.pnl ?? state.pnl
+    };
+}
+
+async function resync() {
+    // Missed a delta: start over from the full snapshot
+    if (resyncing) return;
+    resyncing = true;
+    try {
+        const res = await fetch(`${BOT_URL}/snapshot`, { cache: 'no-store' });
+        const state: BotState = await res.json();
+        if (state.seq > current.state.seq) emit({ ...current, state });
+    } catch (e) {
+        console.error('Bot snapshot failed', e);
+    } finally {
+        resyncing = false;
+    }
+}
+
+function connect() {
+    emit({ ...current, status: 'connecting' });
+    source = new EventSource(`${BOT_URL}/stream`);
+
+    source.onopen = () => emit({ ...current, status: 'connected' });
+
+    source.addEventListener('snapshot', (event) => {
+        emit({ state: JSON.parse((event as MessageEvent).data), status: 'connected' });
+    });
+
+    source.addEventListener('delta', (event) => {
+        const delta = JSON.parse((event as MessageEvent).data);
+        const seq = current.state.seq;
+        if (delta.seq <= seq) return; // already in a snapshot we fetched
+        if (delta.seq !== seq + 1) {
+            resync();
+            return;
+        }
+        emit({ ...current, state: applyDelta(current.state, delta) });
+    });
+
+    // EventSource reconnects by itself; the bus opens every stream with a snapshot
+    source.onerror = () => {
+        emit({ ...current, status: source?.readyState === EventSource.CLOSED ? 'error' : 'connecting' });
+    };
+}
+
+export function subscribe(listener: () => void): () => void {
+    listeners.add(listener);
+    if (!source) connect();
+    return () => {
+        listeners.delete(listener);
+        if (listeners.size === 0 && source) {
+            source.close();
+            source = null;
+            current = { ...current, status: 'disconnected' };
+        }
+    };
+}
+
+export function getSnapshot(): BotStream {
+    return current;
+}
+
+export function getServerSnapshot(): BotStream {
+    return EMPTY;
+}
@@ -1,3 +1,4 @@
+import { BOT_URL } from '@/lib/api/botStream';
 
 export interface HistoricalPoint {
     time: string; // HH:MM:SS
@@ -6,151 +7,64 @@ export interface HistoricalPoint {
     timestamp: number; // Unix timestamp for sorting
 }
 
-export async function fetchHistoricalData(token: string): Promise<HistoricalPoint[]> {
-    const endTime = Date.now();
-    const startTime = endTime - 60 * 60 * 1000; // Last 1 hour
-
-    try {
-        const [hlData, pxData] = await Promise.allSettled([
-            fetchHyperliquidHistory(token, startTime, endTime),
-            fetchParadexHistory(token, startTime, endTime)
-        ]);
-
-        const hlCandles = hlData.status === 'fulfilled' ? hlData.value : [];
-        const pxCandles = pxData.status === 'fulfilled' ? pxData.value : [];
-
-        // Map by timestamp (minute precision)
-        const pointsMap = new Map<number, { paradex?: number; hyperliquid?: number }>();
-
-        // Process Hyperliquid
-        hlCandles.forEach((c: any) => {
-            // HL time is already ms
-            // Round to nearest minute to align
-            const t = Math.floor(c.t / 60000) * 60000;
-            pointsMap.set(t, { ...pointsMap.get(t), hyperliquid: parseFloat(c.c) }); // c is close price
-        });
-
-        // Process Paradex
-        pxCandles.forEach((c: any) => {
-            // Paradex time usually comes as ms or varies, check doc. Assuming standard OHLCV
-            // If endpoint returns 'results', likely array of arrays or objects.
-            // Based on typical Paradex API, it returns objects with 'close', 'timestamp'
-            const t = Math.floor(c.timestamp / 60000) * 60000;
-            pointsMap.set(t, { ...pointsMap.get(t), paradex: parseFloat(c.close) });
-        });
-
-        // Sort and convert to array
-        return Array.from(pointsMap.entries())
-            .sort((a, b) => a[0] - b[0])
-            .map(([timestamp, values]) => ({
-                time: new Date(timestamp).toLocaleTimeString([], { hour12: false, hour: '2-digit', minute: '2-digit' }), // We only show HH:MM on chart usually, or HH:MM:SS
-                timestamp,
-                ...values
-            }))
-            .slice(-60); // Keep last 60 minutes max
-
-    } catch (err) {
-        console.error("Error fetching history:", err);
-        return [];
-    }
+// GET /history on the bot's dashboard bus (bot/core/bus.py): 1-minute OHLC bars kept in
+// the bot's memory, so a chart load never reaches the venues.
+export interface BotHistory {
+    symbol: string;
+    minute: number | null; // open time of the bar still forming
+    t: number[];
+    bars: Record<string, { o: (number | null)[]; h: (number | null)[]; l: (number | null)[]; c: (number | null)[] }>;
 }
 
-async function fetchHyperliquidHistory(token: string, start: number, end: number) {
-    const response = await fetch('https://api.hyperliquid.xyz/info', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-            type: "candleSnapshot",
-            req: {
-                coin: token,
-                interval: "1m",
-                startTime: start,
-                endTime: end
-            }
-        })
-    });
-    if (!response.ok) throw new Error('HL fetch failed');
-    const data = await response.json();
-    return data;
+const MAX_POINTS = 60; // Keep last 60 minutes max
+
+// Per token: points by minute, and what to send on the next poll (ETag, since = last bar,
+// which may still be forming)
+const cache = new Map<string, { points: Map<number, HistoricalPoint>; etag: string | null; since: number | null }>();
+
+export function toPoints(history: BotHistory): HistoricalPoint[] {
+    const hl = history.bars.hl?.c;
+    const px = history.bars.px?.c;
+    return history.t.map((timestamp, k) => ({
+        time: new Date(timestamp).toLocaleTimeString([], { hour12: false, hour: '2-digit', minute: '2-digit' }),
+        timestamp,
+        hyperliquid: hl?.[k] ?? undefined,
+        paradex: px?.[k] ?? undefined
+    }));
 }
 
-async function fetchParadexHistory(token: string, start: number, end: number) {
-    // Paradex symbol mapping
-    const symbolMap: Record<string, string> = {
-        'BTC': 'BTC-USD-PERP',
-        'ETH': 'ETH-USD-PERP',
-        'SOL': 'SOL-USD-PERP',
-        'AVAX': 'AVAX-USD-PERP',
-        'HYPE': 'HYPE-USD-PERP'
-    };
-
-    const symbol = symbolMap[token] || `${token}-USD-PERP`;
-
-    // Fallback: v1/trades (Public)
-    // Since official candles endpoint is private, we fetch recent trades and build candles manually.
-    // We try to fetch enough trades to cover some history. 
-    // Max limit is usually 100 or 1000. Let's try 1000.
-    const url = `https://api.prod.paradex.trade/v1/trades?market=${symbol}&limit=1000`;
+export async function fetchHistoricalData(token: string): Promise<HistoricalPoint[]> {
+    let entry = cache.get(token);
+    if (!entry) {
+        entry = { points: new Map(), etag: null, since: null };
+        cache.set(token, entry);
+    }
 
     try {
-        const response = await fetch(url);
-        if (!response.ok) {
-            console.warn(`Paradex trades fetch failed: ${response.status}`);
-            return [];
-        }
-
-        const data = await response.json();
-        const trades = data.results || [];
-
-        // Build 1m candles from trades
-        const candlesMap = new Map<number, number>(); // timestamp -> close price
-
-        // Trades are usually desc or asc. We need to handle them.
-        // API documentation often says newest first.
-        // We iterate and bucket by minute.
-
-        trades.forEach((t: any) => {
-            // Handle timestamp safely (could be int ms, int s, or ISO string)
-            let time = t.created_at;
-            if (typeof time === 'string') {
-                time = new Date(time).getTime();
-            } else if (typeof time === 'number' && time < 10000000000) {
-                // Assuming seconds if small (e.g. 17xxxxxxxx)
-                time = time * 1000;
-            }
-
-            const price = parseFloat(t.price);
-
-            // Round to minute
-            const minute = Math.floor(time / 60000) * 60000;
-
-            // Should we take the last trade of the minute?
-            // If the map doesn't have this minute, or if this trade is LATER than what we have?
-            // If trades are Descending (newest first), the FIRST trade we see for a minute is the CLOSE.
-            // If trades are Ascending, the LAST trade we see is the CLOSE.
-
-            // Looking at curl output: times decreased (1769...05 -> 1769...03). So it's DESCENDING.
-            // So the first trade we encounter for a minute is the latest (Close).
-            if (!candlesMap.has(minute)) {
-                candlesMap.set(minute, price);
-            }
+        const params = new URLSearchParams({ symbol: token });
+        if (entry.since !== null) params.set('since', String(entry.since));
+        const response = await fetch(`${BOT_URL}/history?${params}`, {
+            headers: entry.etag ? { 'If-None-Match': entry.etag } : {},
+            cache: 'no-store'
         });
 
-        // Convert map to array format expected by the aligner
-        // The aligner expects objects with 'timestamp' or similar? 
-        // No, the caller expects an array of objects that *this function* usually normalized?
-        // Wait, the caller (process Paradex) expects: { close: number, timestamp: number } (like default API)
-
-        // Let's create compatible objects
-        const results = Array.from(candlesMap.entries()).map(([ts, price]) => ({
-            timestamp: ts,
-            close: price
-        }));
-
-        return results;
+        if (response.ok) {
+            const history: BotHistory = await response.json();
+            // Incremental: only bars from `since` on came back, they replace ours
+            for (const point of toPoints(history)) entry.points.set(point.timestamp, point);
+            if (history.t.length > 0) entry.since = history.t[history.t.length - 1];
+            entry.etag = response.headers.get('ETag');
+        } else if (response.status !== 304) {
+            console.warn(`Bot history fetch failed: ${response.status}`);
+        }
+    } catch (err) {
+        console.error("Error fetching history:", err);
+    }
 
-    } catch (e) {
-        console.error("Paradex history error:", e);
-        return [];
+    const points = Array.from(entry.points.values()).sort((a, b) => a.timestamp - b.timestamp);
+    if (points.length > MAX_POINTS) {
+        for (const point of points.slice(0, points.length - MAX_POINTS)) entry.points.delete(point.timestamp);
+        return points.slice(-MAX_POINTS);
     }
+    return points;
 }
@@ -0,0 +1,14 @@
+import { useSyncExternalStore } from 'react';
+import { subscribe, getSnapshot, getServerSnapshot, BotStream } from '@/lib/api/botStream';
+
+// Bot venue codes -> dashboard exchange names
+export const VENUE_NAMES: Record<string, string> = {
+    hl: 'Hyperliquid',
+    px: 'Paradex',
+    bn: 'Binance'
+};
+
+// Every component shares the tab's one bus connection
+export function useBotStream(): BotStream {
+    return useSyncExternalStore(subscribe, getSnapshot, getServerSnapshot);
+}
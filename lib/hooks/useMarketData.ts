@@ -1,4 +1,5 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useMemo } from 'react';
+import { useBotStream, VENUE_NAMES } from '@/lib/hooks/useBotStream';
 
 export interface MarketData {
     symbol: string;
@@ -180,3 +181,27 @@ export function useMarketData() {
 
     return data;
 }
+
+// Funding from the bot's dashboard bus (see lib/api/botStream.ts): rates arrive
+// normalized to per hour for every venue (Paradex quotes 8h rates), same APR % as above.
+// Open interest is not tracked by the bot, so it stays 0 here (useMarketData has it).
+export function useBotMarketData() {
+    const { state } = useBotStream();
+
+    return useMemo(() => {
+        const out: ExchangeMarketData = {};
+        for (const [symbol, row] of Object.entries(state.markets)) {
+            for (const venue of state.venues) {
+                const funding = row[`${venue}_funding`] as number | null;
+                if (funding == null) continue;
+                (out[symbol] ??= {})[VENUE_NAMES[venue] ?? venue] = {
+                    symbol,
+                    fundingRate: funding * 24 * 365 * 100,
+                    openInterest: 0,
+                    oraclePx: (row[`${venue}_price`] as number | null) ?? 0
+                };
+            }
+        }
+        return out;
+    }, [state.markets, state.venues]);
+}